@@ -0,0 +1,76 @@
+"""
+Benchmark: the SQLite patch archive.
+
+Usage:
+    python benchmarks/bench_archive.py [weapons] [patches]
+
+Defaults to 20k weapons over 6 patches (~30% of stats change between the
+first two, ~5% per patch after that). Reports the ingest time per patch,
+the archive size against the JSON files it replaces and the stored rows
+against the stat values they stand for, then compare / summary / history
+from the archive next to the same work from the JSON files.
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_engines import make_snapshots, timed  # noqa: E402
+from patchforge_archive import PatchArchive  # noqa: E402
+from patchforge_core import build_weapon_map, compare_jsons, load_json, summarize_results  # noqa: E402
+from patchforge_history import build_history  # noqa: E402
+
+
+def evolve(data, rng, rate=0.05):
+    """Next patch: a share of the stats move a little."""
+    weapons = []
+    for w in data["weapons"]:
+        stats = {k: round(v + rng.uniform(-5, 5), 2) if rng.random() < rate else v for k, v in w["stats"].items()}
+        weapons.append({"name": w["name"], "stats": stats})
+    return {"weapons": weapons}
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    rng = random.Random(5)
+    snapshots = list(make_snapshots(size))
+    while len(snapshots) < count:
+        snapshots.append(evolve(snapshots[-1], rng))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i, data in enumerate(snapshots):
+            paths.append(os.path.join(tmp, f"p{i + 1}.json"))
+            with open(paths[-1], "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        del snapshots
+
+        db = os.path.join(tmp, "archive.db")
+        with PatchArchive(db) as archive:
+            for path in paths:
+                patch, seconds = timed(archive.ingest_file, path)
+                print(f"ingest {patch['label']:<4} {seconds:6.2f}s  ({patch['new_values']:,} new or changed values)")
+            sizes = archive.sizes()
+            json_bytes = sum(os.path.getsize(p) for p in paths)
+            print(f"archive {sizes['bytes']:,} bytes vs {json_bytes:,} bytes of JSON; "
+                  f"{sizes['cells']:,} values stored as {sizes['intervals']:,} rows")
+
+            first, last = "p1", f"p{len(paths)}"
+            _, archived = timed(archive.compare, first, last)
+            _, loaded = timed(lambda: compare_jsons(load_json(paths[0]), load_json(paths[-1])))
+            print(f"compare  archive {archived:6.2f}s   json {loaded:6.2f}s")
+            _, archived = timed(archive.summary, first, last)
+            _, loaded = timed(lambda: summarize_results(compare_jsons(load_json(paths[0]), load_json(paths[-1]))))
+            print(f"summary  archive {archived:6.2f}s   json {loaded:6.2f}s")
+            _, archived = timed(archive.history)
+            _, loaded = timed(lambda: build_history([build_weapon_map(load_json(p)) for p in paths]))
+            print(f"history  archive {archived:6.2f}s   json {loaded:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
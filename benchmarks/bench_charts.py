@@ -0,0 +1,53 @@
+"""
+Benchmark: summary chart rendering and the chart cache.
+
+Usage:
+    python benchmarks/bench_charts.py [weapons]
+
+Defaults to 20k weapons. Reports, for one comparison's summary: the first
+render (including the matplotlib import), a warm render, a cache hit (what
+reopening the summary window or exporting HTML again costs) and the HTML
+export with the cached charts embedded. Needs matplotlib.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_engines import make_snapshots, timed  # noqa: E402
+from patchforge_charts import CHARTS, charts_available, render_charts, report_images  # noqa: E402
+from patchforge_core import compare_jsons, summarize_results  # noqa: E402
+from patchforge_export import export_results  # noqa: E402
+
+
+def main():
+    if not charts_available():
+        sys.exit("matplotlib is not installed")
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    old, new = make_snapshots(size)
+    results = compare_jsons(old, new)
+    summary = summarize_results(results)
+
+    start = time.perf_counter()
+    CHARTS.get(summary)
+    print(f"first render (import + draw) {(time.perf_counter() - start) * 1000:9.1f} ms")
+    _, seconds = timed(render_charts, summary)
+    print(f"warm render                   {seconds * 1000:9.1f} ms")
+    hits = 1000
+    start = time.perf_counter()
+    for _ in range(hits):
+        CHARTS.get(summary)
+    print(f"cache hit                     {(time.perf_counter() - start) / hits * 1000:9.3f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "report.html")
+        _, plain = timed(export_results, results, path, "html")
+        _, charted = timed(lambda: export_results(results, path, "html", images=report_images(summary)))
+    print(f"HTML export of {len(results):,} rows: {plain:.3f} s plain, {charted:.3f} s with cached charts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark: structural diff of nested snapshot trees.
+
+Usage:
+    python benchmarks/bench_diff.py [weapons]
+
+Defaults to 50k weapons, each with a damage falloff curve, a per-armor
+table and attachment slots. Reports the one-off hashing time per snapshot,
+then the time to diff the hashed snapshots as the number of changed
+weapons grows, and a single-weapon diff (what the GUI popup runs).
+"""
+
+import copy
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_engines import make_snapshots, timed  # noqa: E402
+from patchforge_diff import SnapshotTree, diff_snapshots, diff_weapon  # noqa: E402
+
+SLOTS = ("Muzzle", "Optic", "Stock", "Magazine")
+
+
+def nested(data, rng):
+    for w in data["weapons"]:
+        w["stats"]["falloff"] = [[d, round(1 - d / 200, 2)] for d in range(10, 110, 10)]
+        w["stats"]["armor"] = {"light": 1.0, "medium": 0.85, "heavy": 0.7}
+        w["attachments"] = [{"slot": s, "max": rng.randint(1, 3)} for s in SLOTS]
+    return data
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    rng = random.Random(4)
+    old = nested(make_snapshots(size)[0], rng)
+    old_tree, seconds = timed(SnapshotTree, old)
+    print(f"{size:,} weapons: hashed in {seconds:.2f}s (once per snapshot)")
+
+    for changed in (10, 1_000, 10_000):
+        new = copy.deepcopy(old)
+        for w in rng.sample(new["weapons"], min(changed, size)):
+            w["stats"]["falloff"][rng.randrange(10)][1] = 0.33
+            w["attachments"][rng.randrange(4)]["max"] += 1
+        new_tree = SnapshotTree(new)
+        changes, seconds = timed(diff_snapshots, old_tree, new_tree)
+        print(f"  {changed:>6,} weapons changed: {len(changes):>6,} paths in {seconds * 1000:8.1f} ms")
+
+    name = new["weapons"][0]["name"]
+    start = time.perf_counter()
+    for _ in range(1000):
+        diff_weapon(old_tree, new_tree, name)
+    print(f"single-weapon diff: {(time.perf_counter() - start):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: pure Python vs columnar comparison engine.
+
+Usage:
+    python benchmarks/bench_engines.py [sizes...]
+
+Defaults to 1k, 10k and 100k weapons. Both engines are checked for
+identical output on every size before timing is reported.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from patchforge_core import METRICS, compare_jsons, summarize_results  # noqa: E402
+import patchforge_columnar  # noqa: E402,F401  (keep the NumPy import out of the timings)
+
+
+def make_snapshots(count: int, seed: int = 1):
+    """Build an (old, new) pair with ~30% changed and ~2% missing stats."""
+    rng = random.Random(seed)
+    old_weapons, new_weapons = [], []
+    for i in range(count):
+        old_stats, new_stats = {}, {}
+        for key, _ in METRICS:
+            value = round(rng.uniform(1, 100), 2)
+            if rng.random() > 0.02:
+                old_stats[key] = value
+            if rng.random() > 0.02:
+                new_stats[key] = value + round(rng.uniform(-10, 10), 2) if rng.random() < 0.3 else value
+        old_weapons.append({"name": f"Weapon {i:06d}", "stats": old_stats})
+        new_weapons.append({"name": f"Weapon {i:06d}", "stats": new_stats})
+    return {"weapons": old_weapons}, {"weapons": new_weapons}
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    sizes = [int(s) for s in sys.argv[1:]] or [1_000, 10_000, 100_000]
+
+    print(f"{'weapons':>8} {'python':>10} {'columnar':>10} {'speedup':>8}")
+    for size in sizes:
+        old, new = make_snapshots(size)
+
+        py_results, py_compare = timed(compare_jsons, old, new)
+        py_summary, py_sum = timed(summarize_results, py_results)
+
+        col_results, col_compare = timed(compare_jsons, old, new, engine="columnar")
+        col_summary, col_sum = timed(summarize_results, col_results)
+
+        assert list(col_results) == py_results, "row mismatch"
+        assert col_summary == py_summary, "summary mismatch"
+
+        py_total = py_compare + py_sum
+        col_total = col_compare + col_sum
+        print(f"{size:>8} {py_total:>9.3f}s {col_total:>9.3f}s {py_total / col_total:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
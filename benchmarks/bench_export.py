@@ -0,0 +1,48 @@
+"""
+Benchmark: streaming report exporters.
+
+Usage:
+    python benchmarks/bench_export.py [weapons]
+
+Defaults to 150k weapons (~1M rows). Writes every format, plain and
+gzipped, from CompactResults and reports throughput (uncompressed MB/s)
+and the peak memory allocated while writing.
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_engines import make_snapshots, timed  # noqa: E402
+from patchforge_core import compare_jsons  # noqa: E402
+from patchforge_export import EXPORT_FORMATS, export_results  # noqa: E402
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 150_000
+    old, new = make_snapshots(size)
+    results = compare_jsons(old, new, engine="compact")
+    del old, new
+
+    print(f"{len(results):,} rows")
+    print(f"  {'format':10} {'MB':>8} {'seconds':>8} {'MB/s':>7} {'peak mem':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in EXPORT_FORMATS:
+            for compress in (False, True):
+                path = os.path.join(tmp, f"report.{fmt}" + (".gz" if compress else ""))
+                tracemalloc.start()
+                written, seconds = timed(export_results, results, path, fmt, compress)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                # throughput without tracemalloc overhead
+                written, seconds = timed(export_results, results, path, fmt, compress)
+                label = fmt + (".gz" if compress else "")
+                print(f"  {label:10} {written / 2**20:>8.1f} {seconds:>8.2f} {written / 2**20 / seconds:>7.1f} "
+                      f"{peak / 2**20:>7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
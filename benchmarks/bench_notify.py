@@ -0,0 +1,90 @@
+"""
+Benchmark: notification dispatcher throughput against a local stub webhook.
+
+Usage:
+    python benchmarks/bench_notify.py [messages] [endpoints]
+
+Defaults to 2000 messages fanned out to 10 endpoints. The stub server
+answers 204 over keep-alive connections and rate-limits ~1% of requests
+with a 429, so the retry path is exercised too. Reports messages/s and
+requests/s, and checks every (message, endpoint) pair arrived.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_engines import make_snapshots  # noqa: E402
+from patchforge_core import compare_jsons, summarize_results  # noqa: E402
+from patchforge_notify import NotificationDispatcher, render_message, top_changes  # noqa: E402
+
+
+class StubWebhook:
+    """Minimal keep-alive HTTP server that counts POSTs per path."""
+
+    def __init__(self, limit_every: int = 100):
+        self.limit_every = limit_every
+        self.requests = 0
+        self.received = {}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                path = lines[0].split()[1]
+                length = next(int(line.split(":")[1]) for line in lines if line.lower().startswith("content-length"))
+                await reader.readexactly(length)
+                self.requests += 1
+                if self.limit_every and self.requests % self.limit_every == 0:
+                    body = b'{"retry_after": 0.01}'
+                    writer.write(b"HTTP/1.1 429 Too Many Requests\r\nContent-Type: application/json\r\n"
+                                 b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+                else:
+                    self.received[path] = self.received.get(path, 0) + 1
+                    writer.write(b"HTTP/1.1 204 No Content\r\n\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def run(messages: int, endpoints: int):
+    stub = StubWebhook()
+    server = await asyncio.start_server(stub.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    old, new = make_snapshots(2000)
+    results = compare_jsons(old, new)
+    body = render_message(summarize_results(results), top_changes(results))
+
+    dispatcher = NotificationDispatcher([f"http://127.0.0.1:{port}/hook/{i}" for i in range(endpoints)],
+                                        queue_size=64)
+    await dispatcher.start()
+    start = time.perf_counter()
+    for _ in range(messages):
+        await dispatcher.submit(body)
+    await dispatcher.close()
+    seconds = time.perf_counter() - start
+
+    server.close()
+    await server.wait_closed()
+
+    assert all(stub.received.get(f"/hook/{i}") == messages for i in range(endpoints)), "lost deliveries"
+    print(f"{messages} messages × {endpoints} endpoints in {seconds:.2f}s")
+    print(f"  {messages / seconds:,.0f} messages/s, {messages * endpoints / seconds:,.0f} requests/s")
+    print(f"  stats: {dispatcher.stats}")
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    endpoints = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    asyncio.run(run(messages, endpoints))
+
+
+if __name__ == "__main__":
+    main()
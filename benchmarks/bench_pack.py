@@ -0,0 +1,57 @@
+"""
+Benchmark: JSON snapshots vs packed (memory-mapped) snapshots.
+
+Usage:
+    python benchmarks/bench_pack.py [weapons]
+
+Times loading a pinned baseline and a full columnar compare from each format.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_engines import make_snapshots, timed  # noqa: E402
+from patchforge_core import load_json, compare_jsons, summarize_results  # noqa: E402
+from patchforge_pack import pack_snapshot  # noqa: E402
+import patchforge_columnar  # noqa: E402,F401
+
+
+def run(old_path, new_path):
+    old, t_old = timed(load_json, old_path)
+    new, t_new = timed(load_json, new_path)
+    results, t_cmp = timed(compare_jsons, old, new, engine="columnar")
+    summary, t_sum = timed(summarize_results, results)
+    return summary, t_old, t_old + t_new + t_cmp + t_sum
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    old, new = make_snapshots(size)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {}
+        for label, data in (("old", old), ("new", new)):
+            paths[label + ".json"] = os.path.join(tmp, label + ".json")
+            paths[label + ".pfpack"] = os.path.join(tmp, label + ".pfpack")
+            with open(paths[label + ".json"], "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            pack_snapshot(data, paths[label + ".pfpack"])
+
+        json_summary, json_load, json_total = run(paths["old.json"], paths["new.json"])
+        pack_summary, pack_load, pack_total = run(paths["old.pfpack"], paths["new.pfpack"])
+        assert json_summary == pack_summary, "summary mismatch"
+
+        print(f"{size} weapons")
+        print(f"  {'':8} {'load baseline':>14} {'load+compare':>13} {'file size':>12}")
+        print(f"  {'json':8} {json_load:>13.4f}s {json_total:>12.3f}s "
+              f"{os.path.getsize(paths['old.json']):>12,}")
+        print(f"  {'pfpack':8} {pack_load:>13.4f}s {pack_total:>12.3f}s "
+              f"{os.path.getsize(paths['old.pfpack']):>12,}")
+
+
+if __name__ == "__main__":
+    main()
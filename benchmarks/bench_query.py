@@ -0,0 +1,97 @@
+"""
+Benchmark: indexed result queries against a linear scan.
+
+Usage:
+    python benchmarks/bench_query.py [weapons]
+
+Defaults to 150k weapons (~1M rows, compact results). Reports the index
+build time, then for each query the match count, the indexed time to
+count the matches and fetch the first page (largest |Δ| first) and the
+time of the same filter as a scan over every row.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_engines import make_snapshots, timed  # noqa: E402
+from patchforge_core import compare_jsons  # noqa: E402
+from patchforge_export import iter_rows  # noqa: E402
+from patchforge_query import QUERY_LIMIT, ResultIndex, parse_query  # noqa: E402
+
+RARITIES = ("Common", "Uncommon", "Rare", "Epic", "Legendary")
+QUERIES = (
+    "rarity=Rare metric=headDamage kind=nerf |delta|>5",
+    "kind=buff",
+    "metric=magSize delta<=-5",
+    "|delta|>9.9",
+    "weapon='Weapon 001234'",
+    "Weapon 00123",
+)
+_STATUS_KINDS = {"success": "buff", "danger": "nerf"}
+
+
+def scan(results, rarities, query):
+    """The same filter as a pass over every row (only what QUERIES use)."""
+    conditions = [(field, op, value) for field, op, value in query.get("where", [])]
+    metric = {m.lower() for m in query.get("metric", [])}
+    kind = set(query.get("kind", []))
+    rarity = {r.lower() for r in query.get("rarity", [])}
+    weapon = {w.lower() for w in query.get("weapon", [])}
+    text = query.get("text", "").lower()
+    hits = 0
+    for r in iter_rows(results):
+        if metric and r["metric"].lower() not in metric:
+            continue
+        if kind and _STATUS_KINDS.get(r["status"]) not in kind:
+            continue
+        if rarity and rarities.get(r["weapon"], "").lower() not in rarity:
+            continue
+        if weapon and r["weapon"].lower() not in weapon:
+            continue
+        if text and text not in r["weapon"].lower():
+            continue
+        if conditions:
+            if r["delta"] is None:
+                continue
+            ok = True
+            for field, op, value in conditions:
+                d = abs(r["delta"]) if field == "abs" else r["delta"]
+                ok = ok and {">": d > value, ">=": d >= value, "<": d < value, "<=": d <= value}[op]
+            if not ok:
+                continue
+        hits += 1
+    return hits
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 150_000
+    old, new = make_snapshots(size)
+    rng = random.Random(7)
+    rarities = {w["name"]: rng.choice(RARITIES) for w in old["weapons"]}
+    results = compare_jsons(old, new, engine="compact")
+    del old, new
+
+    index, seconds = timed(ResultIndex, results, rarities)
+    print(f"{len(results):,} rows, index built in {seconds:.2f}s")
+    print(f"  {'query':<52} {'matches':>9} {'indexed ms':>11} {'scan ms':>9}")
+    for text in QUERIES:
+        query = parse_query(text)
+        best = None
+        for _ in range(20):
+            start = time.perf_counter()
+            hits = index.query(**query)
+            count = len(hits)
+            hits.rows(QUERY_LIMIT)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        scanned, scan_seconds = timed(scan, results, rarities, query)
+        assert scanned == count, (text, scanned, count)
+        print(f"  {text:<52} {count:>9,} {best * 1000:>11.3f} {scan_seconds * 1000:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark: rename resolution with the trigram index.
+
+Usage:
+    python benchmarks/bench_rename.py [weapons] [renames]
+
+Defaults to 50k weapons with 2k renamed (suffixes, prefixes, punctuation)
+and another 1k replaced by unrelated new weapons. Reports the resolution
+time and how many renames were found, wrong or missed.
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_engines import make_snapshots, timed  # noqa: E402
+from patchforge_core import build_weapon_map  # noqa: E402
+from patchforge_rename import find_renames  # noqa: E402
+
+WORDS = ("Ferro", "Anvil", "Kettle", "Rattler", "Stitcher", "Arpeggio", "Toro", "Venator",
+         "Bobcat", "Tempest", "Vulcano", "Hullcracker", "Osprey", "Torrent", "Renegade")
+
+
+def rename(name, rng):
+    return rng.choice((f"{name} Mk II", name.replace(" ", "-", 1), f"{name} Prime", f"The {name}"))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    rng = random.Random(2)
+    old, new = make_snapshots(size)
+    for i, (a, b) in enumerate(zip(old["weapons"], new["weapons"])):
+        a["name"] = b["name"] = f"{rng.choice(WORDS)} {rng.choice(WORDS)} {i}"
+
+    expected = {}
+    picked = rng.sample(range(size), count + count // 2)
+    for i in picked[:count]:
+        weapon = new["weapons"][i]
+        renamed = rename(weapon["name"], rng)
+        expected[weapon["name"]] = renamed
+        weapon["name"] = renamed
+    for i in picked[count:]:
+        weapon = new["weapons"][i]
+        weapon["name"] = f"Brand New {i}"
+        weapon["stats"] = {k: rng.uniform(1, 100) for k in weapon["stats"]}
+
+    old_map, new_map = build_weapon_map(old), build_weapon_map(new)
+    renames, seconds = timed(find_renames, old_map, new_map)
+    correct = sum(1 for name, (found, _) in renames.items() if expected.get(name) == found)
+    unmatched = sum(1 for name in old_map if name not in new_map)
+    print(f"{size:,} weapons, {unmatched:,} unmatched old names: resolved in {seconds:.2f}s")
+    print(f"{correct:,} correct, {len(renames) - correct:,} wrong, {len(expected) - correct:,} missed")
+
+
+if __name__ == "__main__":
+    main()
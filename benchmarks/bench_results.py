@@ -0,0 +1,51 @@
+"""
+Benchmark: memory held by comparison results, dict rows vs CompactResults.
+
+Usage:
+    python benchmarks/bench_results.py [sizes...]
+
+Defaults to 10k and 100k weapons (7 rows each). Measures the memory still
+allocated once the results are built (tracemalloc), and checks that both
+containers yield the same rows and summary.
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_engines import make_snapshots, timed  # noqa: E402
+from patchforge_core import build_weapon_map, compare_maps, summarize_results  # noqa: E402
+
+
+def retained(fn, *args, **kwargs):
+    """(result, bytes still allocated after fn returns, seconds)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result, seconds = timed(fn, *args, **kwargs)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before, seconds
+
+
+def main():
+    sizes = [int(s) for s in sys.argv[1:]] or [10_000, 100_000]
+
+    print(f"{'rows':>9} {'dicts':>11} {'compact':>11} {'ratio':>6} {'dicts s':>8} {'compact s':>10}")
+    for size in sizes:
+        old, new = make_snapshots(size)
+        old_map, new_map = build_weapon_map(old), build_weapon_map(new)
+
+        dict_rows, dict_bytes, dict_s = retained(compare_maps, old_map, new_map)
+        compact, compact_bytes, compact_s = retained(compare_maps, old_map, new_map, engine="compact")
+
+        assert list(compact) == dict_rows, "row mismatch"
+        assert summarize_results(compact) == summarize_results(dict_rows), "summary mismatch"
+
+        print(f"{len(dict_rows):>9,} {dict_bytes / 2**20:>9.1f}MB {compact_bytes / 2**20:>9.1f}MB "
+              f"{dict_bytes / compact_bytes:>5.1f}x {dict_s:>7.2f}s {compact_s:>9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
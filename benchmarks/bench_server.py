@@ -0,0 +1,107 @@
+"""
+Load test: local query service.
+
+Usage:
+    python benchmarks/bench_server.py [requests] [clients] [weapons]
+
+Defaults to 5000 requests from 8 keep-alive clients against 4 snapshots
+of 2000 weapons. The request mix cycles through /summary, /compare
+(changed rows, limited), /weapon/<name>/history and /snapshots, so after
+the first round most answers come from the response cache. Reports
+requests/s and p50 / p99 latency, plus the cost of the cold first request.
+"""
+
+import http.client
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bench_engines import make_snapshots  # noqa: E402
+from patchforge_server import SnapshotIndex, make_server  # noqa: E402
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    weapons = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i, seed in enumerate((1, 2, 3, 4)):
+            _, data = make_snapshots(weapons, seed=seed)
+            paths.append(os.path.join(tmp, f"patch{i + 1}.json"))
+            with open(paths[-1], "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        index = SnapshotIndex(paths)
+
+    server = make_server(index, port=0)
+    host, port = server.server_address[:2]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    targets = [
+        "/summary",
+        "/compare?old=patch1&new=patch2&changed=1&limit=100",
+        "/compare?old=patch2&new=patch4&changed=1&limit=100",
+        f"/weapon/{quote('Weapon 000042')}/history",
+        "/summary?old=patch1&new=patch3",
+        "/snapshots",
+    ]
+
+    def get(conn, target):
+        conn.request("GET", target)
+        response = conn.getresponse()
+        body = response.read()
+        assert response.status == 200, (target, response.status, body[:200])
+        return body
+
+    conn = http.client.HTTPConnection(host, port)
+    start = time.perf_counter()
+    get(conn, "/compare?old=patch1&new=patch4&changed=1&limit=100")
+    cold = time.perf_counter() - start
+    conn.close()
+
+    latencies = []
+    lock = threading.Lock()
+
+    def client(n, offset):
+        conn = http.client.HTTPConnection(host, port)
+        mine = []
+        for i in range(n):
+            t = time.perf_counter()
+            get(conn, targets[(offset + i) % len(targets)])
+            mine.append(time.perf_counter() - t)
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+
+    per_client = total // clients
+    threads = [threading.Thread(target=client, args=(per_client, c)) for c in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    seconds = time.perf_counter() - start
+    server.shutdown()
+
+    print(f"{len(latencies)} requests, {clients} clients, {weapons} weapons × 4 snapshots")
+    print(f"  cold compare:  {cold * 1000:.1f} ms")
+    print(f"  throughput:    {len(latencies) / seconds:,.0f} req/s")
+    print(f"  latency p50:   {percentile(latencies, 50) * 1000:.2f} ms")
+    print(f"  latency p99:   {percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"  response cache: {index.responses.hits} hits, {index.responses.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
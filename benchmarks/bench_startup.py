@@ -0,0 +1,102 @@
+"""
+Benchmark: cold start of the CLI and the GUI module.
+
+Usage:
+    python benchmarks/bench_startup.py [runs]
+
+Each measurement is a fresh interpreter (best of `runs`, default 5):
+  * `-X importtime` totals for patchforge_cli and patchforge, with the
+    slowest imports by cumulative time;
+  * wall time of `patchforge_cli.py summary` on two tiny snapshots, i.e.
+    what a user waits for from the shell prompt;
+  * GUI window construction, only when a display is available.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from bench_engines import make_snapshots  # noqa: E402
+
+GUI_SCRIPT = """
+import time
+start = time.perf_counter()
+import ttkbootstrap as tb
+import patchforge
+app = tb.Window(themename="darkly")
+patchforge.PatchForgeApp(app)
+app.update()
+print(time.perf_counter() - start)
+app.destroy()
+"""
+
+
+def import_times(module: str):
+    """(total seconds, [(cumulative seconds, module), ...]) from -X importtime."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        entries.append((int(cumulative) / 1e6, name.strip()))
+    # the module itself is the last line; its cumulative time covers everything it pulled in
+    total = next(seconds for seconds, name in reversed(entries) if name == module)
+    return total, entries
+
+
+def best_of(runs: int, fn):
+    return min(fn() for _ in range(runs))
+
+
+def wall(cmd):
+    start = time.perf_counter()
+    subprocess.run(cmd, cwd=ROOT, capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    for module in ("patchforge_cli", "patchforge"):
+        try:
+            total = best_of(runs, lambda: import_times(module)[0])
+        except subprocess.CalledProcessError as e:
+            print(f"{module:<16} import failed: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        _, entries = import_times(module)
+        print(f"{module:<16} import {total * 1000:7.1f} ms (best of {runs})")
+        for seconds, name in sorted(entries, reverse=True)[1:6]:
+            print(f"    {name:<36} {seconds * 1000:7.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i, data in enumerate(make_snapshots(20)):
+            paths.append(os.path.join(tmp, f"patch{i + 1}.json"))
+            with open(paths[-1], "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        cmd = [sys.executable, "patchforge_cli.py", "summary", *paths]
+        baseline = best_of(runs, lambda: wall([sys.executable, "-c", "pass"]))
+        seconds = best_of(runs, lambda: wall(cmd))
+        print(f"\ncli summary      {seconds * 1000:7.1f} ms wall "
+              f"({(seconds - baseline) * 1000:.1f} ms over a bare interpreter)")
+
+    if sys.platform != "win32" and not os.environ.get("DISPLAY"):
+        print("gui window       skipped (no display)")
+        return
+    proc = subprocess.run([sys.executable, "-c", GUI_SCRIPT], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode:
+        print("gui window       skipped (Tk unavailable)")
+    else:
+        print(f"gui window       {float(proc.stdout.strip()) * 1000:7.1f} ms to first paint")
+
+
+if __name__ == "__main__":
+    main()
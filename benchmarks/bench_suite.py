@@ -0,0 +1,160 @@
+"""
+Benchmark suite: the whole pipeline on generated snapshots, with baselines.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes N ...] [--repeat N] [--engine E]
+                                     [--save-baseline] [--baseline PATH] [--tolerance T]
+                                     [--change-rate R] [--missing R] [--metrics N] [--seed S]
+
+For every size, a snapshot pair is generated (see snapgen.py), written to
+a temp folder and run through load_json (both files), compare_jsons,
+summarize_results and the CSV and HTML exporters. Each step reports the
+best wall time of `repeat` runs, throughput (MB/s of JSON for loading,
+rows/s otherwise) and the peak memory it allocated, which is measured in
+a separate tracemalloc pass so tracing does not skew the timings.
+
+--save-baseline writes the results to the baseline file (default
+benchmarks/baseline.json). Later runs with the same generator settings
+are compared against it; a step slower than baseline × (1 + tolerance)
+is flagged and makes the script exit with status 1. Baselines are only
+meaningful on the machine that recorded them.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from snapgen import add_generator_options, generator_options, write_pair  # noqa: E402
+from patchforge_core import ENGINES, compare_jsons, load_json, summarize_results  # noqa: E402
+from patchforge_export import export_results  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+STEPS = ("load", "compare", "summarize", "export csv", "export html")
+
+
+def best_time(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return result, best
+
+
+def peak_memory(fn):
+    """Peak bytes allocated while fn runs (inputs allocated before are not counted)."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_size(size, options, engine, repeat, tmp):
+    old_path, new_path = write_pair(os.path.join(tmp, str(size)), size, **options)
+    json_bytes = os.path.getsize(old_path) + os.path.getsize(new_path)
+
+    load = lambda: (load_json(old_path), load_json(new_path))  # noqa: E731
+    (old, new), load_s = best_time(load, repeat)
+    results, compare_s = best_time(lambda: compare_jsons(old, new, engine=engine), repeat)
+    rows = len(results)
+    _, summarize_s = best_time(lambda: summarize_results(results), repeat)
+    csv_path, html_path = os.path.join(tmp, "report.csv"), os.path.join(tmp, "report.html")
+    _, csv_s = best_time(lambda: export_results(results, csv_path, "csv"), repeat)
+    _, html_s = best_time(lambda: export_results(results, html_path, "html"), repeat)
+
+    steps = {
+        "load": (load_s, json_bytes / 1e6 / load_s, "MB/s", load),
+        "compare": (compare_s, rows / compare_s, "rows/s", lambda: compare_jsons(old, new, engine=engine)),
+        "summarize": (summarize_s, rows / summarize_s, "rows/s", lambda: summarize_results(results)),
+        "export csv": (csv_s, rows / csv_s, "rows/s", lambda: export_results(results, csv_path, "csv")),
+        "export html": (html_s, rows / html_s, "rows/s", lambda: export_results(results, html_path, "html")),
+    }
+    return rows, {
+        step: {"seconds": seconds, "throughput": rate, "unit": unit, "peak": peak_memory(fn)}
+        for step, (seconds, rate, unit, fn) in steps.items()
+    }
+
+
+def compare_to_baseline(baseline, results, tolerance):
+    """Yield (size, step, ratio, flag) for every step the baseline also has."""
+    for size, steps in results.items():
+        known = baseline["results"].get(size, {}).get("steps", {})
+        for step, r in steps["steps"].items():
+            if step not in known:
+                continue
+            ratio = r["seconds"] / known[step]["seconds"]
+            flag = "REGRESSION" if ratio > 1 + tolerance else "faster" if ratio < 1 - tolerance else ""
+            yield size, step, ratio, flag
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PatchForge pipeline benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="Weapons per snapshot (default: 1000 10000 100000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per step; the best counts")
+    parser.add_argument("--engine", choices=ENGINES, default="python")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON path")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Allowed slowdown before a step is flagged (default 0.15 = 15%%)")
+    add_generator_options(parser)
+    args = parser.parse_args()
+    options = generator_options(args)
+
+    report = {
+        "generator": options,
+        "engine": args.engine,
+        "repeat": args.repeat,
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "results": {},
+    }
+    print(f"{'weapons':>8} {'rows':>9}  {'step':<12} {'seconds':>9} {'throughput':>17} {'peak MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            rows, steps = run_size(size, options, args.engine, args.repeat, tmp)
+            report["results"][str(size)] = {"rows": rows, "steps": steps}
+            for step in STEPS:
+                r = steps[step]
+                print(f"{size:>8} {rows:>9,}  {step:<12} {r['seconds']:>9.4f} "
+                      f"{r['throughput']:>10,.0f} {r['unit']:<6} {r['peak'] / 1e6:>8.1f}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Baseline saved: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline} (record one with --save-baseline)")
+        return
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if (baseline["generator"], baseline["engine"]) != (options, args.engine):
+        print(f"\n⚠️  Baseline was recorded with different settings "
+              f"({baseline['generator']}, engine {baseline['engine']}); not compared")
+        return
+
+    print(f"\nAgainst baseline ({baseline['machine']}, Python {baseline['python']}):")
+    regressions = 0
+    for size, step, ratio, flag in compare_to_baseline(baseline, report["results"], args.tolerance):
+        regressions += flag == "REGRESSION"
+        print(f"{size:>8}  {step:<12} {ratio:>6.2f}x time  {flag}")
+    if regressions:
+        print(f"❌ {regressions} step(s) slower than baseline by more than {args.tolerance:.0%}")
+        sys.exit(1)
+    print("✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
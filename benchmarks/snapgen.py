@@ -0,0 +1,101 @@
+"""
+Deterministic synthetic snapshot generator.
+
+Usage:
+    python benchmarks/snapgen.py OUT_DIR [--weapons N] [--change-rate R]
+                                 [--missing R] [--metrics N] [--seed S]
+
+Writes OUT_DIR/old.json and OUT_DIR/new.json. The same arguments always
+produce byte-identical files, so timings taken on different commits (or
+machines) compare like with like.
+
+The first `metrics` stats are the ones PatchForge compares (METRICS order);
+past the seventh, extra filler stats are added, which the comparison
+ignores but loading still has to parse.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from typing import Dict, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from patchforge_core import METRICS  # noqa: E402
+
+INT_METRICS = {"magSize"}
+
+
+def metric_names(count: int):
+    names = [key for key, _ in METRICS[:count]]
+    names += [f"extraStat{i:02d}" for i in range(count - len(names))]
+    return names
+
+
+def generate_pair(weapons: int, change_rate: float = 0.3, missing: float = 0.02,
+                  metrics: int = len(METRICS), seed: int = 1) -> Tuple[Dict, Dict]:
+    """
+    (old, new) snapshots with `weapons` weapons each. Every stat changes with
+    probability change_rate and is absent from either side with probability
+    missing.
+    """
+    rng = random.Random(seed)
+    names = metric_names(metrics)
+    old_weapons, new_weapons = [], []
+    for i in range(weapons):
+        old_stats, new_stats = {}, {}
+        for key in names:
+            if key in INT_METRICS:
+                value = rng.randint(5, 60)
+                changed = value + rng.choice((-5, -2, -1, 1, 2, 5))
+            else:
+                value = round(rng.uniform(1, 100), 2)
+                changed = round(value + rng.uniform(-10, 10), 2)
+            if rng.random() >= missing:
+                old_stats[key] = value
+            if rng.random() >= missing:
+                new_stats[key] = changed if rng.random() < change_rate else value
+        name = f"Weapon {i:06d}"
+        old_weapons.append({"name": name, "stats": old_stats})
+        new_weapons.append({"name": name, "stats": new_stats})
+    return {"weapons": old_weapons}, {"weapons": new_weapons}
+
+
+def write_pair(directory: str, weapons: int, **options) -> Tuple[str, str]:
+    """Generate a pair into directory; returns the (old, new) paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for label, data in zip(("old", "new"), generate_pair(weapons, **options)):
+        paths.append(os.path.join(directory, f"{label}.json"))
+        with open(paths[-1], "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    return paths[0], paths[1]
+
+
+def add_generator_options(p):
+    p.add_argument("--change-rate", type=float, default=0.3, help="Share of stats that change (default 0.3)")
+    p.add_argument("--missing", type=float, default=0.02, help="Share of stats missing per side (default 0.02)")
+    p.add_argument("--metrics", type=int, default=len(METRICS), help="Stats per weapon (default 7)")
+    p.add_argument("--seed", type=int, default=1, help="Random seed (default 1)")
+
+
+def generator_options(args) -> Dict:
+    return {"change_rate": args.change_rate, "missing": args.missing, "metrics": args.metrics, "seed": args.seed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic old/new snapshot pair")
+    parser.add_argument("out", help="Output folder")
+    parser.add_argument("--weapons", type=int, default=10_000, help="Weapons per snapshot (default 10000)")
+    add_generator_options(parser)
+    args = parser.parse_args()
+
+    old, new = write_pair(args.out, args.weapons, **generator_options(args))
+    print(f"✅ {old} ({os.path.getsize(old):,} bytes)")
+    print(f"✅ {new} ({os.path.getsize(new):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,41 @@
+import base64
+import bisect
+from array import array
 import json
 import os
-import csv
+import itertools
 import math
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
-from difflib import HtmlDiff
 
-# Matplotlib for charts
-import matplotlib
-matplotlib.use("Agg")  # safer for some environments; switched to TkAgg on-demand
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+# matplotlib (charts, see patchforge_charts) is imported where it is used: it alone costs
+# more than the rest of startup, and most sessions never open a chart
+
+from patchforge_core import (
+    ComparisonResult, build_weapon_map, compare_weapon, get_schema, iter_weapons, set_schema, weapon_fingerprint
+)
+from patchforge_charts import CHART_TITLES, chart_images, chart_key
+from patchforge_diff import SnapshotTree, diff_weapon
+from patchforge_export import csv_chunks, html_chunks, jsonl_chunks, write_chunks
+from patchforge_profile import Profiler
+from patchforge_query import ResultIndex, is_structured, parse_query
+from patchforge_rank import rank_changes, rarity_map
+from patchforge_schema import find_schema
+from patchforge_results import (
+    CHANGES as RESULT_CHANGES, KIND_EMPTY, STATUSES as RESULT_STATUSES, CompactResults, ResultRow
+)
+
+# Background jobs hand results to the Tk thread through a queue that is drained
+# every UI_POLL_MS, spending at most UI_BATCH_SECONDS per tick so redraws stay fast.
+UI_POLL_MS = 15
+UI_BATCH_SECONDS = 0.02
+JOB_QUEUE_SIZE = 2000
 
 # ---------------------------------------------------------
 # SETTINGS HANDLER (auto-save last JSON paths)
@@ -36,6 +59,165 @@ def save_settings(data: dict):
         pass
 
 
+# ---------------------------------------------------------
+# VIRTUAL TABLE BACKING STORE
+# ---------------------------------------------------------
+OVERALL = "— overall —"
+CHANGE_PREFIXES = {"secondary": "⚪", "success": "🟩", "danger": "🟥", "warning": "🟨"}
+CHANGES = RESULT_CHANGES + ("Mixed",)
+CHANGE_STYLES = RESULT_STATUSES + ("warning",)
+CHANGE_LABELS = tuple(f"{CHANGE_PREFIXES[style]} {change}" for change, style in zip(CHANGES, CHANGE_STYLES))
+_MIXED = len(RESULT_CHANGES)
+TABLE_COLUMNS = ("Weapon", "Metric", "Old", "New", "Δ", "Status")
+
+
+def display_row(r):
+    """(Treeview values, style tag) for one core result row."""
+    delta_str = "–" if r["delta"] is None else f"{r['delta']:+.2f}"
+    values = (r["weapon"], r["metric"], "" if r["old"] is None else r["old"],
+              "" if r["new"] is None else r["new"], delta_str, f"{CHANGE_PREFIXES[r['status']]} {r['change']}")
+    return values, r["status"]
+
+
+def overall_row(name):
+    """Display row flagging a weapon that got both buffs and nerfs."""
+    return (name, OVERALL, "", "", "", CHANGE_LABELS[_MIXED]), "warning"
+
+
+def weapon_display_rows(rows):
+    """Display rows for one weapon's result rows, plus the overall row when it is mixed."""
+    statuses = set()
+    for r in rows:
+        statuses.add(r["status"])
+        yield display_row(r)
+    if "success" in statuses and "danger" in statuses:
+        yield overall_row(rows[0]["weapon"])
+
+
+def table_rows(store, view, result):
+    """
+    (values, style) display rows in table order: the sorted/filtered view of
+    a RowStore when store is set, else the result grouped by weapon. Takes
+    plain objects so it can run on the worker thread.
+    """
+    if store is not None:
+        for index in view:
+            yield store.display(index)
+        return
+    if result is not None:
+        for _, rows in itertools.groupby(result, key=lambda r: r["weapon"]):
+            yield from weapon_display_rows(list(rows))
+
+
+def html_report_chunks(rows, charts_job):
+    """
+    HTML report of display rows with the summary charts embedded. Iterated on the
+    worker thread, where charts_job (queued before the export) has already finished.
+    """
+    charts = None if charts_job.exception() else charts_job.result()
+    images = {CHART_TITLES[name]: png for name, png in charts.items()} if charts else None
+    yield from html_chunks(TABLE_COLUMNS, rows, images=images)
+
+
+class RowStore(CompactResults):
+    """
+    CompactResults plus the table's "overall" rows for mixed weapons.
+    Rows are only turned into tuples for the visible viewport, exports and
+    summary iteration.
+    """
+
+    def __init__(self, rarities=None):
+        super().__init__()
+        self.mixed = 0               # overall rows (not part of the comparison result)
+        self.rarities = rarities or {}
+        self._index = None
+
+    def append_weapon(self, rows):
+        """Add one weapon's result rows (weapons must arrive in name order)."""
+        self.extend(rows)
+        statuses = {r["status"] for r in rows}
+        if "success" in statuses and "danger" in statuses:
+            self._append(rows[0]["weapon"], OVERALL, None, None, None, _MIXED)
+            self.mixed += 1
+
+    def results(self):
+        """The comparison rows, without the overall display rows."""
+        return _StoreRows(self)
+
+    def display(self, i):
+        """(Treeview values, style tag) for one row."""
+        if self.code[i] == _MIXED:
+            return overall_row(self.names[self.weapon[i]])
+        return display_row(ResultRow(self, i))
+
+    def index(self):
+        """ResultIndex over the result rows, built on first use (store indices are its row ids)."""
+        if self._index is None:
+            self._index = ResultIndex(self, self.rarities)
+        return self._index
+
+    def ordered(self, column=None, reverse=False, text=""):
+        """
+        Row indices filtered by text, a query such as `kind=nerf |delta|>5`
+        (answered from the index) or a case-insensitive substring, and sorted
+        by a table column.
+        """
+        text = text.strip()
+        if is_structured(text):
+            order = self.index().query(**parse_query(text)).ids()
+        else:
+            order = range(len(self))
+            text = text.lower()
+            if text:
+                weapons = {w for w, name in enumerate(self.names) if text in name.lower()}
+                metrics = {m for m, name in enumerate(self.metrics) if text in name.lower()}
+                codes = {c for c, label in enumerate(CHANGE_LABELS) if text in label.lower()}
+                order = [
+                    i for i in order
+                    if self.weapon[i] in weapons or self.metric[i] in metrics or self.code[i] in codes
+                ]
+
+        if column == "Weapon":
+            # names are interned in sorted order, so the weapon index sorts by name
+            order = sorted(order, key=self.weapon.__getitem__, reverse=reverse)
+        elif column == "Metric":
+            rank = {m: r for r, m in enumerate(sorted(range(len(self.metrics)), key=self.metrics.__getitem__))}
+            order = sorted(order, key=lambda i: rank[self.metric[i]], reverse=reverse)
+        elif column in ("Old", "New"):
+            values = self.old if column == "Old" else self.new
+            shift = 3 if column == "Old" else 1
+            # empty cells always sort last
+            order = sorted(
+                order,
+                key=lambda i: (self.kinds[i] // shift % 3 == KIND_EMPTY, -values[i] if reverse else values[i]),
+            )
+        elif column == "Δ":
+            order = sorted(
+                order, key=lambda i: (self.code[i] == 0, -self.delta[i] if reverse else self.delta[i])
+            )
+        elif column == "Status":
+            order = sorted(order, key=self.code.__getitem__, reverse=reverse)
+        return array("I", order)
+
+
+class _StoreRows:
+    """Result-row view of a RowStore, for ComparisonResult."""
+
+    __slots__ = ("store",)
+
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return len(self.store) - self.store.mixed
+
+    def __iter__(self):
+        store = self.store
+        for i in range(len(store)):
+            if store.code[i] != _MIXED:
+                yield ResultRow(store, i)
+
+
 # ---------------------------------------------------------
 # PATCHFORGE MAIN APP
 # ---------------------------------------------------------
@@ -47,24 +229,48 @@ class PatchForgeApp:
         self.root.geometry("1260x820")
 
         self.settings = load_settings()
+        try:
+            set_schema(find_schema())
+        except (OSError, ValueError) as e:
+            messagebox.showwarning("Metric schema", f"Ignoring invalid metrics.json, using the built-in metrics:\n{e}")
         self.old_path = self.settings.get("old_json", "")
         self.new_path = self.settings.get("new_json", "")
         self.old_data = {}
         self.new_data = {}
-
-        # last comparison cache for summary
-        self.last_rows = []          # list of (weapon, metric, old, new, delta, status_tag)
-        self.metrics_cfg = [
-            ("bodyDamage", True),
-            ("headDamage", True),
-            ("fireRate", True),
-            ("magSize", True),
-            ("timeToKill", False),
-            ("bodyDamageAfterFirstHit", True),
-            ("headDamageAfterFirstHit", True),
-        ]
+        self.old_tree = None         # SnapshotTree of each side, for the structural diff popup
+        self.new_tree = None
+
+        # last comparison, shared by the table, summary window and exporters
+        self.result = None           # ComparisonResult
+        self._partial = False        # last table comparison was cancelled half-way (no result)
+        self._weapon_state = {}      # weapon -> (stats fingerprint, tree item ids, result rows)
+
+        # virtual table mode: results live in a RowStore, only visible rows are materialized
+        self.virtual_var = tk.BooleanVar(value=bool(self.settings.get("virtual_table", False)))
+        self.filter_var = tk.StringVar()
+        self._store = None           # RowStore of the last virtual comparison
+        self._view = array("I")      # store indices after sorting / filtering
+        self._offset = 0             # first visible view position
+        self._sort = (None, False)   # (column, descending)
+        self._filter_after = None
+        self._result_index = (None, None)   # (result, ResultIndex) for queries in the normal table
+
+        # profiling: while the toggle is on, every job reports its stages to self.profiler
+        self.profile_var = tk.BooleanVar(value=False)
+        self.profiler = Profiler(enabled=False)
+        self._profile_win = None
+
+        # background work (loading / comparing) runs on one worker thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="patchforge")
+        self._cancel = None          # threading.Event of the running job, None when idle
+
+        # summary window data per comparison: (ComparisonResult, Future) and decoded chart images
+        self._summary_job = None
+        self._charts_job = None
+        self._photos = (None, {})    # (chart key, {chart name: PhotoImage})
 
         self._build_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
 
     # -----------------------------------------------------
     # UI
@@ -75,36 +281,56 @@ class PatchForgeApp:
 
         tb.Label(frm_top, text="PatchForge — Arc Raiders Patch Comparator", font=("Segoe UI", 14, "bold")).pack(side=LEFT, padx=10)
 
-        tb.Button(frm_top, text="Load OLD JSON", bootstyle=SECONDARY, command=self.load_old_json).pack(side=LEFT, padx=5)
+        self.btn_load_old = tb.Button(frm_top, text="Load OLD JSON", bootstyle=SECONDARY, command=self.load_old_json)
+        self.btn_load_old.pack(side=LEFT, padx=5)
         self.lbl_old = tb.Label(frm_top, text=os.path.basename(self.old_path) if self.old_path else "(not loaded)", bootstyle=SECONDARY)
         self.lbl_old.pack(side=LEFT, padx=(0, 15))
 
-        tb.Button(frm_top, text="Load NEW JSON", bootstyle=SECONDARY, command=self.load_new_json).pack(side=LEFT, padx=5)
+        self.btn_load_new = tb.Button(frm_top, text="Load NEW JSON", bootstyle=SECONDARY, command=self.load_new_json)
+        self.btn_load_new.pack(side=LEFT, padx=5)
         self.lbl_new = tb.Label(frm_top, text=os.path.basename(self.new_path) if self.new_path else "(not loaded)", bootstyle=SECONDARY)
         self.lbl_new.pack(side=LEFT, padx=(0, 15))
 
-        tb.Button(frm_top, text="Compare", bootstyle=PRIMARY, command=self.compare).pack(side=LEFT, padx=10)
+        self.btn_compare = tb.Button(frm_top, text="Compare", bootstyle=PRIMARY, command=self.compare)
+        self.btn_compare.pack(side=LEFT, padx=10)
         tb.Button(frm_top, text="Summary", bootstyle=INFO, command=self.open_summary).pack(side=LEFT, padx=5)
         tb.Button(frm_top, text="Export CSV", bootstyle=SUCCESS, command=self.export_csv).pack(side=LEFT, padx=5)
         tb.Button(frm_top, text="Export HTML", bootstyle=INFO, command=self.export_html).pack(side=LEFT, padx=5)
+        tb.Button(frm_top, text="Export JSONL", bootstyle=SECONDARY, command=self.export_jsonl).pack(side=LEFT, padx=5)
+
+        # table tools
+        frm_tools = tb.Frame(self.root, padding=(10, 0))
+        frm_tools.pack(fill=X)
+        tb.Checkbutton(frm_tools, text="Virtual table (large diffs)", variable=self.virtual_var,
+                       bootstyle="round-toggle", command=self._toggle_virtual).pack(side=LEFT)
+        tb.Checkbutton(frm_tools, text="Profile", variable=self.profile_var,
+                       bootstyle="round-toggle", command=self._toggle_profile).pack(side=LEFT, padx=(15, 0))
+        tb.Label(frm_tools, text="Filter (text, or e.g. rarity=Rare kind=nerf |delta|>5):",
+                 bootstyle=SECONDARY).pack(side=LEFT, padx=(20, 5))
+        self.ent_filter = tb.Entry(frm_tools, textvariable=self.filter_var, width=30)
+        self.ent_filter.pack(side=LEFT)
+        self.filter_var.trace_add("write", lambda *_: self._schedule_filter())
 
         # table
         frm_table = tb.Frame(self.root)
         frm_table.pack(fill=BOTH, expand=YES, padx=10, pady=(5, 5))
 
-        columns = ("Weapon", "Metric", "Old", "New", "Δ", "Status")
-        self.tree = ttk.Treeview(frm_table, columns=columns, show="headings")
-        for col in columns:
-            self.tree.heading(col, text=col)
+        self.tree = ttk.Treeview(frm_table, columns=TABLE_COLUMNS, show="headings")
+        for col in TABLE_COLUMNS:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
             width = 180 if col == "Weapon" else 120
             self.tree.column(col, anchor=CENTER, width=width)
         self.tree.pack(side=LEFT, fill=BOTH, expand=YES)
 
-        vsb = ttk.Scrollbar(frm_table, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscroll=vsb.set)
-        vsb.pack(side=RIGHT, fill=Y)
+        self.vsb = ttk.Scrollbar(frm_table, orient="vertical")
+        self.vsb.pack(side=RIGHT, fill=Y)
+        self._configure_scrolling()
 
         self.tree.bind("<Double-1>", self.show_diff_popup)
+        self.tree.bind("<Configure>", lambda e: self.virtual_var.get() and self._render_viewport())
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", self._on_wheel)
+        self.tree.bind("<Button-5>", self._on_wheel)
 
         # Sticky legend bar
         legend = tb.Frame(self.root, padding=(10, 6), bootstyle="dark")
@@ -130,34 +356,399 @@ class PatchForgeApp:
             bootstyle="secondary",
         ).pack(side=LEFT, padx=(12, 0))
 
+        # Progress / cancel bar for background jobs
+        status = tb.Frame(self.root, padding=(10, 4))
+        status.pack(fill=X, side=BOTTOM)
+        self.progress = tb.Progressbar(status, mode="determinate", length=240, bootstyle=INFO)
+        self.progress.pack(side=LEFT)
+        self.lbl_status = tb.Label(status, text="Ready", bootstyle=SECONDARY)
+        self.lbl_status.pack(side=LEFT, padx=10)
+        self.btn_cancel = tb.Button(status, text="Cancel", bootstyle=DANGER, command=self.cancel_job, state=DISABLED)
+        self.btn_cancel.pack(side=RIGHT)
+
     # -----------------------------------------------------
-    # Loaders
+    # Background jobs
     # -----------------------------------------------------
-    def load_old_json(self):
-        path = filedialog.askopenfilename(filetypes=[("JSON files", "*.json")])
-        if not path:
+    def _run_in_background(self, status, work, on_done, on_message=None, on_cancel=None):
+        """
+        Run work(cancel_event, post) on the worker thread.
+        Messages passed to post() reach on_message on the Tk thread in time-boxed
+        batches; on_done(result) runs on the Tk thread once the work finishes.
+        """
+        if self._cancel is not None:
             return
+        cancel = threading.Event()
+        messages = queue.Queue(maxsize=JOB_QUEUE_SIZE)
+        self._cancel = cancel
+        self._set_busy(True, status)
+
+        def post(msg):
+            # never block forever on a full queue once the job is cancelled
+            while not cancel.is_set():
+                try:
+                    messages.put(msg, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        future = self._executor.submit(work, cancel, post)
+        self.root.after(UI_POLL_MS, self._pump_job, future, messages, cancel, on_done, on_message, on_cancel)
+
+    def _pump_job(self, future, messages, cancel, on_done, on_message, on_cancel):
+        deadline = time.perf_counter() + UI_BATCH_SECONDS
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                self.old_data = json.load(f)
-            self.old_path = path
-            self.lbl_old.config(text=os.path.basename(path))
-            save_settings({"old_json": self.old_path, "new_json": self.new_path})
+            while time.perf_counter() < deadline:
+                try:
+                    msg = messages.get_nowait()
+                except queue.Empty:
+                    break
+                if on_message and not cancel.is_set():
+                    on_message(msg)
         except Exception as e:
-            messagebox.showerror("Error", f"Could not load file:\n{e}")
+            # a failing handler cancels the job; the pump keeps running until the
+            # worker stops, so the busy state is always cleared below
+            cancel.set()
+            messagebox.showerror("Error", f"{e}")
+
+        if not (future.done() and messages.empty()):
+            self.root.after(UI_POLL_MS, self._pump_job, future, messages, cancel, on_done, on_message, on_cancel)
+            return
+
+        self._cancel = None
+        self._set_busy(False, "Cancelled" if cancel.is_set() else "Ready")
+        if cancel.is_set():
+            if on_cancel:
+                on_cancel()
+        elif future.exception() is not None:
+            messagebox.showerror("Error", f"{future.exception()}")
+        else:
+            on_done(future.result())
+
+    def close(self):
+        """Stop any background job and close the window."""
+        if self._cancel is not None:
+            self._cancel.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
+    def cancel_job(self):
+        if self._cancel is not None:
+            self._cancel.set()
+            self.lbl_status.config(text="Cancelling…")
+
+    def _set_busy(self, busy, status):
+        state = DISABLED if busy else NORMAL
+        for btn in (self.btn_load_old, self.btn_load_new, self.btn_compare):
+            btn.config(state=state)
+        self.btn_cancel.config(state=NORMAL if busy else DISABLED)
+        self.lbl_status.config(text=status)
+        self.progress.stop()
+        self.progress.config(mode="indeterminate" if busy else "determinate", value=0)
+        if busy:
+            self.progress.start(15)
+
+    def _set_progress(self, done, total, status):
+        if str(self.progress.cget("mode")) != "determinate":
+            self.progress.stop()
+            self.progress.config(mode="determinate", maximum=100)
+        self.progress.config(value=100 * done / max(total, 1))
+        self.lbl_status.config(text=status)
+
+    # -----------------------------------------------------
+    # Profiling
+    # -----------------------------------------------------
+    def _toggle_profile(self):
+        if self._cancel is not None:
+            self.profile_var.set(not self.profile_var.get())
+            return
+        if self.profile_var.get():
+            self.profiler = Profiler(cprofile=True).start()
+            self.lbl_status.config(text="Profiling: load, compare or export to record stages")
+            self._update_profile()
+        else:
+            self.profiler.stop()
+            self._update_profile()
+            self.profiler = Profiler(enabled=False)
+
+    def _update_profile(self):
+        """Show (or refresh) the stage breakdown window while profiling."""
+        if not self.profiler.enabled:
+            return
+        if self._profile_win is None or not self._profile_win.winfo_exists():
+            win = self._profile_win = tb.Toplevel(self.root)
+            win.title("Profile")
+            win.geometry("760x320")
+            bar = tb.Frame(win, padding=6)
+            bar.pack(fill=X, side=BOTTOM)
+            tb.Button(bar, text="Save trace…", bootstyle=SECONDARY,
+                      command=self._save_profile).pack(side=RIGHT)
+            self._profile_text = tk.Text(win, wrap="none", bg="#121212", fg="#cccccc", font=("Consolas", 10))
+            self._profile_text.pack(fill=BOTH, expand=YES)
+        self._profile_text.config(state="normal")
+        self._profile_text.delete("1.0", "end")
+        self._profile_text.insert("1.0", self.profiler.report())
+        self._profile_text.config(state="disabled")
+
+    def _save_profile(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("Chrome trace (JSON)", "*.json"), ("cProfile stats", "*.prof")],
+        )
+        if not path:
+            return
+        if path.lower().endswith(".prof"):
+            self.profiler.dump_stats(path)
+        else:
+            self.profiler.dump_json(path)
+
+    # -----------------------------------------------------
+    # Virtual table
+    # -----------------------------------------------------
+    def _configure_scrolling(self):
+        if self.virtual_var.get():
+            self.vsb.config(command=self._virtual_yview)
+            self.tree.configure(yscrollcommand="")
+        else:
+            self.vsb.config(command=self.tree.yview)
+            self.tree.configure(yscrollcommand=self.vsb.set)
+
+    def _toggle_virtual(self):
+        if self._cancel is not None:
+            self.virtual_var.set(not self.virtual_var.get())
+            return
+        self.tree.delete(*self.tree.get_children())
+        self._weapon_state.clear()
+        self._store, self._view, self._offset = None, array("I"), 0
+        self.result = None
+        self._partial = False
+        self._configure_scrolling()
+        self._save_settings()
+        if self.old_data and self.new_data:
+            self.compare()
+
+    def _save_settings(self):
+        save_settings({"old_json": self.old_path, "new_json": self.new_path,
+                       "virtual_table": self.virtual_var.get()})
+
+    def _visible_rows(self):
+        rowheight = int(self.style.lookup("Treeview", "rowheight") or 20)
+        # one row's worth of height goes to the heading
+        return max(1, self.tree.winfo_height() // rowheight - 1)
+
+    def _render_viewport(self):
+        """Show view[offset : offset + visible] in a fixed pool of Treeview items."""
+        if self._store is None:
+            return
+        total = len(self._view)
+        count = self._visible_rows()
+        self._offset = max(0, min(self._offset, total - count))
+        rows = self._view[self._offset:self._offset + count]
+
+        items = self.tree.get_children()
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+        for k, index in enumerate(rows):
+            values, style = self._store.display(index)
+            if k < len(items):
+                self.tree.item(items[k], values=values, tags=(style,))
+            else:
+                self.tree.insert("", "end", values=values, tags=(style,))
+
+        if total:
+            self.vsb.set(self._offset / total, (self._offset + len(rows)) / total)
+        else:
+            self.vsb.set(0, 1)
+
+    def _virtual_yview(self, *args):
+        count = self._visible_rows()
+        if args[0] == "moveto":
+            self._offset = int(float(args[1]) * len(self._view))
+        elif args[0] == "scroll":
+            step = count if args[2] == "pages" else 1
+            self._offset += int(args[1]) * step
+        self._render_viewport()
+
+    def _on_wheel(self, event):
+        if not self.virtual_var.get():
+            return None
+        if event.num == 4 or event.delta > 0:
+            self._offset -= 3
+        else:
+            self._offset += 3
+        self._render_viewport()
+        return "break"
+
+    def _refresh_view(self):
+        """Re-sort / re-filter the backing store off the Tk thread."""
+        if self._store is None or self._cancel is not None:
+            return
+        text = self._filter_text()
+        if text is None:
+            return
+        store, (column, descending) = self._store, self._sort
+
+        def on_done(view):
+            self._view, self._offset = view, 0
+            self._render_viewport()
+            self.lbl_status.config(text=f"{len(view):,} of {len(store):,} rows")
+
+        self._run_in_background("Sorting…", lambda cancel, post: store.ordered(column, descending, text), on_done)
+
+    def sort_by(self, column):
+        """Heading click: sort the virtual table by column (click again to reverse)."""
+        if not self.virtual_var.get():
+            return
+        current, descending = self._sort
+        self._sort = (column, not descending if current == column else False)
+        self._refresh_view()
+
+    def _filter_text(self):
+        """The filter box text, or None (with a status note) when it is not a valid query."""
+        text = self.filter_var.get()
+        if is_structured(text):
+            try:
+                parse_query(text)
+            except ValueError as e:
+                self.lbl_status.config(text=f"Invalid filter: {e}")
+                return None
+        return text
+
+    def _schedule_filter(self):
+        # debounce typing so each keystroke does not trigger a pass over the store
+        if self._filter_after is not None:
+            self.root.after_cancel(self._filter_after)
+        self._filter_after = self.root.after(250, self._apply_filter)
+
+    def _apply_filter(self):
+        self._filter_after = None
+        if self.virtual_var.get():
+            self._refresh_view()
+        elif self._cancel is None:
+            # a running comparison re-applies the filter when it ends
+            text = self._filter_text()
+            if text is not None:
+                self._filter_table(text)
+
+    def _filter_table(self, text):
+        """
+        Normal table: show only the rows matching text (same rules as RowStore.ordered),
+        detaching the others in place. Queries are answered from a ResultIndex of the
+        last result; overall rows only match plain text.
+        """
+        state = self._weapon_state
+        names = sorted(state)
+        text = text.strip()
+        items = [iid for name in names for iid in state[name][1]]
+        if not text:
+            keep = items
+        elif is_structured(text):
+            if not self.result:
+                return
+            result, index = self._result_index
+            if result is not self.result:
+                index = ResultIndex(self.result, rarity_map(self.old_data, self.new_data))
+                self._result_index = (self.result, index)
+            # result rows are the weapons' rows in name order, each weapon's items starting with them
+            row_items = [iid for name in names for iid in state[name][1][:len(state[name][2])]]
+            ids = set(index.query(**parse_query(text)).ids())
+            keep = [iid for i, iid in enumerate(row_items) if i in ids]
+        else:
+            needle = text.lower()
+            keep = [
+                iid for name in names
+                for iid, (values, _) in zip(state[name][1], weapon_display_rows(state[name][2]))
+                if needle in values[0].lower() or needle in values[1].lower() or needle in values[5].lower()
+            ]
+
+        if items:
+            self.tree.detach(*items)
+        for iid in keep:
+            self.tree.reattach(iid, "", "end")
+        if text:
+            self.lbl_status.config(text=f"{len(keep):,} of {len(items):,} rows")
+
+    def _compare_virtual(self):
+        old_data, new_data = self.old_data, self.new_data
+        (column, descending), text = self._sort, self._filter_text() or ""
+
+        profiler = self.profiler
+
+        def work(cancel, post):
+            old_map = build_weapon_map(old_data)
+            new_map = build_weapon_map(new_data)
+            names = sorted(set(old_map.keys()) | set(new_map.keys()))
+            store = RowStore(rarity_map(old_data, new_data))
+            with profiler.stage("compare") as stage:
+                stage.rows = 0
+                for i, name in enumerate(names):
+                    if cancel.is_set():
+                        return None
+                    rows = compare_weapon(name, old_map.get(name, {}), new_map.get(name, {}))
+                    store.append_weapon(rows)
+                    stage.rows += len(rows)
+                    if i % 1000 == 0:
+                        post((i, len(names)))
+            result = ComparisonResult(store.results())
+            with profiler.stage("sort / filter") as stage:
+                view = store.ordered(column, descending, text)
+                stage.rows = len(view)
+            return store, view, result
+
+        def on_message(msg):
+            done, total = msg
+            self._set_progress(done, total, f"Comparing… {done}/{total}")
+
+        def on_done(result):
+            self._store, self._view, self.result = result
+            self._partial = False
+            self._offset = 0
+            self._render_viewport()
+            self.lbl_status.config(text=f"{len(self._view):,} of {len(self._store):,} rows")
+            self._summary_for(self.result)
+            # build the filter index in the background too, so the first query is instant
+            self._executor.submit(self._store.index)
+            self._update_profile()
+
+        self._run_in_background("Comparing…", work, on_done, on_message)
+
+    # -----------------------------------------------------
+    # Loaders
+    # -----------------------------------------------------
+    def load_old_json(self):
+        self._load_snapshot("old")
 
     def load_new_json(self):
+        self._load_snapshot("new")
+
+    def _load_snapshot(self, side):
         path = filedialog.askopenfilename(filetypes=[("JSON files", "*.json")])
         if not path:
             return
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                self.new_data = json.load(f)
-            self.new_path = path
-            self.lbl_new.config(text=os.path.basename(path))
-            save_settings({"old_json": self.old_path, "new_json": self.new_path})
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not load file:\n{e}")
+
+        profiler = self.profiler
+
+        def work(cancel, post):
+            # streamed element by element, so the Tk thread keeps getting the GIL;
+            # whole weapons are kept for the diff popup, hashed once here
+            weapons = []
+            with profiler.stage("load") as stage:
+                for weapon in iter_weapons(path, full=True):
+                    if cancel.is_set():
+                        return None
+                    weapons.append(weapon)
+                stage.rows = len(weapons)
+            data = {"weapons": weapons}
+            return data, SnapshotTree(data)
+
+        def on_done(loaded):
+            data, tree = loaded
+            setattr(self, f"{side}_data", data)
+            setattr(self, f"{side}_tree", tree)
+            setattr(self, f"{side}_path", path)
+            getattr(self, f"lbl_{side}").config(text=os.path.basename(path))
+            self._save_settings()
+
+        self._run_in_background(f"Loading {os.path.basename(path)}…", work, on_done)
 
     # -----------------------------------------------------
     # Comparison logic
@@ -167,81 +758,119 @@ class PatchForgeApp:
             messagebox.showwarning("Missing data", "Please load both OLD and NEW JSON files first.")
             return
 
-        old_map = {w["name"]: w for w in self.old_data.get("weapons", [])}
-        new_map = {w["name"]: w for w in self.new_data.get("weapons", [])}
-
-        self.tree.delete(*self.tree.get_children())
-        self.last_rows = []
-
-        for name in sorted(set(old_map.keys()) | set(new_map.keys())):
-            old = old_map.get(name, {}).get("stats", {})
-            new = new_map.get(name, {}).get("stats", {})
-
-            # classify the entire weapon after we compute all metrics
-            statuses_for_weapon = []
-
-            for key, higher_better in self.metrics_cfg:
-                o = old.get(key)
-                n = new.get(key)
-                if (o is None) or (n is None):
-                    change_txt = "⚪ Missing"
-                    style = "secondary"
-                    delta_str = "–"
-                    delta_val = 0.0
-                else:
-                    delta_val = float(n) - float(o)
-                    abs_delta = abs(delta_val)
-                    if delta_val == 0:
-                        change_txt = "⚪ No Change"
-                        style = "secondary"
-                    elif (higher_better and delta_val > 0) or ((not higher_better) and delta_val < 0):
-                        style = "success"
-                        dots = self.severity(abs_delta, key)
-                        change_txt = f"🟩 Buff {dots}"
-                        statuses_for_weapon.append("buff")
-                    else:
-                        style = "danger"
-                        dots = self.severity(abs_delta, key)
-                        change_txt = f"🟥 Nerf {dots}"
-                        statuses_for_weapon.append("nerf")
-
-                    delta_str = f"{delta_val:+.2f}"
-
-                row = (name, key, o if o is not None else "", n if n is not None else "", delta_str, change_txt)
-                self.tree.insert("", "end", values=row, tags=(style,))
-                self.last_rows.append((name, key, o, n, delta_val, style))
-
-            # If a weapon has both buffs and nerfs across metrics, tag a “mixed” summary line
-            if "buff" in statuses_for_weapon and "nerf" in statuses_for_weapon:
-                mix_row = (name, "— overall —", "", "", "", "🟨 Mixed")
-                self.tree.insert("", "end", values=mix_row, tags=("warning",))
-                self.last_rows.append((name, "— overall —", "", "", 0.0, "warning"))
+        self._configure_tags()
+        if self.virtual_var.get():
+            self._compare_virtual()
+            return
 
+        # Incremental update: only weapons whose stats fingerprint changed since the
+        # last comparison get their Treeview rows and result rows rebuilt.
+        state = self._weapon_state
+        self._filter_table("")       # rows are placed by index: reattach any filtered out
+        if not self.tree.get_children():
+            state.clear()
+        known = {name: entry[0] for name, entry in state.items()}
+        old_data, new_data = self.old_data, self.new_data
+        job = {"fresh": not known, "placed": [], "total": 0, "ui_wall": 0.0, "ui_cpu": 0.0}
+        profiler = self.profiler
+
+        def work(cancel, post):
+            old_map = build_weapon_map(old_data)
+            new_map = build_weapon_map(new_data)
+            names = sorted(set(old_map.keys()) | set(new_map.keys()))
+            post(("names", names))
+
+            with profiler.stage("compare") as stage:
+                stage.rows = 0
+                for i, name in enumerate(names):
+                    if cancel.is_set():
+                        return
+                    old = old_map.get(name, {})
+                    new = new_map.get(name, {})
+                    fingerprint = (weapon_fingerprint(old), weapon_fingerprint(new))
+                    if known.get(name) != fingerprint:
+                        rows = compare_weapon(name, old, new)
+                        stage.rows += len(rows)
+                        post(("weapon", i, name, fingerprint, rows, list(weapon_display_rows(rows))))
+                    elif i % 500 == 0:
+                        post(("progress", i))
+
+        def on_message(msg):
+            # Treeview updates run on the Tk thread, outside the worker's stages; timed separately
+            start, cpu = time.perf_counter(), time.thread_time()
+            apply_message(msg)
+            job["ui_wall"] += time.perf_counter() - start
+            job["ui_cpu"] += time.thread_time() - cpu
+
+        def apply_message(msg):
+            kind = msg[0]
+            if kind == "names":
+                names = msg[1]
+                for name in set(state) - set(names):
+                    self.tree.delete(*state.pop(name)[1])
+                job["placed"] = sorted(state)
+                job["total"] = len(names)
+            elif kind == "weapon":
+                _, i, name, fingerprint, rows, display = msg
+                self._apply_weapon(job, name, fingerprint, rows, display)
+                self._set_progress(i + 1, job["total"], f"Comparing… {i + 1}/{job['total']}")
+            elif kind == "progress":
+                self._set_progress(msg[1] + 1, job["total"], f"Comparing… {msg[1] + 1}/{job['total']}")
+
+        def on_finish(_=None):
+            self.result = ComparisonResult([row for name in sorted(state) for row in state[name][2]])
+            self._partial = False
+            self._summary_for(self.result)
+            self._apply_filter()
+            record_ui()
+
+        def on_cancel():
+            # the table now mixes updated and stale weapons: offer no result (summary,
+            # export) until a comparison completes; the next run redoes the stale ones
+            self.result = None
+            self._partial = True
+            self.lbl_status.config(text="Cancelled — table partly updated, compare again to finish")
+            self._apply_filter()
+            record_ui()
+
+        def record_ui():
+            if profiler.enabled:
+                # overlaps the worker's compare stage, so listed under it
+                rows = sum(len(entry[2]) for entry in state.values())
+                profiler.record("table update", job["ui_wall"], job["ui_cpu"], rows=rows, depth=1)
+                self._update_profile()
+
+        self._run_in_background("Comparing…", work, on_finish, on_message, on_cancel=on_cancel)
+
+    def _configure_tags(self):
         # Color rows
         self.tree.tag_configure("success", background="#18381a", foreground="#6fdc8c")
         self.tree.tag_configure("danger", background="#3a1818", foreground="#f28b82")
         self.tree.tag_configure("warning", background="#3a2e18", foreground="#fdd388")
         self.tree.tag_configure("secondary", background="#1e1e1e", foreground="#cccccc")
 
-    # -----------------------------------------------------
-    def severity(self, delta, key):
-        thresholds = {
-            "bodyDamage": (1, 5),
-            "headDamage": (2, 8),
-            "fireRate": (0.2, 1),
-            "magSize": (1, 5),
-            "timeToKill": (0.05, 0.2),
-            "bodyDamageAfterFirstHit": (1, 5),
-            "headDamageAfterFirstHit": (2, 8),
-        }
-        small, large = thresholds.get(key, (1, 5))
-        if delta >= large:
-            return "●"
-        elif delta >= small:
-            return "•"
-        elif delta > 0:
-            return "·"
-        return ""
+    def _apply_weapon(self, job, name, fingerprint, rows, display):
+        """Replace (or insert) one weapon's rows in the Treeview and comparison state."""
+        state = self._weapon_state
+        previous = state.get(name)
+        placed = job["placed"]
+
+        if job["fresh"]:
+            index = "end"
+        elif previous:
+            index = self.tree.index(previous[1][0])
+            self.tree.delete(*previous[1])
+        else:
+            pos = bisect.bisect(placed, name)
+            index = self.tree.index(state[placed[pos]][1][0]) if pos < len(placed) else "end"
+            placed.insert(pos, name)
+
+        items = []
+        for values, style in display:
+            items.append(self.tree.insert("", index, values=values, tags=(style,)))
+            if index != "end":
+                index += 1
+        state[name] = (fingerprint, items, rows)
 
     # -----------------------------------------------------
     def show_diff_popup(self, event):
@@ -249,64 +878,115 @@ class PatchForgeApp:
         if not item:
             return
         vals = self.tree.item(item[0], "values")
-        metric = vals[1]
-        o, n = vals[2], vals[3]
+        name, metric = vals[0], vals[1]
+        if self.old_tree is None or self.new_tree is None:
+            return
+        try:
+            changes = diff_weapon(self.old_tree, self.new_tree, name)
+        except KeyError:
+            messagebox.showinfo("Diff", f"{name} is not in the loaded snapshots.")
+            return
 
-        win = tb.Toplevel(self.root)
-        win.title(f"Diff — {vals[0]} ({metric})")
-        win.geometry("700x450")
+        # the clicked metric's key path inside the weapon, e.g. ("stats", "recoil", "vertical")
+        metric_path = next((("stats",) + tuple(m.path.split(".")) for m in get_schema().metrics
+                            if m.name == metric), None)
 
-        diff_html = HtmlDiff().make_table(
-            str(o).splitlines(), str(n).splitlines(),
-            fromdesc="Old", todesc="New", context=True
-        )
-        text = tk.Text(win, wrap="word", bg="#121212", fg="#cccccc")
-        text.insert("1.0", diff_html)
-        text.config(state="disabled")
-        text.pack(fill=BOTH, expand=YES)
+        win = tb.Toplevel(self.root)
+        win.title(f"Diff — {name} ({metric})")
+        win.geometry("760x450")
+
+        columns = ("Path", "Old", "New", "Δ")
+        tree = ttk.Treeview(win, columns=columns, show="headings")
+        for col, width in zip(columns, (320, 160, 160, 80)):
+            tree.heading(col, text=col)
+            tree.column(col, width=width, anchor=W if col == "Path" else CENTER)
+        tree.tag_configure("changed", foreground="#fdd388")
+        tree.tag_configure("added", foreground="#6fdc8c")
+        tree.tag_configure("removed", foreground="#f28b82")
+        tree.tag_configure("selected", background="#2a3a4a")
+
+        def text(value):
+            if value is None:
+                return ""
+            return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+        focus = None
+        for change in changes:
+            tags = [change["kind"]]
+            if metric_path is not None and change["parts"][:len(metric_path)] == metric_path:
+                tags.append("selected")
+            delta = "" if change["delta"] is None else f"{change['delta']:+.2f}"
+            iid = tree.insert("", "end", values=(change["path"] or "(whole weapon)", text(change["old"]),
+                                                 text(change["new"]), delta), tags=tags)
+            if focus is None and "selected" in tags:
+                focus = iid
+        if not changes:
+            tree.insert("", "end", values=("(no differences)", "", "", ""))
+
+        scroll = ttk.Scrollbar(win, orient=VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scroll.set)
+        scroll.pack(side=RIGHT, fill=Y)
+        tree.pack(fill=BOTH, expand=YES)
+        if focus is not None:
+            tree.selection_set(focus)
+            tree.see(focus)
 
     # -----------------------------------------------------
-    def open_summary(self):
-        if not self.last_rows:
+    def _summary_for(self, result):
+        """
+        Future of (summary, top buffs, top nerfs) for result, computed once per
+        comparison on the worker thread.
+        """
+        job = self._summary_job
+        if job is None or job[0] is not result:
+            def work():
+                summary = result.summary
+                # Top 5 buffs / nerfs by absolute delta across metrics (bounded heaps, one pass)
+                top = rank_changes(result, 5).get("all", {"buffs": [], "nerfs": []})
+                return summary, top["buffs"], top["nerfs"]
+            job = self._summary_job = (result, self._executor.submit(work))
+        return job[1]
+
+    def _charts_for(self, result):
+        """
+        Future of the chart PNGs for result (None without matplotlib), rendered on the
+        worker thread the first time the summary window or an HTML export asks: most
+        comparisons never need them, and matplotlib alone takes longer to import than
+        the rest of the app.
+        """
+        job = self._charts_job
+        if job is None or job[0] is not result:
+            summary_job = self._summary_for(result)
+            # the executor has one worker, so summary_job (queued first) is done when this runs
+            work = lambda: chart_images(summary_job.result()[0])  # noqa: E731
+            job = self._charts_job = (result, self._executor.submit(work))
+        return job[1]
+
+    def _chart_photos(self, summary, charts):
+        """Tk images of the chart PNGs, decoded once per summary."""
+        key = chart_key(summary)
+        if self._photos[0] != key:
+            self._photos = (key, {name: tk.PhotoImage(data=base64.b64encode(png)) for name, png in charts.items()})
+        return self._photos[1]
+
+    def _require_result(self):
+        """Whether there is a complete comparison to summarize or export (tells the user if not)."""
+        if self.result:
+            return True
+        if self._partial:
+            messagebox.showinfo("Incomplete comparison", "The last comparison was cancelled, so the table is only "
+                                                         "partly updated.\nRun Compare again to summarize or export it.")
+        else:
             messagebox.showinfo("No Data", "Run a comparison first.")
+        return False
+
+    def open_summary(self):
+        if not self._require_result():
             return
 
-        # Aggregate
-        counts = {"buff": 0, "nerf": 0, "mixed": 0, "nochange": 0}
-        per_weapon_status = {}  # name -> set("buff"/"nerf")
-        per_metric_delta = {}   # metric -> net delta
-
-        for name, metric, o, n, delta, style in self.last_rows:
-            # skip the added mixed summary rows when counting per-metric totals
-            if metric == "— overall —":
-                continue
-
-            # classify cell
-            if style == "success":
-                counts["buff"] += 1
-                per_weapon_status.setdefault(name, set()).add("buff")
-            elif style == "danger":
-                counts["nerf"] += 1
-                per_weapon_status.setdefault(name, set()).add("nerf")
-            elif style == "secondary":
-                counts["nochange"] += 1
-
-            # metric totals
-            per_metric_delta[metric] = per_metric_delta.get(metric, 0.0) + (delta if isinstance(delta, (int, float)) else 0.0)
-
-        # derive mixed from per-weapon sets
-        mixed_weapons = sum(1 for s in per_weapon_status.values() if "buff" in s and "nerf" in s)
-        counts["mixed"] = mixed_weapons
-
-        # Top 5 buffs / nerfs by absolute delta across metrics
-        # Build list of per-row magnitudes (ignoring missing/overall)
-        cell_changes = [
-            (name, metric, delta)
-            for (name, metric, o, n, delta, style) in self.last_rows
-            if metric != "— overall —" and isinstance(delta, (int, float))
-        ]
-        top_buffs = sorted([c for c in cell_changes if c[2] > 0.0], key=lambda x: -abs(x[2]))[:5]
-        top_nerfs = sorted([c for c in cell_changes if c[2] < 0.0], key=lambda x: -abs(x[2]))[:5]
+        # the summary is usually finished in the background right after the comparison
+        future = self._summary_for(self.result)
+        charts_future = self._charts_for(self.result)
 
         # ----- UI window
         win = tb.Toplevel(self.root)
@@ -318,46 +998,19 @@ class PatchForgeApp:
         info = tb.Frame(win, padding=10)
         info.pack(fill=X)
         tb.Label(info, text="Patch Summary", font=("Segoe UI", 16, "bold")).pack(side=LEFT)
-        tb.Label(info, text=f"  Buff cells: {counts['buff']}   Nerf cells: {counts['nerf']}   No-change cells: {counts['nochange']}   Mixed weapons: {counts['mixed']}",
-                 bootstyle="secondary").pack(side=LEFT, padx=12)
+        lbl_counts = tb.Label(info, text="Preparing summary…", bootstyle="secondary")
+        lbl_counts.pack(side=LEFT, padx=12)
 
         charts = tb.Frame(win, padding=(10, 0))
         charts.pack(fill=BOTH, expand=YES)
 
-        left = tb.Labelframe(charts, text="Changes Distribution", padding=10)
-        right = tb.Labelframe(charts, text="Net Δ by Metric", padding=10)
+        left = tb.Labelframe(charts, text=CHART_TITLES["pie"], padding=10)
+        right = tb.Labelframe(charts, text=CHART_TITLES["bar"], padding=10)
         left.pack(side=LEFT, fill=BOTH, expand=YES, padx=(0, 5), pady=5)
         right.pack(side=LEFT, fill=BOTH, expand=YES, padx=(5, 0), pady=5)
-
-        # PIE CHART
-        fig1 = Figure(figsize=(4.6, 3.4), dpi=100)
-        ax1 = fig1.add_subplot(111)
-        labels = ["Buff", "Nerf", "Mixed", "No change"]
-        sizes = [counts["buff"], counts["nerf"], counts["mixed"], counts["nochange"]]
-        # avoid all zeros crash
-        if sum(sizes) == 0:
-            sizes = [1, 0, 0, 0]
-        ax1.pie(
-            sizes,
-            labels=labels,
-            autopct="%1.1f%%",
-            startangle=90
-        )
-        ax1.axis("equal")
-        FigureCanvasTkAgg(fig1, master=left).get_tk_widget().pack(fill=BOTH, expand=YES)
-
-        # BAR CHART
-        fig2 = Figure(figsize=(4.6, 3.4), dpi=100)
-        ax2 = fig2.add_subplot(111)
-        metrics = list(per_metric_delta.keys())
-        values = [per_metric_delta[m] for m in metrics]
-        if not metrics:
-            metrics = ["(none)"]
-            values = [0]
-        ax2.bar(metrics, values)
-        ax2.set_ylabel("Net Δ (sum of new - old)")
-        ax2.set_xticklabels(metrics, rotation=20, ha="right")
-        FigureCanvasTkAgg(fig2, master=right).get_tk_widget().pack(fill=BOTH, expand=YES)
+        chart_labels = {"pie": tb.Label(left, text="Rendering…"), "bar": tb.Label(right, text="Rendering…")}
+        for label in chart_labels.values():
+            label.pack(fill=BOTH, expand=YES)
 
         # Lists for top changes
         lists = tb.Frame(win, padding=10)
@@ -368,75 +1021,111 @@ class PatchForgeApp:
         lf_buffs.pack(side=LEFT, fill=BOTH, expand=YES, padx=(0, 5))
         lf_nerfs.pack(side=LEFT, fill=BOTH, expand=YES, padx=(5, 0))
 
-        def listbox_from(items, parent):
+        def listbox_in(parent):
             lb = tk.Listbox(parent, bg="#0f1115", fg="#d0d0d0", highlightthickness=0, relief="flat")
-            for (w, m, d) in items:
-                lb.insert(END, f"{w} — {m}: {d:+.2f}")
             lb.pack(fill=BOTH, expand=YES)
+            return lb
+
+        lb_buffs, lb_nerfs = listbox_in(lf_buffs), listbox_in(lf_nerfs)
+
+        def fill():
+            if not win.winfo_exists():
+                return
+            if not future.done():
+                self.root.after(UI_POLL_MS, fill)
+                return
+            if future.exception() is not None:
+                lbl_counts.config(text=f"Summary failed: {future.exception()}")
+                return
+            summary, buffs, nerfs = future.result()
+            lbl_counts.config(text=f"Buff cells: {summary['buffs']}   Nerf cells: {summary['nerfs']}   No-change cells: {summary['nochange']}   Mixed weapons: {summary['mixed']}")
+            for lb, rows in ((lb_buffs, buffs), (lb_nerfs, nerfs)):
+                for r in rows:
+                    lb.insert(END, f"{r['weapon']} — {r['metric']}: {r['delta']:+.2f}")
+            fill_charts(summary)
+
+        def fill_charts(summary):
+            if not win.winfo_exists():
+                return
+            if not charts_future.done():
+                self.root.after(UI_POLL_MS, fill_charts, summary)
+                return
+            if charts_future.exception() is not None:
+                for label in chart_labels.values():
+                    label.config(text=f"Charts failed: {charts_future.exception()}")
+                return
+            pngs = charts_future.result()
+            photos = self._chart_photos(summary, pngs) if pngs else {}
+            for name, label in chart_labels.items():
+                if name in photos:
+                    label.config(image=photos[name], text="")
+                else:
+                    label.config(text="Install matplotlib to see charts")
 
-        listbox_from(top_buffs, lf_buffs)
-        listbox_from(top_nerfs, lf_nerfs)
+        fill()
 
     # -----------------------------------------------------
     def export_csv(self):
-        if not self.tree.get_children():
-            messagebox.showinfo("No Data", "Run a comparison first.")
-            return
+        self._export("csv", ".csv", [("CSV", "*.csv"), ("Gzipped CSV", "*.csv.gz")])
 
-        path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV", "*.csv")])
-        if not path:
-            return
-
-        with open(path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["Weapon", "Metric", "Old", "New", "Δ", "Status"])
-            for child in self.tree.get_children():
-                writer.writerow(self.tree.item(child, "values"))
+    def export_html(self):
+        self._export("html", ".html", [("HTML", "*.html"), ("Gzipped HTML", "*.html.gz")])
 
-        messagebox.showinfo("Saved", f"CSV exported:\n{path}")
+    def export_jsonl(self):
+        self._export("jsonl", ".jsonl", [("JSON Lines", "*.jsonl"), ("Gzipped JSON Lines", "*.jsonl.gz")])
 
-    def export_html(self):
-        if not self.tree.get_children():
-            messagebox.showinfo("No Data", "Run a comparison first.")
+    def _export(self, fmt, extension, filetypes):
+        """Stream the table (or, for JSONL, the result rows) to disk; .gz paths are compressed."""
+        if not self._require_result():
             return
 
-        path = filedialog.asksaveasfilename(defaultextension=".html", filetypes=[("HTML", "*.html")])
+        path = filedialog.asksaveasfilename(defaultextension=extension, filetypes=filetypes)
         if not path:
             return
 
-        rows = []
-        for child in self.tree.get_children():
-            vals = self.tree.item(child, "values")
-            rows.append(f"<tr><td>{'</td><td>'.join(map(lambda x: '' if x is None else str(x), vals))}</td></tr>")
-
-        html = f"""
-        <html>
-        <head><meta charset="utf-8"><style>
-        body {{ background-color:#0f1115; color:white; font-family:Segoe UI; }}
-        table {{ width:100%; border-collapse:collapse; }}
-        td,th {{ border:1px solid #333; padding:6px; }}
-        tr:nth-child(even) {{ background:#151a22; }}
-        </style></head>
-        <body><h2>PatchForge Report</h2><table>
-        <tr><th>Weapon</th><th>Metric</th><th>Old</th><th>New</th><th>Δ</th><th>Status</th></tr>
-        {''.join(rows)}
-        </table></body></html>
-        """
-
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(html)
-
-        messagebox.showinfo("Saved", f"HTML exported:\n{path}")
+        # Tk variables and table state are read here, on the Tk thread; the chunk
+        # generators first run on the worker thread and only see these objects
+        # (views are replaced, never mutated, so a re-sort cannot disturb them)
+        if self.virtual_var.get():
+            store, view, result = self._store, self._view, None
+        else:
+            store, view, result = None, None, self.result
+        if fmt == "csv":
+            chunks = csv_chunks(TABLE_COLUMNS, table_rows(store, view, result))
+        elif fmt == "html":
+            chunks = html_report_chunks(table_rows(store, view, result), self._charts_for(self.result))
+        else:
+            chunks = jsonl_chunks(self.result)
+
+        profiler = self.profiler
+
+        def work(cancel, post):
+            def until_cancelled():
+                for chunk in chunks:
+                    if cancel.is_set():
+                        return
+                    yield chunk
+            with profiler.stage(f"export {fmt}"):
+                return write_chunks(until_cancelled(), path)
+
+        def on_done(written):
+            self._update_profile()
+            messagebox.showinfo("Saved", f"{fmt.upper()} exported:\n{path}")
+
+        def on_cancel():
+            # don't leave a truncated report behind
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+        self._run_in_background(f"Exporting {os.path.basename(path)}…", work, on_done, on_cancel=on_cancel)
 
 
 # ---------------------------------------------------------
 # Run
 # ---------------------------------------------------------
 if __name__ == "__main__":
-    # switch backend now that Tk exists
-    import matplotlib
-    matplotlib.use("TkAgg")
-
     app = tb.Window(themename="darkly")
     PatchForgeApp(app)
     app.mainloop()
@@ -0,0 +1,399 @@
+"""
+PatchForge Patch Archive
+========================
+
+A local SQLite database of ingested snapshots, so years of patches are
+loaded once instead of re-parsing loose JSON files for every comparison.
+
+Layout:
+    patches   one row per ingested snapshot (seq, label, source, SHA-256)
+    weapons   interned weapon names
+    metrics   interned metric names
+    roster    which weapons a run of patches contains, with their rarity
+    stats     one stat value for a run of patches
+
+`roster` and `stats` store intervals: a row holds a value together with the
+first and last patch (by seq) it appeared in, the last one left open while
+the value is current. Ingesting a patch closes the intervals whose value
+changed or disappeared and opens new ones for the new values, so an
+unchanged stat is stored (and written) once however many patches carry it,
+and the archive grows with the number of changes rather than patches × cells.
+
+Each snapshot is staged with executemany and merged with a few set-based
+statements inside one transaction. Compare, summary and history are SQL
+queries over the intervals; rows come back in the same shape (and order)
+as compare_jsons / summarize_results / build_history produce.
+"""
+
+import os
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from patchforge_cache import file_digest
+from patchforge_core import build_weapon_map, get_schema, load_json
+from patchforge_history import PatchHistory
+from patchforge_profile import profiled
+from patchforge_schema import BUFF_LABELS, NERF_LABELS
+
+ARCHIVE_PATH = "patchforge_archive.db"
+ARCHIVE_VERSION = 1
+# last_seq of a run that is still current (it extends to whatever is ingested next)
+OPEN_SEQ = 2 ** 62
+ARCHIVE_CACHE_KB = 64 * 1024
+
+_TABLES = """
+CREATE TABLE patches (
+    seq INTEGER PRIMARY KEY,
+    label TEXT NOT NULL UNIQUE,
+    source TEXT,
+    digest TEXT UNIQUE,
+    ingested TEXT NOT NULL,
+    weapons INTEGER NOT NULL,
+    stats INTEGER NOT NULL
+);
+CREATE TABLE weapons (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE metrics (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE roster (
+    weapon_id INTEGER NOT NULL,
+    first_seq INTEGER NOT NULL,
+    last_seq INTEGER NOT NULL,
+    rarity TEXT,
+    PRIMARY KEY (weapon_id, first_seq)
+) WITHOUT ROWID;
+CREATE TABLE stats (
+    weapon_id INTEGER NOT NULL,
+    metric_id INTEGER NOT NULL,
+    first_seq INTEGER NOT NULL,
+    last_seq INTEGER NOT NULL,
+    value,
+    PRIMARY KEY (weapon_id, metric_id, first_seq)
+) WITHOUT ROWID;
+CREATE INDEX roster_last ON roster (last_seq);
+CREATE INDEX stats_last ON stats (last_seq);
+"""
+
+# per-connection scratch tables: the snapshot being ingested and the metric
+# schema comparisons classify with
+_TEMP_TABLES = """
+CREATE TEMP TABLE staged_roster (weapon_id INTEGER PRIMARY KEY, rarity TEXT);
+CREATE TEMP TABLE staged_stats (
+    weapon_id INTEGER, metric_id INTEGER, value, PRIMARY KEY (weapon_id, metric_id)
+) WITHOUT ROWID;
+CREATE TEMP TABLE compare_metrics (
+    position INTEGER PRIMARY KEY, name TEXT, metric_id INTEGER, sign INTEGER, small REAL, large REAL
+);
+"""
+
+# one row per weapon (of either patch) x schema metric, in compare_jsons order;
+# kind: 0 missing, 1 no change, 2 buff, 3 nerf; level: severity band
+_COMPARE_ROWS = """
+WITH present AS (
+    SELECT w.id AS weapon_id, w.name FROM weapons w
+    WHERE EXISTS (
+        SELECT 1 FROM roster r WHERE r.weapon_id = w.id
+          AND ((r.first_seq <= :old AND r.last_seq >= :old) OR (r.first_seq <= :new AND r.last_seq >= :new)))
+),
+cells AS (
+    SELECT p.name AS weapon, m.name AS metric, m.position, m.sign, m.small, m.large,
+           o.value AS old, n.value AS new, n.value - o.value AS delta
+    FROM present p
+    CROSS JOIN compare_metrics m
+    LEFT JOIN stats o ON o.weapon_id = p.weapon_id AND o.metric_id = m.metric_id
+                     AND o.first_seq <= :old AND o.last_seq >= :old
+    LEFT JOIN stats n ON n.weapon_id = p.weapon_id AND n.metric_id = m.metric_id
+                     AND n.first_seq <= :new AND n.last_seq >= :new
+),
+rows AS (
+    SELECT weapon, metric, position, old, new, delta,
+           CASE WHEN delta IS NULL THEN 0 WHEN delta = 0 THEN 1
+                WHEN delta * sign > 0 THEN 2 ELSE 3 END AS kind,
+           CASE WHEN abs(delta) >= large THEN 2 WHEN abs(delta) >= small THEN 1 ELSE 0 END AS level
+    FROM cells
+)
+"""
+
+_ROW_CHANGES = {0: ("Missing", "secondary"), 1: ("No Change", "secondary")}
+
+
+def _label(kind: int, level: int):
+    if kind in _ROW_CHANGES:
+        return _ROW_CHANGES[kind]
+    return (BUFF_LABELS[level], "success") if kind == 2 else (NERF_LABELS[level], "danger")
+
+
+def _is_number(v) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+
+class ArchiveResults(list):
+    """Rows of an archive comparison; summarize() runs in SQL (see summarize_results)."""
+
+    def __init__(self, rows, archive: "PatchArchive", old: int, new: int):
+        super().__init__(rows)
+        self._archive = archive
+        self._seqs = (old, new)
+
+    def summarize(self) -> Dict:
+        return self._archive.summary(*self._seqs)
+
+
+class PatchArchive:
+    """Snapshots ingested into one SQLite file (see module docstring)."""
+
+    def __init__(self, path: str = ARCHIVE_PATH):
+        import sqlite3   # imported here so CLI startup does not pay for it
+
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.execute("PRAGMA temp_store = MEMORY")
+        self.db.execute(f"PRAGMA cache_size = -{ARCHIVE_CACHE_KB}")
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            with self.db:
+                self.db.executescript(_TABLES)
+                self.db.execute(f"PRAGMA user_version = {ARCHIVE_VERSION}")
+        elif version != ARCHIVE_VERSION:
+            self.db.close()
+            raise ValueError(f"{path}: archive version {version}, expected {ARCHIVE_VERSION}")
+        self.db.executescript(_TEMP_TABLES)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -----------------------------------------------------
+    # Patches
+    # -----------------------------------------------------
+    def patches(self) -> List[Dict]:
+        """Every archived patch, oldest first."""
+        cur = self.db.execute("SELECT seq, label, source, digest, ingested, weapons, stats FROM patches ORDER BY seq")
+        keys = [d[0] for d in cur.description]
+        return [dict(zip(keys, row)) for row in cur]
+
+    def resolve(self, ref) -> int:
+        """seq of a patch given by label or seq number."""
+        row = self.db.execute("SELECT seq FROM patches WHERE label = ?", (str(ref),)).fetchone()
+        if row is None and str(ref).isdigit():
+            row = self.db.execute("SELECT seq FROM patches WHERE seq = ?", (int(ref),)).fetchone()
+        if row is None:
+            raise ValueError(f"No archived patch named {ref!r}")
+        return row[0]
+
+    def sizes(self) -> Dict[str, int]:
+        """Stored stat intervals against the stat values they stand for."""
+        intervals, cells = self.db.execute(
+            "SELECT count(*), coalesce(sum(min(last_seq, (SELECT max(seq) FROM patches)) - first_seq + 1), 0) "
+            "FROM stats").fetchone()
+        return {"intervals": intervals, "cells": cells, "bytes": os.path.getsize(self.path)}
+
+    # -----------------------------------------------------
+    # Ingest
+    # -----------------------------------------------------
+    def _metric_ids(self, names) -> Dict[str, int]:
+        self.db.executemany("INSERT OR IGNORE INTO metrics (name) VALUES (?)", ((n,) for n in names))
+        return dict(self.db.execute("SELECT name, id FROM metrics"))
+
+    @profiled("ingest", rows=lambda patch: patch["weapons"] if patch else 0)
+    def ingest(self, data, label: str, source: Optional[str] = None,
+               digest: Optional[str] = None) -> Optional[Dict]:
+        """
+        Append a loaded snapshot as the newest patch. Returns its patches row,
+        or None when a patch with the same digest is already archived.
+        """
+        if digest is not None and self.db.execute(
+                "SELECT 1 FROM patches WHERE digest = ?", (digest,)).fetchone():
+            return None
+        if self.db.execute("SELECT 1 FROM patches WHERE label = ?", (label,)).fetchone():
+            raise ValueError(f"Patch label already archived: {label}")
+
+        weapon_map = build_weapon_map(data)
+        rarities = {}
+        if not hasattr(data, "weapon_map"):
+            rarities = {w["name"]: w.get("rarity") for w in data.get("weapons", [])}
+
+        db = self.db
+        with db:
+            seq = db.execute("SELECT coalesce(max(seq), 0) + 1 FROM patches").fetchone()[0]
+            metric_ids = self._metric_ids(dict.fromkeys(k for stats in weapon_map.values() for k in stats))
+            db.executemany("INSERT OR IGNORE INTO weapons (name) VALUES (?)", ((name,) for name in weapon_map))
+            weapon_ids = dict(db.execute("SELECT name, id FROM weapons"))
+
+            # stage the snapshot
+            db.execute("DELETE FROM staged_roster")
+            db.execute("DELETE FROM staged_stats")
+            db.executemany("INSERT INTO staged_roster VALUES (?, ?)",
+                           ((weapon_ids[name], rarities.get(name)) for name in weapon_map))
+            db.executemany("INSERT INTO staged_stats VALUES (?, ?, ?)", (
+                (weapon_ids[name], metric_ids[key], v)
+                for name, stats in weapon_map.items() for key, v in stats.items() if _is_number(v)
+            ))
+
+            # close the open runs this patch changes or drops, then open runs for
+            # what is new; unchanged runs stay open and are not written at all
+            params = {"seq": seq, "prev": seq - 1, "open": OPEN_SEQ}
+            db.execute("""
+                UPDATE roster SET last_seq = :prev
+                WHERE last_seq = :open AND NOT EXISTS (
+                    SELECT 1 FROM staged_roster s WHERE s.weapon_id = roster.weapon_id AND s.rarity IS roster.rarity)
+            """, params)
+            db.execute("""
+                INSERT INTO roster (weapon_id, first_seq, last_seq, rarity)
+                SELECT s.weapon_id, :seq, :open, s.rarity FROM staged_roster s
+                WHERE NOT EXISTS (SELECT 1 FROM roster r WHERE r.weapon_id = s.weapon_id AND r.last_seq = :open)
+            """, params)
+            db.execute("""
+                UPDATE stats SET last_seq = :prev
+                WHERE last_seq = :open AND NOT EXISTS (
+                    SELECT 1 FROM staged_stats s
+                    WHERE s.weapon_id = stats.weapon_id AND s.metric_id = stats.metric_id AND s.value = stats.value)
+            """, params)
+            stored = db.execute("""
+                INSERT INTO stats (weapon_id, metric_id, first_seq, last_seq, value)
+                SELECT s.weapon_id, s.metric_id, :seq, :open, s.value FROM staged_stats s
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM stats t
+                    WHERE t.weapon_id = s.weapon_id AND t.metric_id = s.metric_id AND t.last_seq = :open)
+            """, params).rowcount
+            count = db.execute("SELECT count(*) FROM staged_stats").fetchone()[0]
+
+            db.execute("INSERT INTO patches VALUES (?, ?, ?, ?, ?, ?, ?)", (
+                seq, label, source, digest, datetime.now().isoformat(timespec="seconds"), len(weapon_map), count
+            ))
+            db.execute("DELETE FROM staged_roster")
+            db.execute("DELETE FROM staged_stats")
+
+        patch = self.patches()[-1]
+        patch["new_values"] = stored
+        return patch
+
+    def ingest_file(self, path: str, label: Optional[str] = None, loader=load_json) -> Dict:
+        """
+        Ingest a snapshot file (label defaults to the file name). Returns the
+        patches row plus "created": False when the same content was archived before.
+        """
+        digest = file_digest(path)
+        row = self.db.execute("SELECT seq FROM patches WHERE digest = ?", (digest,)).fetchone()
+        if row is not None:
+            return dict(next(p for p in self.patches() if p["seq"] == row[0]), created=False)
+        label = label or os.path.splitext(os.path.basename(path))[0]
+        patch = self.ingest(loader(path), label, os.path.abspath(path), digest)
+        return dict(patch, created=True)
+
+    # -----------------------------------------------------
+    # Queries
+    # -----------------------------------------------------
+    def _load_schema(self):
+        """Write the active metric schema into compare_metrics."""
+        ids = dict(self.db.execute("SELECT name, id FROM metrics"))
+        self.db.execute("DELETE FROM compare_metrics")
+        self.db.executemany("INSERT INTO compare_metrics VALUES (?, ?, ?, ?, ?, ?)", (
+            (position, name, ids.get(name), sign, small, large)
+            for position, (name, sign, small, large) in enumerate(get_schema().table)
+        ))
+
+    @profiled("compare", rows=len)
+    def compare(self, old, new) -> ArchiveResults:
+        """compare_jsons rows between two archived patches (labels or seqs)."""
+        seqs = {"old": self.resolve(old), "new": self.resolve(new)}
+        self._load_schema()
+        cur = self.db.execute(_COMPARE_ROWS + """
+            SELECT weapon, metric, old, new, delta, kind, level FROM rows ORDER BY weapon, position
+        """, seqs)
+        rows = []
+        for weapon, metric, o, n, delta, kind, level in cur:
+            change, status = _label(kind, level)
+            if kind == 1:
+                delta = 0
+            rows.append({
+                "weapon": weapon, "metric": metric, "old": o, "new": n,
+                "delta": delta, "change": change, "status": status,
+            })
+        return ArchiveResults(rows, self, seqs["old"], seqs["new"])
+
+    @profiled("summarize", rows=lambda s: s["buffs"] + s["nerfs"] + s["nochange"])
+    def summary(self, old, new) -> Dict:
+        """summarize_results of compare(old, new), aggregated in SQL."""
+        seqs = {"old": self.resolve(old), "new": self.resolve(new)}
+        self._load_schema()
+        # one pass: rows come out in weapon order, so grouping by weapon needs no
+        # sort, and each metric's net delta / first weapon is a column of its own
+        metrics = get_schema().names
+        columns = "".join(
+            f", sum(CASE WHEN position = {i} THEN delta END) AS t{i}"
+            f", min(CASE WHEN position = {i} AND delta IS NOT NULL THEN weapon END) AS f{i}"
+            for i in range(len(metrics))
+        )
+        outer = "".join(f", sum(t{i}), min(f{i})" for i in range(len(metrics)))
+        row = self.db.execute(_COMPARE_ROWS + f"""
+            SELECT coalesce(sum(b), 0), coalesce(sum(n), 0), coalesce(sum(nc), 0),
+                   coalesce(sum(b > 0 AND n > 0), 0){outer}
+            FROM (SELECT sum(kind = 2) AS b, sum(kind = 3) AS n, sum(kind < 2) AS nc{columns}
+                  FROM rows GROUP BY weapon)
+        """, seqs).fetchone()
+        buffs, nerfs, nochange, mixed = row[:4]
+        # metrics in order of first appearance, as summarize_results builds them
+        firsts = sorted((row[5 + 2 * i], i) for i in range(len(metrics)) if row[5 + 2 * i] is not None)
+        totals = [(metrics[i], row[4 + 2 * i]) for _, i in firsts]
+        return {
+            "buffs": buffs,
+            "nerfs": nerfs,
+            "nochange": nochange,
+            "mixed": mixed,
+            "totals": dict(totals),
+        }
+
+    @profiled("history", rows=lambda history: len(history.series))
+    def history(self, refs: Optional[Sequence] = None, weapon: Optional[str] = None) -> PatchHistory:
+        """
+        build_history over archived patches (all of them, oldest first, when
+        refs is None), read from the stored intervals.
+        """
+        patches = {p["seq"]: p["label"] for p in self.patches()}
+        seqs = [self.resolve(ref) for ref in refs] if refs is not None else sorted(patches)
+        history = PatchHistory([patches[seq] for seq in seqs])
+        if not seqs:
+            return history
+
+        # position of each seq in the history, walked in seq order
+        order = sorted((seq, position) for position, seq in enumerate(seqs))
+        ordered_seqs = [seq for seq, _ in order]
+
+        def positions(first, last):
+            i = bisect_left(ordered_seqs, first)
+            while i < len(order) and order[i][0] <= last:
+                yield order[i][1]
+                i += 1
+
+        bounds = {"lo": ordered_seqs[0], "hi": ordered_seqs[-1], "weapon": weapon}
+        count = len(seqs)
+        metrics = history.metrics
+        series = history.series
+        for name, first, last in self.db.execute("""
+            SELECT w.name, r.first_seq, r.last_seq FROM roster r JOIN weapons w ON w.id = r.weapon_id
+            WHERE r.last_seq >= :lo AND r.first_seq <= :hi AND (:weapon IS NULL OR w.name = :weapon)
+        """, bounds):
+            if name not in series and any(True for _ in positions(first, last)):
+                series[name] = {key: [None] * count for key in metrics}
+
+        self._load_schema()
+        for name, key, value, first, last in self.db.execute("""
+            SELECT w.name, m.name, s.value, s.first_seq, s.last_seq
+            FROM stats s
+            JOIN weapons w ON w.id = s.weapon_id
+            JOIN compare_metrics m ON m.metric_id = s.metric_id
+            WHERE s.last_seq >= :lo AND s.first_seq <= :hi AND (:weapon IS NULL OR w.name = :weapon)
+        """, bounds):
+            cells = series.get(name)
+            if cells is None:
+                continue
+            values = cells[key]
+            for position in positions(first, last):
+                values[position] = value
+        return history
@@ -0,0 +1,178 @@
+"""
+PatchForge Batch Runner
+=======================
+
+Re-diff many (old, new) snapshot pairs in a process pool.
+
+Every distinct snapshot is parsed exactly once (in parallel) into a weapon
+map pickled in the run's private temp folder, so pairs that share a
+baseline never re-parse it. Comparison workers load only the maps of their
+own pairs and keep the last few (BATCH_MAP_CACHE), and pairs are handed out
+sorted, in chunks, so pairs sharing a snapshot tend to land on the same
+worker: memory per worker stays a few snapshots, whatever the manifest
+size. Each worker writes its pair's rows to a part file; the parts are
+concatenated in manifest order at the end.
+"""
+
+import csv
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from patchforge_core import build_weapon_map, compare_maps, get_schema, load_json, set_schema, summarize_results
+
+CSV_HEADER = ["Pair", "Old File", "New File", "Weapon", "Metric", "Old", "New", "Δ", "Change"]
+
+BATCH_MAP_CACHE = 4          # weapon maps a comparison worker keeps loaded
+
+# snapshot path -> pickled weapon map, and the worker's recently used maps (set by _init_worker)
+_MAP_FILES: Dict[str, str] = {}
+_MAPS: "OrderedDict[str, Dict]" = OrderedDict()
+
+
+# ---------------------------------------------------------
+# MANIFEST
+# ---------------------------------------------------------
+def load_manifest(path: str) -> List[Tuple[str, str]]:
+    """
+    Read (old, new) pairs from a manifest.
+    .json: a list of [old, new] pairs or {"old": ..., "new": ...} objects.
+    Anything else: CSV with one `old,new` pair per line (# starts a comment).
+    Relative paths are resolved against the manifest's folder.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    pairs = []
+    if path.lower().endswith(".json"):
+        for entry in load_json(path):
+            old, new = (entry["old"], entry["new"]) if isinstance(entry, dict) else entry
+            pairs.append((old, new))
+    else:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.reader(f):
+                if not row or row[0].lstrip().startswith("#"):
+                    continue
+                if len(row) != 2:
+                    raise ValueError(f"Manifest line needs exactly two paths: {row}")
+                pairs.append((row[0].strip(), row[1].strip()))
+    return [(os.path.join(base, old), os.path.join(base, new)) for old, new in pairs]
+
+
+# ---------------------------------------------------------
+# WORKERS
+# ---------------------------------------------------------
+def _parse(job) -> Tuple[str, float]:
+    path, map_path = job
+    start = time.perf_counter()
+    weapon_map = build_weapon_map(load_json(path))
+    seconds = time.perf_counter() - start
+    with open(map_path, "wb") as f:
+        pickle.dump(weapon_map, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return path, seconds
+
+
+def _init_parser(schema):
+    # spawned workers start with the default schema
+    set_schema(schema)
+
+
+def _init_worker(map_files: Dict[str, str], schema):
+    global _MAP_FILES
+    _MAP_FILES = map_files
+    set_schema(schema)
+
+
+def _weapon_map(path: str) -> Dict:
+    """A snapshot's weapon map, from the worker's small LRU or its pickle (written by this run)."""
+    weapon_map = _MAPS.get(path)
+    if weapon_map is not None:
+        _MAPS.move_to_end(path)
+        return weapon_map
+    with open(_MAP_FILES[path], "rb") as f:
+        weapon_map = pickle.load(f)
+    _MAPS[path] = weapon_map
+    while len(_MAPS) > BATCH_MAP_CACHE:
+        _MAPS.popitem(last=False)
+    return weapon_map
+
+
+def _compare_pair(job) -> Dict:
+    index, old, new, engine, fmt, part_path = job
+    start = time.perf_counter()
+    results = compare_maps(_weapon_map(old), _weapon_map(new), engine=engine)
+    summary = summarize_results(results)
+
+    with open(part_path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            for r in results:
+                delta_str = "–" if r["delta"] is None else f"{r['delta']:+.2f}"
+                writer.writerow([index, old, new, r["weapon"], r["metric"],
+                                 r["old"], r["new"], delta_str, r["change"]])
+        else:
+            for r in results:
+                f.write(json.dumps({"pair": index, "old_file": old, "new_file": new, **r},
+                                   ensure_ascii=False) + "\n")
+
+    return {
+        "pair": index,
+        "old": old,
+        "new": new,
+        "rows": len(results),
+        "summary": summary,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+# ---------------------------------------------------------
+# DRIVER
+# ---------------------------------------------------------
+def run_batch(pairs: List[Tuple[str, str]], out_path: str, workers: int = None,
+              engine: str = "python") -> Dict:
+    """
+    Compare every pair and write one combined CSV or JSONL file (by extension).
+    Returns {"pairs": [per-pair report], "parse": {path: seconds}, "seconds": wall time}.
+    """
+    fmt = "jsonl" if out_path.lower().endswith((".jsonl", ".ndjson")) else "csv"
+    start = time.perf_counter()
+
+    unique = list(dict.fromkeys(path for pair in pairs for path in pair))
+    for path in unique:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File not found: {path}")
+
+    schema = get_schema()
+    workers = workers or os.cpu_count() or 1
+    part_dir = tempfile.mkdtemp(prefix="patchforge_batch_")
+    try:
+        # parsed maps go to disk, not through the pool: no process holds them all
+        map_files = {path: os.path.join(part_dir, f"map{i}.pickle") for i, path in enumerate(unique)}
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_parser, initargs=(schema,)) as pool:
+            parse_times = dict(pool.map(_parse, map_files.items()))
+
+        jobs = [
+            (i, old, new, engine, fmt, os.path.join(part_dir, f"{i}.part"))
+            for i, (old, new) in enumerate(pairs, start=1)
+        ]
+        # sorted chunks: consecutive pairs (same baseline, or p1→p2 then p2→p3) share a worker's maps
+        ordered = sorted(jobs, key=lambda job: (job[1], job[2]))
+        chunk = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(map_files, schema)) as pool:
+            reports = sorted(pool.map(_compare_pair, ordered, chunksize=chunk), key=lambda r: r["pair"])
+
+        with open(out_path, "w", encoding="utf-8", newline="") as out:
+            if fmt == "csv":
+                csv.writer(out).writerow(CSV_HEADER)
+            for job in jobs:
+                with open(job[-1], "r", encoding="utf-8", newline="") as part:
+                    shutil.copyfileobj(part, out)
+    finally:
+        shutil.rmtree(part_dir, ignore_errors=True)
+
+    return {"pairs": reports, "parse": parse_times, "seconds": time.perf_counter() - start}
@@ -0,0 +1,212 @@
+"""
+PatchForge Snapshot Cache
+=========================
+
+Content-addressed on-disk cache of normalized weapon maps
+(the {name: stats} maps `compare_jsons` builds internally).
+
+Entries are keyed by the SHA-256 of the snapshot file and stored as pickles
+in a per-user folder (never the working directory: loading a pickle runs
+code, so the folder must not be writable by anyone else). The entry files
+are the cache: a hit touches the file's mtime, and eviction scans the
+folder and drops the least recently used files until it fits the size cap,
+so concurrent runs cannot leak entries past it. A small index only
+remembers each path's size, mtime and digest, so unchanged files are not
+even re-hashed; concurrent runs merge it on save.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+from typing import Callable, Dict
+
+from patchforge_core import build_weapon_map, get_schema, load_json
+from patchforge_profile import profiled
+
+
+def _user_cache_dir() -> str:
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "patchforge")
+
+
+CACHE_DIR = _user_cache_dir()
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+CACHE_MAX_FILES = 4096       # snapshot paths remembered in the index
+CACHE_VERSION = 2
+
+_INDEX_FILE = "index.json"
+_ENTRY_SUFFIX = ".pickle"
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 hex digest of a file, read in 1 MB chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _check_private(directory: str):
+    """Refuse a cache folder other users can write to: its pickles would run their code."""
+    if not hasattr(os, "getuid"):
+        return
+    st = os.stat(directory)
+    if st.st_uid != os.getuid() or st.st_mode & 0o022:
+        raise PermissionError(f"Cache folder {directory} must be owned by you and not group/world-writable")
+
+
+class SnapshotCache:
+    """LRU, size-capped cache of weapon maps keyed by snapshot content."""
+
+    def __init__(self, directory: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        _check_private(directory)
+        self._files = self._load_index()
+        self._dirty = False
+
+    # -----------------------------------------------------
+    # Index
+    # -----------------------------------------------------
+    def _load_index(self) -> Dict:
+        try:
+            with open(os.path.join(self.directory, _INDEX_FILE), "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") == CACHE_VERSION:
+                return index["files"]
+        except (OSError, ValueError, KeyError):
+            pass
+        return {}
+
+    def _save_index(self):
+        """Write the index, merged with what other runs saved since it was loaded."""
+        if not self._dirty:
+            return
+        files = self._load_index()
+        for path, known in self._files.items():
+            if path not in files or files[path]["seen"] < known["seen"]:
+                files[path] = known
+        # forget the least recently seen paths beyond the cap
+        if len(files) > CACHE_MAX_FILES:
+            keep = sorted(files, key=lambda p: files[p]["seen"], reverse=True)[:CACHE_MAX_FILES]
+            files = {p: files[p] for p in keep}
+        self._files = files
+
+        path = os.path.join(self.directory, _INDEX_FILE)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "files": files}, f)
+        os.replace(tmp, path)
+        self._dirty = False
+
+    # -----------------------------------------------------
+    # Keys
+    # -----------------------------------------------------
+    def key_for(self, path: str) -> str:
+        """Cache key for a snapshot file; skips hashing when size+mtime are unchanged."""
+        abspath = os.path.abspath(path)
+        st = os.stat(abspath)
+        known = self._files.get(abspath)
+        if known and known["size"] == st.st_size and known["mtime"] == st.st_mtime_ns:
+            digest = known["sha256"]
+        else:
+            digest = file_digest(abspath)
+            self._files[abspath] = {"size": st.st_size, "mtime": st.st_mtime_ns, "sha256": digest,
+                                    "seen": time.time()}
+            self._dirty = True
+
+        # the metric schema is part of the key: streamed and flattened maps only keep its stats
+        schema = get_schema().fingerprint
+        return hashlib.sha256(f"{schema}|{digest}".encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _ENTRY_SUFFIX)
+
+    # -----------------------------------------------------
+    # Lookup
+    # -----------------------------------------------------
+    @profiled("cache", rows=len)
+    def get_weapon_map(self, path: str, loader: Callable[[str], Dict] = load_json) -> Dict[str, Dict]:
+        """Return the weapon map for a snapshot, parsing it only on a cache miss."""
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"File not found: {path}")
+
+        key = self.key_for(path)
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "rb") as f:
+                weapon_map = pickle.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self._remove(entry_path)
+        else:
+            self.hits += 1
+            try:
+                os.utime(entry_path)      # last use, for LRU eviction
+            except OSError:
+                pass
+            self._save_index()
+            return weapon_map
+
+        self.misses += 1
+        weapon_map = build_weapon_map(loader(path))
+
+        tmp = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(weapon_map, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, entry_path)
+
+        self._evict()
+        self._save_index()
+        return weapon_map
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _entries(self):
+        """(mtime, bytes, path) of every entry file on disk, whichever run wrote it."""
+        found = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(_ENTRY_SUFFIX) and entry.is_file():
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    found.append((st.st_mtime, st.st_size, entry.path))
+        return found
+
+    def _evict(self):
+        """Drop least-recently-used entries until the cache fits under max_bytes."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            total -= size
+            self._remove(path)
+
+    def clear(self):
+        """Remove every cached entry."""
+        for _, _, path in self._entries():
+            self._remove(path)
+        self._files = {}
+        self._dirty = False
+        self._remove(os.path.join(self.directory, _INDEX_FILE))
@@ -0,0 +1,141 @@
+"""
+PatchForge Summary Charts
+=========================
+
+The patch summary charts (change distribution pie, net Δ per metric bar),
+rendered off-screen to PNG and cached.
+
+Charts are drawn on matplotlib's Agg canvas directly (no pyplot, no GUI
+backend), so rendering is safe on a worker thread. Images are cached by
+the content of the summary they draw: reopening the GUI summary window or
+exporting an HTML report of the same comparison reuses the PNGs instead
+of drawing them again.
+
+matplotlib is optional and only imported when a chart is rendered.
+"""
+
+import hashlib
+import importlib.util
+import io
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from patchforge_profile import profiled
+
+CHART_DPI = 100
+CHART_SIZE = (4.6, 3.4)
+CHART_CACHE_SIZE = 16
+CHART_TITLES = {"pie": "Changes Distribution", "bar": "Net Δ by Metric"}
+
+
+def charts_available() -> bool:
+    """True when matplotlib is installed."""
+    return importlib.util.find_spec("matplotlib") is not None
+
+
+def chart_key(summary: Dict) -> str:
+    """Cache key of the charts drawn from summary."""
+    text = json.dumps(summary, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------
+# RENDERING
+# ---------------------------------------------------------
+def _png(fig) -> bytes:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    buf = io.BytesIO()
+    FigureCanvasAgg(fig).print_png(buf)
+    return buf.getvalue()
+
+
+@profiled("render charts", rows=len)
+def render_charts(summary: Dict) -> Dict[str, bytes]:
+    """{"pie": PNG, "bar": PNG} for a summarize_results summary."""
+    from matplotlib.figure import Figure
+
+    # PIE CHART
+    fig1 = Figure(figsize=CHART_SIZE, dpi=CHART_DPI)
+    ax1 = fig1.add_subplot(111)
+    labels = ["Buff", "Nerf", "Mixed", "No change"]
+    sizes = [summary["buffs"], summary["nerfs"], summary["mixed"], summary["nochange"]]
+    # avoid all zeros crash
+    if sum(sizes) == 0:
+        sizes = [1, 0, 0, 0]
+    ax1.pie(sizes, labels=labels, autopct="%1.1f%%", startangle=90)
+    ax1.axis("equal")
+
+    # BAR CHART
+    fig2 = Figure(figsize=CHART_SIZE, dpi=CHART_DPI)
+    ax2 = fig2.add_subplot(111)
+    per_metric_delta = summary["totals"]
+    metrics = list(per_metric_delta.keys())
+    values = [per_metric_delta[m] for m in metrics]
+    if not metrics:
+        metrics = ["(none)"]
+        values = [0]
+    ax2.bar(metrics, values)
+    ax2.set_ylabel("Net Δ (sum of new - old)")
+    ax2.set_xticks(range(len(metrics)))
+    ax2.set_xticklabels(metrics, rotation=20, ha="right")
+    fig2.tight_layout()
+
+    return {"pie": _png(fig1), "bar": _png(fig2)}
+
+
+# ---------------------------------------------------------
+# CACHE
+# ---------------------------------------------------------
+class ChartCache:
+    """LRU of rendered charts by summary content; safe to share between threads."""
+
+    def __init__(self, size: int = CHART_CACHE_SIZE):
+        self.size = size
+        self._images: "OrderedDict[str, Dict[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._render_lock = threading.Lock()   # one render at a time, so a key is never drawn twice
+
+    def peek(self, summary: Dict) -> Optional[Dict[str, bytes]]:
+        """Cached charts for summary, or None."""
+        key = chart_key(summary)
+        with self._lock:
+            images = self._images.get(key)
+            if images is not None:
+                self._images.move_to_end(key)
+            return images
+
+    def get(self, summary: Dict) -> Dict[str, bytes]:
+        """Charts for summary, rendered on this thread if not cached yet."""
+        images = self.peek(summary)
+        if images is not None:
+            return images
+        with self._render_lock:
+            images = self.peek(summary)
+            if images is None:
+                images = render_charts(summary)
+                with self._lock:
+                    self._images[chart_key(summary)] = images
+                    while len(self._images) > self.size:
+                        self._images.popitem(last=False)
+        return images
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+
+
+CHARTS = ChartCache()
+
+
+def chart_images(summary: Dict) -> Optional[Dict[str, bytes]]:
+    """Charts for summary from the shared cache; None when matplotlib is missing."""
+    return CHARTS.get(summary) if charts_available() else None
+
+
+def report_images(summary: Dict) -> Optional[Dict[str, bytes]]:
+    """{caption: PNG} for export_results(images=...); None when matplotlib is missing."""
+    images = chart_images(summary)
+    return {CHART_TITLES[name]: png for name, png in images.items()} if images else None
@@ -5,77 +5,189 @@ Use PatchForge from the command line.
 
 Examples:
     python patchforge_cli.py compare old.json new.json --export summary.html
+    python patchforge_cli.py compare old.json new.json --export summary.html --charts
     python patchforge_cli.py summary old.json new.json
+    python patchforge_cli.py top old.json new.json -k 10 --group metric
     python patchforge_cli.py compare old.json new.json --csv patch_diff.csv
+    python patchforge_cli.py compare old.json new.json --jsonl patch_diff.jsonl --gzip
+    python patchforge_cli.py compare old.json new.json --renames
+    python patchforge_cli.py renames old.json new.json --set "Ferro II=Ferro Mk II"
+    python patchforge_cli.py query old.json new.json -q "rarity=Rare metric=headDamage kind=nerf |delta|>5"
+    python patchforge_cli.py diff old.json new.json --weapon "Ferro II"
+    python patchforge_cli.py history patch1.json patch2.json patch3.json
+    python patchforge_cli.py ingest patch1.json patch2.json patch3.json --db patches.db
+    python patchforge_cli.py compare patch1 patch3 --archive patches.db
+    python patchforge_cli.py history --archive patches.db
+    python patchforge_cli.py batch pairs.csv --out archive.jsonl --workers 8
+    python patchforge_cli.py pack old.json
+    python patchforge_cli.py monitor snapshots/ --interval 30 --log patches.jsonl
+    python patchforge_cli.py monitor snapshots/ --webhook https://discord.com/api/webhooks/...
+    python patchforge_cli.py serve patch1.json patch2.json patch3.json --port 8765
+    python patchforge_cli.py compare old.json new.json --profile --profile-json trace.json
+    python patchforge_cli.py --schema my_metrics.json compare old.json new.json
 """
 
 import argparse
 import json
 import os
 import sys
+import time
 from datetime import datetime
 
-from patchforge_core import load_json, compare_jsons, summarize_results
+from patchforge_core import (
+    ENGINES, load_json, load_json_streaming, build_weapon_map, compare_jsons, compare_maps, iter_compare,
+    set_schema, structural_diff, summarize_results
+)
+from patchforge_archive import ARCHIVE_PATH, PatchArchive
+from patchforge_charts import report_images
+from patchforge_cache import CACHE_DIR, CACHE_MAX_BYTES, SnapshotCache
+from patchforge_export import EXPORT_FORMATS, export_results
+from patchforge_history import build_history, history_rows
+from patchforge_monitor import (
+    MONITOR_INTERVAL, MONITOR_PATTERNS, JsonlLogSink, PatchMonitor, ReportSink, fan_out, print_sink
+)
+from patchforge_pack import PACK_EXTENSION, pack_snapshot
+from patchforge_profile import Profiler
+from patchforge_query import QUERY_LIMIT, QUERY_ORDERS, ResultIndex, parse_query
+from patchforge_rename import RENAME_FILE, RenameMap, rename_keys
+from patchforge_rank import RANK_GROUPS, RANK_MEASURES, TOP_COUNT, rank_changes, rarity_map
+from patchforge_schema import SCHEMA_FILE, find_schema, load_schema
+from patchforge_server import SERVER_CACHE_SIZE, SERVER_HOST, SERVER_PORT
+
+# Heavier modules (process pools, asyncio, http.server) are imported by the
+# commands that use them, so every other command starts fast.
 
 
 # ---------------------------------------------------------
 # Export Utilities
 # ---------------------------------------------------------
-def export_csv(results, path):
+def export_report(results, path, fmt, compress=False, images=None):
+    """Stream results to a CSV / HTML / JSONL report (optionally gzip-compressed)."""
+    if compress and not path.lower().endswith(".gz"):
+        path += ".gz"
+    export_results(results, path, fmt, compress, images)
+    print(f"✅ {fmt.upper()} exported: {path} ({os.path.getsize(path):,} bytes)")
+
+
+def export_csv(results, path, compress=False):
+    export_report(results, path, "csv", compress)
+
+
+def export_html(results, path, compress=False, images=None):
+    export_report(results, path, "html", compress, images)
+
+
+def export_history_csv(history, rows, path):
     import csv
     with open(path, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
-        writer.writerow(["Weapon", "Metric", "Old", "New", "Δ", "Change"])
-        for r in results:
-            delta_str = "–" if r["delta"] is None else f"{r['delta']:+.2f}"
+        writer.writerow(["Weapon", "Metric", *history.labels, "Drift", "Change",
+                         "Changes", "First Change", "Last Change"])
+        for r in rows:
+            drift_str = "–" if r["drift"] is None else f"{r['drift']:+.2f}"
             writer.writerow([
-                r["weapon"], r["metric"], r["old"], r["new"], delta_str, r["change"]
+                r["weapon"], r["metric"], *["" if v is None else v for v in r["values"]],
+                drift_str, r["change"], r["changes"], r["first_change"] or "", r["last_change"] or ""
             ])
     print(f"✅ CSV exported: {path}")
 
 
-def export_html(results, path):
-    rows = []
-    for r in results:
-        color = {
-            "success": "#6fdc8c",
-            "danger": "#f28b82",
-            "warning": "#fdd388",
-            "secondary": "#cccccc"
-        }.get(r["status"], "white")
-        delta_str = "–" if r["delta"] is None else f"{r['delta']:+.2f}"
-        rows.append(
-            f"<tr style='color:{color}'><td>{r['weapon']}</td>"
-            f"<td>{r['metric']}</td><td>{r['old']}</td><td>{r['new']}</td>"
-            f"<td>{delta_str}</td><td>{r['change']}</td></tr>"
-        )
-
-    html = f"""
-    <html><head><meta charset='utf-8'><style>
-    body {{ background-color:#0f1115; color:white; font-family:Segoe UI; }}
-    table {{ width:100%; border-collapse:collapse; }}
-    td,th {{ border:1px solid #333; padding:6px; }}
-    tr:nth-child(even) {{ background:#151a22; }}
-    </style></head>
-    <body><h2>PatchForge Report</h2><table>
-    <tr><th>Weapon</th><th>Metric</th><th>Old</th><th>New</th><th>Δ</th><th>Status</th></tr>
-    {''.join(rows)}
-    </table></body></html>
-    """
-    with open(path, "w", encoding="utf-8") as f:
-        f.write(html)
-    print(f"✅ HTML exported: {path}")
-
-
 # ---------------------------------------------------------
 # CLI Commands
 # ---------------------------------------------------------
+def load_snapshot(path, args):
+    """Load a snapshot, streaming it when --stream is set."""
+    if getattr(args, "stream", False):
+        return load_json_streaming(path)
+    return load_json(path)
+
+
+def require_rarity(*snapshots):
+    """Exit when a snapshot is packed: packed snapshots keep no rarity, every weapon would be Unknown."""
+    if any(hasattr(data, "weapon_map") for data in snapshots):
+        sys.exit("Rarity is not stored in packed snapshots (.pfpack): use the JSON snapshots")
+
+
+def open_cache(args):
+    """The --cache SnapshotCache, or exit when its folder cannot be used safely."""
+    try:
+        return SnapshotCache(max_bytes=args.cache_max_mb * 1024 * 1024)
+    except OSError as e:
+        sys.exit(f"Cannot use the snapshot cache: {e}")
+
+
+def load_weapon_maps(paths, args):
+    """Load each snapshot once into a weapon map, going through the parse cache if enabled."""
+    if getattr(args, "cache", False):
+        cache = open_cache(args)
+        loader = lambda path: load_snapshot(path, args)  # noqa: E731
+        maps = [cache.get_weapon_map(path, loader) for path in paths]
+        print(f"🗃️  Cache: {cache.hits} hit(s), {cache.misses} miss(es)")
+        return maps
+    return [build_weapon_map(load_snapshot(path, args)) for path in paths]
+
+
+def open_archive(args):
+    """The --archive database, or exit when it cannot be opened."""
+    # archived patches are already parsed and compared in SQL: loading options do not apply
+    ignored = [flag for flag, used in (
+        ("--engine", getattr(args, "engine", "python") != "python"),
+        ("--stream", getattr(args, "stream", False)),
+        ("--cache", getattr(args, "cache", False)),
+        ("--renames", getattr(args, "renames", None)),
+    ) if used]
+    if ignored:
+        sys.exit(f"--archive cannot be combined with {', '.join(ignored)}")
+    if not os.path.exists(args.archive):
+        sys.exit(f"Archive not found: {args.archive} (create it with the ingest command)")
+    try:
+        return PatchArchive(args.archive)
+    except ValueError as e:
+        sys.exit(str(e))
+
+
+def open_renames(args):
+    """The --renames map, or exit when the file is invalid."""
+    try:
+        return RenameMap(args.renames)
+    except (OSError, ValueError) as e:
+        sys.exit(f"Invalid rename map: {e}")
+
+
+def resolve_renames(args, old_map, new_map):
+    """{old: new} renames between the maps with --renames (cached in the map file), else None."""
+    if not getattr(args, "renames", None):
+        return None
+    rename_map = open_renames(args)
+    renames = rename_map.resolve(old_map, new_map)
+    if rename_map.found:
+        rename_map.save()
+    if not getattr(args, "json", False):
+        for old, new in renames.items():
+            print(f"🔀 Renamed: {old} → {new}")
+    return renames
+
+
+def run_comparison(args):
+    """Load args.old / args.new and compare them (patch labels with --archive)."""
+    if getattr(args, "archive", None):
+        try:
+            return open_archive(args).compare(args.old, args.new)
+        except ValueError as e:
+            sys.exit(str(e))
+    if getattr(args, "cache", False) or getattr(args, "renames", None):
+        old_map, new_map = load_weapon_maps([args.old, args.new], args)
+        renames = resolve_renames(args, old_map, new_map)
+        return compare_maps(old_map, new_map, engine=args.engine, renames=renames)
+
+    old_data = load_snapshot(args.old, args)
+    new_data = load_snapshot(args.new, args)
+    return compare_jsons(old_data, new_data, engine=args.engine)
+
+
 def cmd_compare(args):
     """Compare two JSON files."""
-    old_data = load_json(args.old)
-    new_data = load_json(args.new)
-
-    results = compare_jsons(old_data, new_data)
+    results = run_comparison(args)
     summary = summarize_results(results)
 
     print("\n📊 PATCH COMPARISON SUMMARY")
@@ -95,18 +207,28 @@ def cmd_compare(args):
 
     # Optional export
     if args.csv:
-        export_csv(results, args.csv)
+        export_csv(results, args.csv, args.gzip)
     if args.export:
-        export_html(results, args.export)
+        images = None
+        if args.charts:
+            images = report_images(summary)
+            if images is None:
+                print("⚠️  matplotlib is not installed; exporting without charts")
+        export_html(results, args.export, args.gzip, images)
+    if args.jsonl:
+        export_report(results, args.jsonl, "jsonl", args.gzip)
 
 
 def cmd_summary(args):
     """Display only aggregated summary data."""
-    old_data = load_json(args.old)
-    new_data = load_json(args.new)
-
-    results = compare_jsons(old_data, new_data)
-    summary = summarize_results(results)
+    if args.archive:
+        # aggregated in SQL; the rows are never fetched
+        try:
+            summary = open_archive(args).summary(args.old, args.new)
+        except ValueError as e:
+            sys.exit(str(e))
+    else:
+        summary = summarize_results(run_comparison(args))
 
     print("\n📈 PATCH SUMMARY")
     print("-" * 40)
@@ -120,13 +242,391 @@ def cmd_summary(args):
         print(f"  {metric:<25} {delta:+.2f}")
 
 
+def cmd_top(args):
+    """Largest buffs and nerfs, overall or per metric / rarity."""
+    if args.group == "rarity":
+        # rarity is dropped by weapon maps and packed snapshots: read the documents
+        if args.cache:
+            sys.exit("--group rarity cannot use --cache: the cache keeps weapon stats only")
+        old_data, new_data = load_snapshot(args.old, args), load_snapshot(args.new, args)
+        require_rarity(old_data, new_data)
+        rarities = rarity_map(old_data, new_data)
+        old_map, new_map = build_weapon_map(old_data), build_weapon_map(new_data)
+    else:
+        rarities = None
+        old_map, new_map = load_weapon_maps([args.old, args.new], args)
+    renames = resolve_renames(args, old_map, new_map)
+    if rarities is not None:
+        rarities = rename_keys(rarities, renames)
+
+    # rows are ranked as they are produced; the full comparison is never stored
+    ranking = rank_changes(iter_compare(old_map, new_map, renames), args.k, args.group, args.measure,
+                           rarities=rarities, metric=args.metric)
+
+    if args.json:
+        print(json.dumps(ranking, ensure_ascii=False, indent=2))
+        return
+
+    unit = "|Δ| % of old value" if args.measure == "percent" else "|Δ|"
+    print(f"\n🏆 TOP {args.k} CHANGES (by {unit})")
+    if not ranking:
+        print("-" * 40)
+        print("No buffs or nerfs.")
+    for name, sides in ranking.items():
+        print("-" * 40)
+        if args.group != "overall":
+            print(f"[{name}]")
+        for side, label in (("buffs", "Buffs"), ("nerfs", "Nerfs")):
+            print(f"  {label}:")
+            for i, r in enumerate(sides[side], 1):
+                score = f"{r['score']:.1f}%" if args.measure == "percent" else f"{r['delta']:+.2f}"
+                change = f"{r['old']} → {r['new']}"
+                print(f"  {i:>3}. {r['weapon']:<18} {r['metric']:<25} {change:<18} {score:<9} {r['change']}")
+            if not sides[side]:
+                print("       (none)")
+
+
+def cmd_query(args):
+    """Filter the comparison with indexed queries (one index, any number of queries)."""
+    queries = args.where or [""]
+    try:
+        parsed = [parse_query(text) for text in queries]
+    except ValueError as e:
+        sys.exit(str(e))
+
+    old_data, new_data = load_snapshot(args.old, args), load_snapshot(args.new, args)
+    if any("rarity" in query for query in parsed):
+        require_rarity(old_data, new_data)
+    renames = None
+    if args.renames:
+        old_map, new_map = build_weapon_map(old_data), build_weapon_map(new_data)
+        renames = resolve_renames(args, old_map, new_map)
+        results = compare_maps(old_map, new_map, engine=args.engine, renames=renames)
+    else:
+        results = compare_jsons(old_data, new_data, engine=args.engine)
+    start = time.perf_counter()
+    index = ResultIndex(results, rename_keys(rarity_map(old_data, new_data), renames))
+    built = time.perf_counter() - start
+
+    report = []
+    for text, query in zip(queries, parsed):
+        start = time.perf_counter()
+        hits = index.query(**query)
+        rows = [] if args.count else hits.rows(args.limit, args.sort)
+        report.append((text, len(hits), rows, time.perf_counter() - start))
+
+    if args.json:
+        print(json.dumps([
+            {"query": text, "matches": count, "rows": [dict(r) for r in rows]}
+            for text, count, rows, _ in report
+        ], ensure_ascii=False, indent=2))
+        return
+
+    print(f"\n🔎 QUERY ({len(index):,} rows indexed in {built:.2f}s)")
+    for text, count, rows, seconds in report:
+        print("-" * 40)
+        print(f"{text or '(all rows)'}: {count:,} match(es) in {seconds * 1000:.2f} ms")
+        for r in rows:
+            delta_str = "–" if r["delta"] is None else f"{r['delta']:+.2f}"
+            change = f"{r['old']} → {r['new']}"
+            print(f"  {r['weapon']:<18} {r['metric']:<25} {change:<18} {delta_str:<8} {r['change']}")
+        if not args.count and len(rows) < count:
+            print(f"  ... ({count - len(rows):,} more, raise --limit to see them)")
+
+
+def cmd_diff(args):
+    """Path-level structural diff of the full snapshot trees."""
+    old_data, new_data = load_json(args.old), load_json(args.new)
+    if hasattr(old_data, "weapon_map") or hasattr(new_data, "weapon_map"):
+        sys.exit("diff needs JSON snapshots: packed snapshots only keep the metric stats")
+    try:
+        changes = structural_diff(old_data, new_data, args.weapon)
+    except KeyError:
+        sys.exit(f"No weapon named {args.weapon!r} in either snapshot")
+
+    if args.json:
+        print(json.dumps([{k: v for k, v in c.items() if k != "parts"} for c in changes],
+                         ensure_ascii=False, indent=2))
+        return
+
+    print(f"\n🧬 STRUCTURAL DIFF ({len(changes)} changed path(s))")
+    print("-" * 40)
+    marks = {"changed": "~", "added": "+", "removed": "-"}
+    for c in changes[:args.limit]:
+        old = "" if c["kind"] == "added" else json.dumps(c["old"], ensure_ascii=False)
+        new = "" if c["kind"] == "removed" else json.dumps(c["new"], ensure_ascii=False)
+        delta = "" if c["delta"] is None else f" ({c['delta']:+g})"
+        text = f"{old} → {new}" if c["kind"] == "changed" else old or new
+        print(f"{marks[c['kind']]} {c['path'] or '(weapon)'}: {text[:120]}{delta}")
+    if len(changes) > args.limit:
+        print(f"... ({len(changes) - args.limit} more, raise --limit to see them)")
+
+
+def cmd_history(args):
+    """Track stats across N snapshots in one pass."""
+    if args.archive:
+        # snapshots name archived patches; none means all of them
+        try:
+            history = open_archive(args).history(args.snapshots or None, args.weapon)
+        except ValueError as e:
+            sys.exit(str(e))
+        labels = history.labels
+        if len(labels) < 2:
+            sys.exit("history needs at least two archived patches")
+    else:
+        if len(args.snapshots) < 2:
+            sys.exit("history needs at least two snapshots")
+        labels = [os.path.splitext(os.path.basename(p))[0] for p in args.snapshots]
+        history = build_history(load_weapon_maps(args.snapshots, args), labels)
+    rows = [
+        r for r in history_rows(history, args.weapon)
+        if r["changes"] or args.all
+    ]
+
+    print(f"\n🕓 PATCH HISTORY ({len(labels)} snapshots: {labels[0]} → {labels[-1]})")
+    print("-" * 40)
+    for r in rows:
+        drift_str = "–" if r["drift"] is None else f"{r['drift']:+.2f}"
+        span = f"{r['first_change']} → {r['last_change']}" if r["changes"] else "–"
+        print(f"{r['weapon']:<18} {r['metric']:<25} {drift_str:<8} {r['change']:<10} "
+              f"{r['changes']} change(s)  {span}")
+    print("-" * 40)
+    print(f"{len(rows)} cell(s) shown, {len(history.series)} weapons tracked")
+
+    if args.csv:
+        export_history_csv(history, rows, args.csv)
+
+
+def cmd_ingest(args):
+    """Bulk-load snapshots into the SQLite patch archive (oldest first)."""
+    if args.label and len(args.label) != len(args.snapshots):
+        sys.exit("Give one --label per snapshot")
+    labels = args.label or [None] * len(args.snapshots)
+
+    with PatchArchive(args.db) as archive:
+        for path, label in zip(args.snapshots, labels):
+            start = time.perf_counter()
+            try:
+                patch = archive.ingest_file(path, label, lambda p: load_snapshot(p, args))
+            except (OSError, ValueError) as e:
+                sys.exit(f"{path}: {e}")
+            if not patch["created"]:
+                print(f"⏭️  {path}: already archived as {patch['label']}")
+                continue
+            print(f"✅ {path} → #{patch['seq']} {patch['label']}: {patch['weapons']} weapons, "
+                  f"{patch['stats']} stats ({patch['new_values']} new or changed) "
+                  f"in {time.perf_counter() - start:.2f}s")
+
+        patches = archive.patches()
+        sizes = archive.sizes()
+        print(f"\n🗄️  PATCH ARCHIVE {args.db} ({len(patches)} patches, {sizes['bytes']:,} bytes)")
+        print("-" * 40)
+        for p in patches:
+            print(f"#{p['seq']:<4} {p['label']:<24} {p['weapons']:>7} weapons  {p['stats']:>9} stats  {p['ingested']}")
+        print("-" * 40)
+        print(f"{sizes['cells']:,} stat values stored as {sizes['intervals']:,} rows")
+
+
+def cmd_renames(args):
+    """Resolve, review and edit the cached rename map for a pair of snapshots."""
+    rename_map = open_renames(args)
+    for entry in args.set or []:
+        old, sep, new = entry.partition("=")
+        if not sep or not old or not new:
+            sys.exit(f"--set expects OLD=NEW, got {entry!r}")
+        rename_map.set(old, new)
+    for old in args.reject or []:
+        rename_map.set(old, None)
+    for old in args.forget or []:
+        rename_map.forget(old)
+
+    old_map, new_map = load_weapon_maps([args.old, args.new], args)
+    renames = rename_map.resolve(old_map, new_map, auto=not args.no_auto)
+    rename_map.save()
+
+    print(f"\n🔀 RENAMES ({args.old} → {args.new})")
+    print("-" * 40)
+    for old, new in renames.items():
+        found = rename_map.found.get(old)
+        source = f"found, score {found[1]:.2f}" if found else "from map"
+        print(f"{old:<24} → {new:<24} ({source})")
+    if not renames:
+        print("No renames.")
+    unmatched_old = sum(1 for name in old_map if name not in new_map and name not in renames)
+    unmatched_new = sum(1 for name in new_map if name not in old_map) - len(renames)
+    print("-" * 40)
+    print(f"{unmatched_old} removed and {unmatched_new} added weapon(s) left unpaired")
+    print(f"✅ Rename map saved: {args.renames} ({len(rename_map.pairs)} entries; edit it to correct or reject pairs)")
+
+
+def cmd_batch(args):
+    """Compare every pair in a manifest using a process pool."""
+    from patchforge_batch import load_manifest, run_batch
+
+    pairs = load_manifest(args.manifest)
+    report = run_batch(pairs, args.out, workers=args.workers, engine=args.engine)
+
+    print(f"\n🗂️  BATCH COMPARISON ({len(pairs)} pairs, {len(report['parse'])} snapshots parsed once)")
+    print("-" * 40)
+    for r in report["pairs"]:
+        s = r["summary"]
+        print(f"#{r['pair']:<4} {os.path.basename(r['old'])} → {os.path.basename(r['new'])}  "
+              f"buffs {s['buffs']}  nerfs {s['nerfs']}  mixed {s['mixed']}  "
+              f"{r['rows']} rows  {r['seconds'] * 1000:.1f} ms")
+    print("-" * 40)
+    print(f"Parse: {sum(report['parse'].values()):.2f}s summed worker wall time across {len(report['parse'])} file(s)")
+    print(f"Wall clock: {report['seconds']:.2f}s")
+    print(f"✅ Results written: {args.out}")
+
+
+def cmd_monitor(args):
+    """Watch a folder and diff each new snapshot against the previous one."""
+    cache = open_cache(args) if args.cache else None
+
+    def load_map(path):
+        if cache is not None:
+            return cache.get_weapon_map(path, lambda p: load_snapshot(p, args))
+        return build_weapon_map(load_snapshot(path, args))
+
+    sinks = [print_sink]
+    if args.log:
+        sinks.append(JsonlLogSink(args.log))
+    if args.reports:
+        sinks.append(ReportSink(args.reports, args.format, args.gzip))
+    webhooks = None
+    if args.webhook:
+        from patchforge_notify import WebhookSink
+        webhooks = WebhookSink(args.webhook, top=args.top)
+    if webhooks is not None:
+        sinks.append(webhooks)
+
+    monitor = PatchMonitor(args.directory, fan_out(*sinks), engine=args.engine, loader=load_map,
+                           patterns=args.pattern or MONITOR_PATTERNS)
+    print(f"👀 Watching {args.directory} (every {args.interval:g}s)")
+    monitor.start(from_start=args.from_start)
+    print(f"   Baseline: {os.path.basename(monitor.previous[0]) if monitor.previous else '(none yet)'}")
+
+    try:
+        if args.once:
+            monitor.poll(settle=False)
+        else:
+            monitor.run(args.interval)
+    except KeyboardInterrupt:
+        print("\n⏹️  Monitor stopped")
+    finally:
+        if monitor.errors:
+            print(f"⚠️  Skipped {monitor.errors} snapshot(s) that failed to load or compare")
+        if monitor.sink_errors:
+            print(f"⚠️  {monitor.sink_errors} diff(s) could not be delivered (logs, reports or webhooks)")
+        if webhooks is not None:
+            webhooks.close()
+            print(f"📣 Notifications: {webhooks.dispatcher.stats}")
+
+
+def cmd_serve(args):
+    """Serve compare / summary / history queries over HTTP from preloaded snapshots."""
+    print(f"📦 Loading {len(args.snapshots)} snapshot(s)…")
+    from patchforge_server import SnapshotIndex, make_server
+
+    maps = dict(zip(args.snapshots, load_weapon_maps(args.snapshots, args)))
+    index = SnapshotIndex(args.snapshots, engine=args.engine, cache_size=args.cache_size, loader=maps.get)
+    server = make_server(index, args.host, args.port, quiet=not args.verbose)
+    host, port = server.server_address[:2]
+    print(f"🌐 Serving {', '.join(index.labels)} on http://{host}:{port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️  Server stopped")
+    finally:
+        server.server_close()
+
+
+def cmd_pack(args):
+    """Convert a JSON snapshot into the packed binary format."""
+    out = args.output or os.path.splitext(args.snapshot)[0] + PACK_EXTENSION
+    count = pack_snapshot(load_json_streaming(args.snapshot), out)
+    print(f"✅ Packed {count} weapons: {out} ({os.path.getsize(out):,} bytes)")
+
+
 # ---------------------------------------------------------
 # ENTRY POINT
 # ---------------------------------------------------------
+def int_at_least(minimum, maximum=None):
+    """argparse type: an int no smaller than minimum (and no larger than maximum)."""
+    def parse(text):
+        try:
+            value = int(text)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid int value: {text!r}")
+        if value < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}, got {value}")
+        if maximum is not None and value > maximum:
+            raise argparse.ArgumentTypeError(f"must be at most {maximum}, got {value}")
+        return value
+    return parse
+
+
+def add_loading_options(p, engine=True, cache=True):
+    """Options shared by every command that loads and compares snapshots."""
+    if engine:
+        p.add_argument("--engine", choices=ENGINES, default="python",
+                       help="Comparison engine (columnar requires NumPy, compact saves memory)")
+    p.add_argument("--stream", action="store_true",
+                   help="Read snapshots incrementally (for very large dumps)")
+    if cache:
+        p.add_argument("--cache", action="store_true",
+                       help=f"Reuse parsed snapshots from the on-disk cache ({CACHE_DIR})")
+        p.add_argument("--cache-max-mb", type=int_at_least(0), default=CACHE_MAX_BYTES // (1024 * 1024),
+                       help="Cache size cap in MB (least recently used entries are evicted)")
+    p.add_argument("--profile", action="store_true",
+                   help="Print wall / CPU time, peak memory and rows per pipeline stage")
+    p.add_argument("--profile-json", metavar="PATH",
+                   help="Write stage totals and a Chrome trace (implies --profile)")
+    p.add_argument("--profile-stats", metavar="PATH",
+                   help="Write cProfile statistics of the profiled stages (implies --profile)")
+
+
+def add_rename_option(p):
+    """--renames: pair renamed weapons, through the cached rename map."""
+    p.add_argument("--renames", nargs="?", const=RENAME_FILE, metavar="FILE",
+                   help=f"Pair renamed weapons (trigram + stat matching), cached in FILE (default: {RENAME_FILE})")
+
+
+def add_archive_option(p):
+    """--archive: read old / new (or the history snapshots) as patch labels from an archive."""
+    p.add_argument("--archive", nargs="?", const=ARCHIVE_PATH, metavar="DB",
+                   help=f"Treat snapshot arguments as patch labels in this archive (default: {ARCHIVE_PATH}); "
+                        "not combinable with --engine, --stream or --cache")
+
+
+def run_profiled(args):
+    """Run args.func, under a Profiler when any --profile option is set."""
+    enabled = any(getattr(args, name, None) for name in ("profile", "profile_json", "profile_stats"))
+    if not enabled:
+        args.func(args)
+        return
+
+    profiler = Profiler(cprofile=bool(args.profile_stats))
+    try:
+        with profiler:
+            args.func(args)
+    finally:
+        print("\n⏱️  PROFILE")
+        print("-" * 40)
+        print(profiler.report())
+        if args.profile_json:
+            profiler.dump_json(args.profile_json)
+            print(f"✅ Trace written: {args.profile_json}")
+        if args.profile_stats:
+            profiler.dump_stats(args.profile_stats)
+            print(f"✅ cProfile stats written: {args.profile_stats} (python -m pstats {args.profile_stats})")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="PatchForge CLI — Arc Raiders Patch Comparator"
     )
+    parser.add_argument("--schema", help=f"Metric schema JSON (default: {SCHEMA_FILE} if present)")
 
     sub = parser.add_subparsers(dest="command", required=True)
 
@@ -136,16 +636,147 @@ def main():
     p_compare.add_argument("new", help="Path to new JSON file")
     p_compare.add_argument("--csv", help="Optional CSV export path")
     p_compare.add_argument("--export", help="Optional HTML export path")
+    p_compare.add_argument("--jsonl", help="Optional JSONL export path (one row object per line)")
+    p_compare.add_argument("--gzip", action="store_true", help="Gzip-compress exports (adds .gz)")
+    p_compare.add_argument("--charts", action="store_true",
+                           help="Embed the summary charts in the --export HTML report (needs matplotlib)")
+    add_loading_options(p_compare)
+    add_archive_option(p_compare)
+    add_rename_option(p_compare)
     p_compare.set_defaults(func=cmd_compare)
 
     # summary
     p_summary = sub.add_parser("summary", help="Display summary only")
     p_summary.add_argument("old", help="Path to old JSON file")
     p_summary.add_argument("new", help="Path to new JSON file")
+    add_loading_options(p_summary)
+    add_archive_option(p_summary)
+    add_rename_option(p_summary)
     p_summary.set_defaults(func=cmd_summary)
 
+    # top
+    p_top = sub.add_parser("top", help="Largest buffs and nerfs, overall or per metric / rarity")
+    p_top.add_argument("old", help="Path to old JSON file")
+    p_top.add_argument("new", help="Path to new JSON file")
+    p_top.add_argument("-k", type=int_at_least(1), default=TOP_COUNT, help=f"Rows per list (default: {TOP_COUNT})")
+    p_top.add_argument("--group", choices=RANK_GROUPS, default="overall", help="Rank overall, per metric or per rarity")
+    p_top.add_argument("--measure", choices=RANK_MEASURES, default="delta",
+                       help="Rank by absolute delta or by percent of the old value")
+    p_top.add_argument("--metric", help="Only rank this metric")
+    p_top.add_argument("--json", action="store_true", help="Print the ranking as JSON")
+    add_loading_options(p_top, engine=False)
+    add_rename_option(p_top)
+    p_top.set_defaults(func=cmd_top)
+
+    # query
+    p_query = sub.add_parser("query", help="Filter results by weapon, metric, change kind, rarity and delta")
+    p_query.add_argument("old", help="Path to old JSON file")
+    p_query.add_argument("new", help="Path to new JSON file")
+    p_query.add_argument("-q", "--where", action="append", metavar="QUERY",
+                         help='Query, e.g. "rarity=Rare metric=headDamage kind=nerf |delta|>5" (repeatable)')
+    p_query.add_argument("--limit", type=int_at_least(0), default=QUERY_LIMIT, help=f"Rows shown per query (default: {QUERY_LIMIT})")
+    p_query.add_argument("--sort", choices=QUERY_ORDERS, default="abs",
+                         help="Row order: largest |Δ| first (abs), by Δ, or table order")
+    p_query.add_argument("--count", action="store_true", help="Only print match counts")
+    p_query.add_argument("--json", action="store_true", help="Print the matches as JSON")
+    # no --cache: queries need rarity, which the cache (weapon stats only) does not keep
+    add_loading_options(p_query, cache=False)
+    add_rename_option(p_query)
+    p_query.set_defaults(func=cmd_query)
+
+    # diff
+    p_diff = sub.add_parser("diff", help="Path-level diff of the full snapshot trees (nested stats, lists)")
+    p_diff.add_argument("old", help="Path to old JSON file")
+    p_diff.add_argument("new", help="Path to new JSON file")
+    p_diff.add_argument("--weapon", help="Only diff this weapon (paths relative to it)")
+    p_diff.add_argument("--limit", type=int_at_least(0), default=200, help="Changes printed (default: 200)")
+    p_diff.add_argument("--json", action="store_true", help="Print the changes as JSON")
+    p_diff.set_defaults(func=cmd_diff)
+
+    # renames
+    p_renames = sub.add_parser("renames", help="Find renamed weapons between two snapshots and edit the rename map")
+    p_renames.add_argument("old", help="Path to old JSON file")
+    p_renames.add_argument("new", help="Path to new JSON file")
+    p_renames.add_argument("--file", dest="renames", default=RENAME_FILE,
+                           help=f"Rename map path (default: {RENAME_FILE})")
+    p_renames.add_argument("--set", action="append", metavar="OLD=NEW", help="Record a rename (repeatable)")
+    p_renames.add_argument("--reject", action="append", metavar="OLD", help="Never pair this weapon (repeatable)")
+    p_renames.add_argument("--forget", action="append", metavar="OLD", help="Drop a map entry (repeatable)")
+    p_renames.add_argument("--no-auto", action="store_true", help="Only apply the map; do not look for new renames")
+    add_loading_options(p_renames, engine=False)
+    p_renames.set_defaults(func=cmd_renames)
+
+    # history
+    p_history = sub.add_parser("history", help="Track stats across several snapshots (oldest first)")
+    p_history.add_argument("snapshots", nargs="*", help="Snapshot paths (or archived patch labels), oldest to newest")
+    p_history.add_argument("--weapon", help="Only show this weapon")
+    p_history.add_argument("--all", action="store_true", help="Also show cells that never changed")
+    p_history.add_argument("--csv", help="Optional CSV export path")
+    add_loading_options(p_history, engine=False)
+    add_archive_option(p_history)
+    p_history.set_defaults(func=cmd_history)
+
+    # ingest
+    p_ingest = sub.add_parser("ingest", help="Bulk-load snapshots into a SQLite patch archive")
+    p_ingest.add_argument("snapshots", nargs="*", help="Snapshot paths, oldest to newest (none: list the archive)")
+    p_ingest.add_argument("--db", default=ARCHIVE_PATH, help=f"Archive path (default: {ARCHIVE_PATH})")
+    p_ingest.add_argument("--label", action="append",
+                          help="Patch label per snapshot (repeatable, default: file name)")
+    p_ingest.add_argument("--stream", action="store_true",
+                          help="Read snapshots incrementally (for very large dumps)")
+    p_ingest.set_defaults(func=cmd_ingest)
+
+    # batch
+    p_batch = sub.add_parser("batch", help="Compare many snapshot pairs from a manifest in parallel")
+    p_batch.add_argument("manifest", help="CSV (old,new per line) or JSON list of pairs")
+    p_batch.add_argument("--out", required=True, help="Combined output path (.csv or .jsonl)")
+    p_batch.add_argument("--workers", type=int_at_least(1), default=None, help="Worker processes (default: CPU count)")
+    p_batch.add_argument("--engine", choices=ENGINES, default="python",
+                         help="Comparison engine (columnar requires NumPy, compact saves memory)")
+    p_batch.set_defaults(func=cmd_batch)
+
+    # monitor
+    p_monitor = sub.add_parser("monitor", help="Watch a folder and diff each new snapshot against the last one")
+    p_monitor.add_argument("directory", help="Folder that receives snapshot files")
+    p_monitor.add_argument("--interval", type=float, default=MONITOR_INTERVAL, help="Seconds between polls")
+    p_monitor.add_argument("--pattern", action="append",
+                           help=f"File pattern to watch (repeatable, default: {' '.join(MONITOR_PATTERNS)})")
+    p_monitor.add_argument("--from-start", action="store_true",
+                           help="Diff the snapshots already in the folder instead of starting from the newest")
+    p_monitor.add_argument("--once", action="store_true", help="Process what is there now and exit")
+    p_monitor.add_argument("--log", help="Append a JSONL summary line per diff to this file")
+    p_monitor.add_argument("--reports", help="Write a full report per diff into this folder")
+    p_monitor.add_argument("--format", choices=EXPORT_FORMATS, default="csv", help="Report format for --reports")
+    p_monitor.add_argument("--gzip", action="store_true", help="Gzip-compress reports")
+    p_monitor.add_argument("--webhook", action="append",
+                           help="POST each diff to this webhook URL (repeatable, Discord-compatible)")
+    p_monitor.add_argument("--top", type=int, default=5, help="Top changes listed in notifications")
+    add_loading_options(p_monitor)
+    p_monitor.set_defaults(func=cmd_monitor)
+
+    # serve
+    p_serve = sub.add_parser("serve", help="Local HTTP query service over preloaded snapshots")
+    p_serve.add_argument("snapshots", nargs="+", help="Snapshot paths, oldest to newest")
+    p_serve.add_argument("--host", default=SERVER_HOST, help=f"Bind address (default: {SERVER_HOST})")
+    p_serve.add_argument("--port", type=int_at_least(0, 65535), default=SERVER_PORT, help=f"Port (default: {SERVER_PORT})")
+    p_serve.add_argument("--cache-size", type=int_at_least(0), default=SERVER_CACHE_SIZE,
+                         help="Cached responses kept in memory (LRU)")
+    p_serve.add_argument("--verbose", action="store_true", help="Log every request")
+    add_loading_options(p_serve)
+    p_serve.set_defaults(func=cmd_serve)
+
+    # pack
+    p_pack = sub.add_parser("pack", help="Convert a JSON snapshot to a packed binary file")
+    p_pack.add_argument("snapshot", help="Path to JSON snapshot")
+    p_pack.add_argument("-o", "--output", help="Output path (default: <snapshot>.pfpack)")
+    p_pack.set_defaults(func=cmd_pack)
+
     args = parser.parse_args()
-    args.func(args)
+    try:
+        set_schema(load_schema(args.schema) if args.schema else find_schema())
+    except (OSError, ValueError) as e:
+        sys.exit(f"Invalid metric schema: {e}")
+    run_profiled(args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,224 @@
+"""
+PatchForge Columnar Engine
+==========================
+
+NumPy-backed alternative to the pure Python loop in `compare_jsons`.
+
+Each snapshot is loaded into a weapon × metric float matrix (NaN marks a
+missing stat). Deltas, buff/nerf direction and threshold severity are then
+computed as whole-array operations, and result rows are only turned into
+dicts when they are read.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+from patchforge_core import as_number, build_weapon_map, get_schema
+from patchforge_profile import profiled
+
+# ---------------------------------------------------------
+# STATUS CODES
+# ---------------------------------------------------------
+MISSING, NOCHANGE, BUFF, NERF = 0, 1, 2, 3
+
+STATUS_TAGS = ("secondary", "secondary", "success", "danger")
+SEVERITY_MARKS = ("·", "•", "●")
+
+
+# ---------------------------------------------------------
+# SNAPSHOT MATRIX
+# ---------------------------------------------------------
+class SnapshotMatrix:
+    """One snapshot as a weapon × metric float matrix."""
+
+    def __init__(self, names: List[str], stats: List[Dict], values: np.ndarray):
+        self.names = names
+        self.stats = stats          # raw stats dicts (or a lazy sequence of them), aligned with names
+        self.values = values        # shape (len(names), metrics in the schema), NaN = missing
+        # names are kept sorted so matching rosters can skip re-alignment
+        self.index = {name: i for i, name in enumerate(names)}
+
+    def __len__(self):
+        return len(self.names)
+
+
+def load_matrix(data: dict) -> SnapshotMatrix:
+    """Build a SnapshotMatrix from a loaded snapshot dict."""
+    # packed snapshots (patchforge_pack) map their columns straight in
+    if hasattr(data, "to_matrix"):
+        return data.to_matrix()
+
+    return matrix_from_map(build_weapon_map(data))
+
+
+def matrix_from_map(stats_map: Dict[str, Dict]) -> SnapshotMatrix:
+    """Build a SnapshotMatrix from a {weapon name: stats} map."""
+    nan = float("nan")
+    numbers = (int, float)      # anything else ("N/A", booleans) is missing, as in compare_weapon
+    keys = get_schema().names
+
+    names = sorted(stats_map)
+    stats = [stats_map[name] for name in names]
+
+    values = np.fromiter(
+        (v if type(v := s.get(k)) in numbers else nan for s in stats for k in keys),
+        dtype=np.float64,
+        count=len(stats) * len(keys),
+    ).reshape(len(names), len(keys))
+    return SnapshotMatrix(names, stats, values)
+
+
+def _align(matrix: SnapshotMatrix, names: List[str]):
+    """Reorder a matrix onto a shared name list, padding absent weapons with NaN."""
+    if matrix.names is names or matrix.names == names:
+        return matrix.values, matrix.stats
+    rows = np.array([matrix.index.get(name, -1) for name in names], dtype=np.int64)
+    present = rows >= 0
+    values = np.full((len(names), matrix.values.shape[1]), np.nan)
+    values[present] = matrix.values[rows[present]]
+    return values, _AlignedStats(matrix.stats, rows)
+
+
+class _AlignedStats:
+    """Stats lookup through a row map, so no per-weapon list is built up front."""
+
+    __slots__ = ("stats", "rows")
+
+    def __init__(self, stats, rows):
+        self.stats = stats
+        self.rows = rows
+
+    def __getitem__(self, w):
+        r = self.rows[w]
+        return self.stats[r] if r >= 0 else None
+
+
+# ---------------------------------------------------------
+# RESULTS
+# ---------------------------------------------------------
+class ColumnarResults:
+    """
+    Lazy, list-like view over a columnar comparison.
+    Rows are materialized as the same dicts `compare_jsons` returns.
+    """
+
+    def __init__(self, names, old_stats, new_stats, old_values, new_values, status, sev):
+        self.names = names
+        self.metrics = get_schema().names
+        self.old_stats = old_stats
+        self.new_stats = new_stats
+        self.old_values = old_values
+        self.new_values = new_values
+        self.status = status        # int8 codes, shape (weapons, metrics)
+        self.sev = sev              # index into SEVERITY_MARKS
+
+    def __len__(self):
+        return self.status.size
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._row(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("result index out of range")
+        return self._row(i)
+
+    def _row(self, i: int) -> Dict:
+        w, m = divmod(i, len(self.metrics))
+        key = self.metrics[m]
+        o = (self.old_stats[w] or {}).get(key)
+        n = (self.new_stats[w] or {}).get(key)
+        code = int(self.status[w, m])
+
+        if code == MISSING:
+            o, n = as_number(o), as_number(n)
+            delta, change = None, "Missing"
+        elif code == NOCHANGE:
+            delta, change = 0, "No Change"
+        else:
+            delta = n - o
+            word = "Buff" if code == BUFF else "Nerf"
+            change = f"{word} {SEVERITY_MARKS[self.sev[w, m]]}"
+
+        return {
+            "weapon": self.names[w],
+            "metric": key,
+            "old": o,
+            "new": n,
+            "delta": delta,
+            "change": change,
+            "status": STATUS_TAGS[code],
+        }
+
+    def summarize(self) -> Dict:
+        """Vectorized equivalent of `summarize_results` for this result set."""
+        status = self.status
+        buff = status == BUFF
+        nerf = status == NERF
+
+        delta = self.new_values - self.old_values
+        present = status != MISSING
+        delta[~present] = 0.0
+
+        # keep the insertion order summarize_results would produce
+        totals = {}
+        firsts = []
+        for m, key in enumerate(self.metrics):
+            rows = np.flatnonzero(present[:, m])
+            if rows.size:
+                firsts.append((rows[0] * len(self.metrics) + m, m, key))
+        for _, m, key in sorted(firsts):
+            totals[key] = sum(delta[:, m].tolist())
+
+        return {
+            "buffs": int(buff.sum()),
+            "nerfs": int(nerf.sum()),
+            "nochange": int((status <= NOCHANGE).sum()),
+            "mixed": int((buff.any(axis=1) & nerf.any(axis=1)).sum()),
+            "totals": totals,
+        }
+
+
+# ---------------------------------------------------------
+# COMPARISON
+# ---------------------------------------------------------
+def compare_matrices(old: SnapshotMatrix, new: SnapshotMatrix) -> ColumnarResults:
+    """Compare two snapshot matrices with vectorized classification."""
+    if old.names == new.names:
+        names = old.names
+    else:
+        names = sorted(set(old.index) | set(new.index))
+    old_values, old_stats = _align(old, names)
+    new_values, new_stats = _align(new, names)
+
+    table = get_schema().table
+    higher_better = np.array([sign > 0 for _, sign, _, _ in table], dtype=bool)
+    small = np.array([small for _, _, small, _ in table], dtype=np.float64)
+    large = np.array([large for _, _, _, large in table], dtype=np.float64)
+
+    delta = new_values - old_values
+    missing = np.isnan(delta)
+    changed = ~missing & (delta != 0)
+    improved = (delta > 0) == higher_better
+
+    status = np.full(delta.shape, NOCHANGE, dtype=np.int8)
+    status[missing] = MISSING
+    status[changed & improved] = BUFF
+    status[changed & ~improved] = NERF
+
+    abs_delta = np.abs(delta)
+    sev = np.where(abs_delta >= large, 2, np.where(abs_delta >= small, 1, 0)).astype(np.int8)
+
+    return ColumnarResults(names, old_stats, new_stats, old_values, new_values, status, sev)
+
+
+@profiled("compare", rows=len)
+def compare_columnar(old_data: dict, new_data: dict) -> ColumnarResults:
+    """Columnar counterpart of `compare_jsons`."""
+    return compare_matrices(load_matrix(old_data), load_matrix(new_data))
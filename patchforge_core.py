@@ -8,7 +8,11 @@ Used by GUI, CLI, and automation tools.
 
 import json
 import os
-from typing import List, Dict, Tuple
+import re
+from typing import List, Dict, Tuple, Iterator, Optional
+
+from patchforge_profile import profiled
+from patchforge_schema import BUFF_LABELS, NERF_LABELS, MetricSchema
 
 # ---------------------------------------------------------
 # CONFIGURATION
@@ -33,18 +37,60 @@ THRESHOLDS = {
     "headDamageAfterFirstHit": (2, 8),
 }
 
+# METRICS / THRESHOLDS are the built-in defaults; the pipeline reads the active
+# schema, which a metrics config file can replace (see patchforge_schema)
+DEFAULT_SCHEMA = MetricSchema.from_pairs(METRICS, THRESHOLDS)
+_schema = DEFAULT_SCHEMA
+
+
+def get_schema() -> MetricSchema:
+    """The metric schema comparisons currently use."""
+    return _schema
+
+
+def set_schema(schema: Optional[MetricSchema]):
+    """Use schema for every comparison from now on (None restores the defaults)."""
+    global _schema
+    _schema = schema or DEFAULT_SCHEMA
+
 
 # ---------------------------------------------------------
 # CORE UTILITIES
 # ---------------------------------------------------------
+def _weapon_count(data) -> int:
+    """Weapons in a loaded snapshot (row count for the profiler)."""
+    return len(data.get("weapons", [])) if isinstance(data, dict) else len(data)
+
+
+@profiled("load", rows=_weapon_count)
 def load_json(path: str) -> Dict:
-    """Load a JSON file safely."""
+    """
+    Load a JSON file safely.
+    Packed snapshots (see patchforge_pack) are memory-mapped instead of parsed.
+    """
     if not os.path.exists(path):
         raise FileNotFoundError(f"File not found: {path}")
+
+    from patchforge_pack import is_packed, PackedSnapshot
+    if is_packed(path):
+        return PackedSnapshot(path)
+
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
+@profiled("load", rows=_weapon_count)
+def load_json_streaming(path: str) -> Dict:
+    """
+    Load only what compare_jsons needs: each weapon's name, rarity and metric stats.
+    The file is read incrementally, so the full document tree never sits in memory.
+    """
+    from patchforge_pack import is_packed, PackedSnapshot
+    if os.path.exists(path) and is_packed(path):
+        return PackedSnapshot(path)
+    return {"weapons": list(iter_weapons(path))}
+
+
 def save_json(data: dict, path: str):
     """Save JSON with indentation."""
     with open(path, "w", encoding="utf-8") as f:
@@ -53,90 +99,318 @@ def save_json(data: dict, path: str):
 
 def severity(delta: float, key: str) -> str:
     """Return severity marker based on thresholds."""
-    small, large = THRESHOLDS.get(key, (1, 5))
-    if delta >= large:
-        return "●"
-    elif delta >= small:
-        return "•"
-    elif delta > 0:
-        return "·"
-    return ""
+    return _schema.severity(key, delta)
+
+
+# ---------------------------------------------------------
+# STREAMING LOADER
+# ---------------------------------------------------------
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class _JsonStream:
+    """Pull reader that decodes one JSON value at a time from a text file."""
+
+    def __init__(self, f, chunk_size: int = STREAM_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size: int = 0) -> bool:
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in JSON stream, found '{found or 'EOF'}'")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete value, reading more of the file as needed."""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+                # a value ending exactly at the buffer edge may be a cut-off number
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # grow the read size so very large values are not re-decoded many times
+            self._fill(size)
+            size *= 2
+
+
+def iter_weapons(path: str, full: bool = False) -> Iterator[Dict]:
+    """
+    Yield weapons from a snapshot one at a time, keeping only `name`, `rarity`
+    (when present) and the stats the metric schema reads. Other keys are
+    parsed and dropped, unless full is set (whole weapon objects, e.g. for
+    the structural diff in patchforge_diff).
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+
+    keys = _schema.roots
+    with open(path, "r", encoding="utf-8") as f:
+        stream = _JsonStream(f)
+        stream.expect("{")
+        if stream.peek() == "}":
+            return
+
+        while True:
+            section = stream.value()
+            stream.expect(":")
+            if section == "weapons":
+                stream.expect("[")
+                if stream.peek() == "]":
+                    stream.pos += 1
+                else:
+                    while True:
+                        weapon = stream.value()
+                        if not full:
+                            stats = weapon.get("stats", {})
+                            slim = {"name": weapon["name"], "stats": {k: stats[k] for k in keys if k in stats}}
+                            if "rarity" in weapon:
+                                slim["rarity"] = weapon["rarity"]
+                            weapon = slim
+                        yield weapon
+                        if stream.peek() == ",":
+                            stream.pos += 1
+                            continue
+                        stream.expect("]")
+                        break
+            else:
+                stream.value()
+
+            if stream.peek() == ",":
+                stream.pos += 1
+                continue
+            stream.expect("}")
+            return
 
 
 # ---------------------------------------------------------
 # COMPARISON ENGINE
 # ---------------------------------------------------------
-def compare_jsons(old_data: dict, new_data: dict) -> List[Dict]:
+# "python" builds row dicts, "columnar" needs NumPy, "compact" stores rows in arrays
+ENGINES = ("python", "columnar", "compact")
+
+
+@profiled("build maps", rows=len)
+def build_weapon_map(data: dict) -> Dict[str, Dict]:
+    """
+    Normalize a snapshot into {weapon name: stats}. Last entry wins on duplicates.
+    With nested or renamed metrics the stats are flattened to {metric name: value}.
+    """
+    if hasattr(data, "weapon_map"):
+        # packed snapshots already store stats by metric name
+        return data.weapon_map()
+    if _schema.flat:
+        return {w["name"]: w.get("stats", {}) for w in data.get("weapons", [])}
+    extract = _schema.extract
+    return {w["name"]: extract(w.get("stats", {})) for w in data.get("weapons", [])}
+
+
+def weapon_fingerprint(stats: Dict) -> Tuple:
+    """Hashable fingerprint of a weapon's metric stats, for incremental re-compares."""
+    return tuple(stats.get(key) for key in _schema.names)
+
+
+def compare_jsons(old_data: dict, new_data: dict, engine: str = "python",
+                  renames: Optional[Dict[str, str]] = None) -> List[Dict]:
     """
     Compare two weapon datasets.
     Returns a list of dicts for each stat comparison.
+
+    engine="columnar" uses the NumPy engine in patchforge_columnar, which
+    returns a lazy sequence yielding the same dicts; engine="compact" returns
+    an array-backed CompactResults (patchforge_results) of dict-like rows.
+    renames ({old name: new name}, see patchforge_rename) pairs renamed weapons.
     """
-    old_map = {w["name"]: w for w in old_data.get("weapons", [])}
-    new_map = {w["name"]: w for w in new_data.get("weapons", [])}
+    if renames:
+        return compare_maps(build_weapon_map(old_data), build_weapon_map(new_data), engine, renames)
+    if engine == "columnar":
+        from patchforge_columnar import compare_columnar
+        return compare_columnar(old_data, new_data)
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+
+    return compare_maps(build_weapon_map(old_data), build_weapon_map(new_data), engine=engine)
+
+
+@profiled("compare", rows=len)
+def compare_maps(old_map: Dict[str, Dict], new_map: Dict[str, Dict], engine: str = "python",
+                 renames: Optional[Dict[str, str]] = None) -> List[Dict]:
+    """Compare two prebuilt weapon maps (see build_weapon_map), pairing renamed weapons."""
+    if renames:
+        from patchforge_rename import apply_renames
+        old_map, new_map = apply_renames(old_map, new_map, renames)
+    if engine == "columnar":
+        from patchforge_columnar import compare_matrices, matrix_from_map
+        return compare_matrices(matrix_from_map(old_map), matrix_from_map(new_map))
+    if engine == "compact":
+        from patchforge_results import compare_compact
+        return compare_compact(old_map, new_map)
+    if engine != "python":
+        raise ValueError(f"Unknown engine: {engine}")
 
     results = []
+    for name in sorted(set(old_map.keys()) | set(new_map.keys())):
+        results.extend(compare_weapon(name, old_map.get(name, {}), new_map.get(name, {})))
+    return results
 
+
+def iter_compare(old_map: Dict[str, Dict], new_map: Dict[str, Dict],
+                 renames: Optional[Dict[str, str]] = None) -> Iterator[Dict]:
+    """compare_maps rows, produced weapon by weapon and never collected into a list."""
+    if renames:
+        from patchforge_rename import apply_renames
+        old_map, new_map = apply_renames(old_map, new_map, renames)
     for name in sorted(set(old_map.keys()) | set(new_map.keys())):
-        old_stats = old_map.get(name, {}).get("stats", {})
-        new_stats = new_map.get(name, {}).get("stats", {})
-
-        for key, higher_better in METRICS:
-            o = old_stats.get(key)
-            n = new_stats.get(key)
-            if (o is None) or (n is None):
-                results.append({
-                    "weapon": name,
-                    "metric": key,
-                    "old": o,
-                    "new": n,
-                    "delta": None,
-                    "change": "Missing",
-                    "status": "secondary"
-                })
-                continue
+        yield from compare_weapon(name, old_map.get(name, {}), new_map.get(name, {}))
+
+
+_NUMBER_TYPES = (int, float)
+
+
+def as_number(v):
+    """v when it is a real number, else None: other stat values ("N/A", booleans) count as missing."""
+    return v if type(v) in _NUMBER_TYPES else None
 
-            delta = n - o
-            abs_delta = abs(delta)
-
-            if delta == 0:
-                results.append({
-                    "weapon": name,
-                    "metric": key,
-                    "old": o,
-                    "new": n,
-                    "delta": 0,
-                    "change": "No Change",
-                    "status": "secondary"
-                })
-            elif (higher_better and delta > 0) or (not higher_better and delta < 0):
-                results.append({
-                    "weapon": name,
-                    "metric": key,
-                    "old": o,
-                    "new": n,
-                    "delta": delta,
-                    "change": f"Buff {severity(abs_delta, key)}",
-                    "status": "success"
-                })
-            else:
-                results.append({
-                    "weapon": name,
-                    "metric": key,
-                    "old": o,
-                    "new": n,
-                    "delta": delta,
-                    "change": f"Nerf {severity(abs_delta, key)}",
-                    "status": "danger"
-                })
+
+def compare_weapon(name: str, old_stats: Dict, new_stats: Dict) -> List[Dict]:
+    """Compare one weapon's stats; returns one row dict per metric."""
+    results = []
+
+    for key, sign, small, large in _schema.table:
+        o = old_stats.get(key)
+        n = new_stats.get(key)
+        if type(o) not in _NUMBER_TYPES or type(n) not in _NUMBER_TYPES:
+            results.append({
+                "weapon": name,
+                "metric": key,
+                "old": as_number(o),
+                "new": as_number(n),
+                "delta": None,
+                "change": "Missing",
+                "status": "secondary"
+            })
+            continue
+
+        delta = n - o
+
+        if delta == 0:
+            results.append({
+                "weapon": name,
+                "metric": key,
+                "old": o,
+                "new": n,
+                "delta": 0,
+                "change": "No Change",
+                "status": "secondary"
+            })
+            continue
+
+        abs_delta = delta if delta > 0 else -delta
+        level = 2 if abs_delta >= large else 1 if abs_delta >= small else 0
+        if delta * sign > 0:
+            results.append({
+                "weapon": name,
+                "metric": key,
+                "old": o,
+                "new": n,
+                "delta": delta,
+                "change": BUFF_LABELS[level],
+                "status": "success"
+            })
+        else:
+            results.append({
+                "weapon": name,
+                "metric": key,
+                "old": o,
+                "new": n,
+                "delta": delta,
+                "change": NERF_LABELS[level],
+                "status": "danger"
+            })
 
     return results
 
 
+def structural_diff(old_data: Dict, new_data: Dict, weapon: Optional[str] = None) -> List[Dict]:
+    """
+    Path-level changes between the full snapshot trees (nested stats, attachment
+    slots, falloff curves, ...), or inside one weapon. See patchforge_diff.
+    """
+    from patchforge_diff import SnapshotTree, diff_snapshots, diff_weapon
+    old_tree, new_tree = SnapshotTree(old_data), SnapshotTree(new_data)
+    if weapon is not None:
+        return diff_weapon(old_tree, new_tree, weapon)
+    return diff_snapshots(old_tree, new_tree)
+
+
+class ComparisonResult:
+    """
+    The rows of one comparison and their summary.
+
+    Built once per comparison and shared by every consumer (GUI table,
+    summary window, exporters), so they all read the same numbers.
+    `rows` is anything compare_jsons can return, or any iterable of the
+    same row dicts with a length.
+    """
+
+    def __init__(self, rows, summary: Optional[Dict] = None):
+        self.rows = rows
+        self._summary = summary
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    @property
+    def summary(self) -> Dict:
+        """summarize_results over the rows, computed on first use."""
+        if self._summary is None:
+            self._summary = summarize_results(self.rows)
+        return self._summary
+
+
 # ---------------------------------------------------------
 # SUMMARY
 # ---------------------------------------------------------
+@profiled("summarize", rows=lambda s: s["buffs"] + s["nerfs"] + s["nochange"])
 def summarize_results(results: List[Dict]) -> Dict:
     """Aggregate patch statistics (counts, net deltas, etc.)."""
+    # engines with their own aggregation (e.g. ColumnarResults) skip the row loop
+    if hasattr(results, "summarize"):
+        return results.summarize()
+
     summary = {
         "buffs": 0,
         "nerfs": 0,
@@ -0,0 +1,270 @@
+"""
+PatchForge Structural Diff
+==========================
+
+Path-level differences between nested snapshot data: attachment slots,
+damage falloff curves, per-armor tables, anything under a weapon, not
+only the metric stats.
+
+Every subtree has a digest of its content. Large containers (the weapons
+list, the document around it) combine their children's digests; anything
+smaller is hashed from its JSON text in one C-level call, and its own
+children are only hashed if a diff has to look inside it. A diff compares
+digests and descends only into subtrees whose digests differ, so once a
+snapshot is hashed (SnapshotTree), diffing it costs in proportion to what
+changed rather than to the size of the document. Lists are aligned by an
+identity key when their items carry one (`name`, `id`, `slot`), by index
+when their length is unchanged, and otherwise by matching item digests, so
+one inserted element does not report every later element as changed.
+
+    old, new = SnapshotTree(old_data), SnapshotTree(new_data)
+    for change in diff_trees(old.root, new.root):
+        print(change["path"], change["kind"], change["old"], change["new"])
+"""
+
+import json
+from difflib import SequenceMatcher
+from hashlib import blake2b
+from typing import Dict, List, Optional, Tuple
+
+from patchforge_profile import profiled
+
+DIFF_KINDS = ("changed", "added", "removed")
+DIFF_LIST_KEYS = ("name", "id", "slot")
+DIFF_COMPOSE_ITEMS = 32
+
+
+class HashedNode:
+    """
+    A JSON value with a lazily computed digest of its content and lazily
+    wrapped children ({key: node} / [node, ...], None for scalars).
+    """
+
+    __slots__ = ("value", "_digest", "_children")
+
+    def __init__(self, value):
+        self.value = value
+        self._digest = None
+        self._children = None
+
+    @property
+    def children(self):
+        if self._children is None:
+            value = self.value
+            if isinstance(value, dict):
+                self._children = {key: HashedNode(child) for key, child in value.items()}
+            elif isinstance(value, list):
+                self._children = [HashedNode(child) for child in value]
+        return self._children
+
+    @property
+    def digest(self) -> bytes:
+        if self._digest is None:
+            self._digest = _digest(self)
+        return self._digest
+
+
+def _large(value) -> bool:
+    """Whether a container (or one of its direct children) holds more than DIFF_COMPOSE_ITEMS items."""
+    if not isinstance(value, (dict, list)):
+        return False
+    if len(value) > DIFF_COMPOSE_ITEMS:
+        return True
+    children = value.values() if isinstance(value, dict) else value
+    return any(isinstance(c, (dict, list)) and len(c) > DIFF_COMPOSE_ITEMS for c in children)
+
+
+def _digest(node: HashedNode) -> bytes:
+    # large containers combine their children's digests, so a diff can prune
+    # inside them; anything smaller is hashed from its JSON text in one call
+    value = node.value
+    if not _large(value):
+        text = json.dumps(value, sort_keys=True, allow_nan=True)
+        return blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    children = node.children
+    if isinstance(children, dict):
+        h = blake2b(b"\0d", digest_size=16)
+        for key in sorted(children):
+            raw = str(key).encode("utf-8", "surrogatepass")
+            h.update(len(raw).to_bytes(4, "little"))
+            h.update(raw)
+            h.update(children[key].digest)
+    else:
+        h = blake2b(b"\0l", digest_size=16)
+        for child in children:
+            h.update(child.digest)
+    return h.digest()
+
+
+def hash_tree(value) -> HashedNode:
+    """Hash a JSON value (subtree digests are computed as a diff needs them)."""
+    node = HashedNode(value)
+    node.digest
+    return node
+
+
+def format_path(parts: Tuple) -> str:
+    """'stats.falloff[2].range' style text for a path of keys, indices and (key, id) pairs."""
+    text = ""
+    for part in parts:
+        if isinstance(part, int):
+            text += f"[{part}]"
+        elif isinstance(part, tuple):
+            text += f"[{part[0]}={part[1]}]"
+        elif part.isidentifier():
+            text += f".{part}" if text else part
+        else:
+            text += f"[{json.dumps(part, ensure_ascii=False)}]"
+    return text
+
+
+# ---------------------------------------------------------
+# DIFF
+# ---------------------------------------------------------
+def _change(out: List[Dict], parts: Tuple, kind: str, old=None, new=None):
+    numeric = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in (old, new))
+    out.append({
+        "path": format_path(parts),
+        "parts": parts,
+        "kind": kind,
+        "old": old,
+        "new": new,
+        "delta": new - old if kind == "changed" and numeric else None,
+    })
+
+
+def _identity_key(old_items: List[HashedNode], new_items: List[HashedNode]) -> Optional[str]:
+    """A key every item of both lists has, with unique scalar values on each side."""
+    if not old_items and not new_items:
+        return None
+    for key in DIFF_LIST_KEYS:
+        ok = True
+        for items in (old_items, new_items):
+            seen = set()
+            for item in items:
+                ident = item.value.get(key) if isinstance(item.value, dict) else None
+                if ident is None or isinstance(ident, (dict, list)) or ident in seen:
+                    ok = False
+                    break
+                seen.add(ident)
+            if not ok:
+                break
+        if ok:
+            return key
+    return None
+
+
+def _walk_list(old_items: List[HashedNode], new_items: List[HashedNode], parts: Tuple, out: List[Dict]):
+    key = _identity_key(old_items, new_items)
+    if key is not None:
+        new_by_id = {item.value[key]: item for item in new_items}
+        for item in old_items:
+            ident = item.value[key]
+            other = new_by_id.get(ident)
+            if other is None:
+                _change(out, parts + ((key, ident),), "removed", old=item.value)
+            else:
+                _walk(item, other, parts + ((key, ident),), out)
+        old_ids = {item.value[key] for item in old_items}
+        for item in new_items:
+            ident = item.value[key]
+            if ident not in old_ids:
+                _change(out, parts + ((key, ident),), "added", new=item.value)
+        return
+
+    if len(old_items) == len(new_items):
+        # same length (values edited in place, e.g. a falloff curve): pair by index
+        for i, (item, other) in enumerate(zip(old_items, new_items)):
+            _walk(item, other, parts + (i,), out)
+        return
+
+    # no identity: line items up by content, then pair what is left in each replaced run
+    matcher = SequenceMatcher(None, [i.digest for i in old_items], [i.digest for i in new_items], autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == "equal":
+            continue
+        paired = min(i2 - i1, j2 - j1)
+        for k in range(paired):
+            _walk(old_items[i1 + k], new_items[j1 + k], parts + (j1 + k,), out)
+        for i in range(i1 + paired, i2):
+            _change(out, parts + (i,), "removed", old=old_items[i].value)
+        for j in range(j1 + paired, j2):
+            _change(out, parts + (j,), "added", new=new_items[j].value)
+
+
+def _walk(old: HashedNode, new: HashedNode, parts: Tuple, out: List[Dict]):
+    if old._digest is not None and new._digest is not None:
+        if old.digest == new.digest:
+            return      # identical subtree: nothing below it is visited
+    elif old.value == new.value and old.digest == new.digest:
+        # not hashed yet (small subtrees): == rules out most changes without
+        # hashing; the digests then tell 1 from 1.0 or true
+        return
+    oc, nc = old.children, new.children
+    if isinstance(oc, dict) and isinstance(nc, dict):
+        for key, node in oc.items():
+            other = nc.get(key)
+            if other is None:
+                _change(out, parts + (key,), "removed", old=node.value)
+            else:
+                _walk(node, other, parts + (key,), out)
+        for key, node in nc.items():
+            if key not in oc:
+                _change(out, parts + (key,), "added", new=node.value)
+    elif isinstance(oc, list) and isinstance(nc, list):
+        _walk_list(oc, nc, parts, out)
+    else:
+        _change(out, parts, "changed", old.value, new.value)
+
+
+def diff_trees(old: HashedNode, new: HashedNode, prefix: Tuple = ()) -> List[Dict]:
+    """
+    Changes between two hashed trees, one dict per changed path:
+        path    text path ('stats.falloff[2].range', 'attachments[slot=Muzzle]')
+        parts   the path as a tuple of keys, list indices and (key, id) pairs
+        kind    changed / added / removed (added and removed carry the whole subtree)
+        old, new, delta   values (delta for numeric changes only)
+    """
+    out = []
+    _walk(old, new, prefix, out)
+    return out
+
+
+def diff_values(old, new) -> List[Dict]:
+    """diff_trees of two plain JSON values (hashes them first)."""
+    return diff_trees(hash_tree(old), hash_tree(new))
+
+
+# ---------------------------------------------------------
+# SNAPSHOTS
+# ---------------------------------------------------------
+class SnapshotTree:
+    """A snapshot hashed once, with its weapons indexed by name for per-weapon diffs."""
+
+    @profiled("hash tree")
+    def __init__(self, data: Dict):
+        self.root = hash_tree(data)      # hashes every weapon once, here
+        self.weapons: Dict[str, HashedNode] = {}
+        listed = self.root.children.get("weapons") if isinstance(self.root.children, dict) else None
+        if listed is not None and isinstance(listed.children, list):
+            for node in listed.children:
+                name = node.value.get("name") if isinstance(node.value, dict) else None
+                if name is not None:
+                    self.weapons[name] = node      # last entry wins, as in build_weapon_map
+
+
+def diff_snapshots(old: SnapshotTree, new: SnapshotTree) -> List[Dict]:
+    """Every change between two snapshots (weapons are matched by name)."""
+    return diff_trees(old.root, new.root)
+
+
+def diff_weapon(old: SnapshotTree, new: SnapshotTree, name: str) -> List[Dict]:
+    """Changes inside one weapon, with paths relative to the weapon object."""
+    before, after = old.weapons.get(name), new.weapons.get(name)
+    if before is None and after is None:
+        raise KeyError(name)
+    if before is None:
+        return [{"path": "", "parts": (), "kind": "added", "old": None, "new": after.value, "delta": None}]
+    if after is None:
+        return [{"path": "", "parts": (), "kind": "removed", "old": before.value, "new": None, "delta": None}]
+    return diff_trees(before, after)
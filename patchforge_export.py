@@ -0,0 +1,170 @@
+"""
+PatchForge Exporters
+====================
+
+Streaming CSV / HTML / JSONL report writers.
+
+Each format is a generator of text chunks built from `EXPORT_CHUNK_ROWS`
+rows at a time, so a report goes from the comparison results to disk
+without ever holding every row (or the whole document) in memory. Any
+format can be gzip-compressed on the way out. HTML reports can embed the
+summary charts as inline PNGs (see patchforge_charts).
+"""
+
+import base64
+import csv
+import gzip
+import io
+import json
+from html import escape
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+from patchforge_profile import profiled
+
+EXPORT_CHUNK_ROWS = 4096
+EXPORT_FORMATS = ("csv", "html", "jsonl")
+
+RESULT_HEADER = ("Weapon", "Metric", "Old", "New", "Δ", "Change")
+STATUS_COLORS = {
+    "success": "#6fdc8c",
+    "danger": "#f28b82",
+    "warning": "#fdd388",
+    "secondary": "#cccccc",
+}
+
+HTML_HEAD = """<html><head><meta charset='utf-8'><style>
+body { background-color:#0f1115; color:white; font-family:Segoe UI; }
+table { width:100%; border-collapse:collapse; }
+td,th { border:1px solid #333; padding:6px; }
+tr:nth-child(even) { background:#151a22; }
+figure { display:inline-block; margin:0 12px 12px 0; }
+</style></head>
+"""
+
+
+# ---------------------------------------------------------
+# ROWS
+# ---------------------------------------------------------
+def iter_rows(results: Iterable[Dict]) -> Iterable[Dict]:
+    """Row dicts of any result container (CompactResults builds them from its columns)."""
+    if hasattr(results, "iter_dicts"):
+        return results.iter_dicts()
+    return results
+
+
+def result_values(results: Iterable[Dict]) -> Iterator[Tuple[Tuple, str]]:
+    """(values, status) per comparison row, in the RESULT_HEADER columns."""
+    for r in iter_rows(results):
+        delta_str = "–" if r["delta"] is None else f"{r['delta']:+.2f}"
+        yield (r["weapon"], r["metric"], r["old"], r["new"], delta_str, r["change"]), r["status"]
+
+
+def _batches(rows: Iterable, size: int) -> Iterator[list]:
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+# ---------------------------------------------------------
+# FORMATS
+# ---------------------------------------------------------
+def csv_chunks(header: Sequence[str], rows: Iterable[Tuple[Tuple, str]],
+               chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[str]:
+    """CSV text for (values, status) rows."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    for batch in _batches(rows, chunk_rows):
+        writer.writerows(map(itemgetter(0), batch))
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def html_chunks(header: Sequence[str], rows: Iterable[Tuple[Tuple, str]], title: str = "PatchForge Report",
+                chunk_rows: int = EXPORT_CHUNK_ROWS, images: Optional[Dict[str, bytes]] = None) -> Iterator[str]:
+    """
+    HTML report for (values, status) rows, each row colored by its status.
+    images ({caption: PNG bytes}) are embedded above the table.
+    """
+    yield HTML_HEAD
+    yield f"<body><h2>{escape(title)}</h2>\n"
+    for caption, png in (images or {}).items():
+        yield (f"<figure><img src='data:image/png;base64,{base64.b64encode(png).decode('ascii')}' "
+               f"alt='{escape(caption)}'><figcaption>{escape(caption)}</figcaption></figure>\n")
+    yield "<table>\n"
+    yield "<tr>" + "".join(f"<th>{escape(h)}</th>" for h in header) + "</tr>\n"
+    for batch in _batches(rows, chunk_rows):
+        # escape each row once, with NUL standing in for the cell boundaries
+        yield "".join(
+            f"<tr style='color:{STATUS_COLORS.get(status, 'white')}'><td>"
+            + escape("\0".join(map(str, values)), quote=False).replace("\0", "</td><td>")
+            + "</td></tr>\n"
+            for values, status in batch
+        )
+    yield "</table></body></html>\n"
+
+
+def jsonl_chunks(results: Iterable[Dict], chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[str]:
+    """One JSON object per comparison row."""
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    for batch in _batches(iter_rows(results), chunk_rows):
+        yield "".join(dumps(dict(r)) + "\n" for r in batch)
+
+
+# ---------------------------------------------------------
+# WRITERS
+# ---------------------------------------------------------
+def export_format(path: str) -> str:
+    """Format implied by a file name (a trailing .gz is ignored)."""
+    name = path.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if name.endswith((".html", ".htm")):
+        return "html"
+    return "csv"
+
+
+def write_chunks(chunks: Iterable[str], path: str, compress: Optional[bool] = None) -> int:
+    """
+    Write text chunks to path, gzip-compressed when compress is True
+    (or None and the path ends in .gz). Returns the uncompressed byte count.
+    """
+    if compress is None:
+        compress = path.lower().endswith(".gz")
+    written = 0
+    opener = gzip.open(path, "wb", compresslevel=6) if compress else open(path, "wb")
+    with opener as f:
+        for chunk in chunks:
+            data = chunk.encode("utf-8")
+            f.write(data)
+            written += len(data)
+    return written
+
+
+@profiled("export")
+def export_results(results: Iterable[Dict], path: str, fmt: Optional[str] = None,
+                   compress: Optional[bool] = None, images: Optional[Dict[str, bytes]] = None) -> int:
+    """
+    Stream comparison rows to a CSV, HTML or JSONL report. Returns the byte count.
+    images ({caption: PNG bytes}, e.g. the summary charts) go into HTML reports.
+    """
+    fmt = fmt or export_format(path)
+    if fmt == "csv":
+        chunks = csv_chunks(RESULT_HEADER, result_values(results))
+    elif fmt == "html":
+        chunks = html_chunks(RESULT_HEADER, result_values(results), images=images)
+    elif fmt == "jsonl":
+        chunks = jsonl_chunks(results)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return write_chunks(chunks, path, compress)
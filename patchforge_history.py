@@ -0,0 +1,120 @@
+"""
+PatchForge History Engine
+=========================
+
+Track every weapon stat across N snapshots in a single pass.
+
+Each snapshot is loaded once into a shared weapon/metric index, so the
+cost grows linearly with the number of snapshots instead of re-running
+`compare_jsons` (and re-parsing every intermediate file twice) per pair.
+"""
+
+from typing import Dict, Iterator, List, Optional
+
+from patchforge_core import get_schema
+from patchforge_profile import profiled
+
+
+class PatchHistory:
+    """Per-cell value series for a sequence of snapshots."""
+
+    def __init__(self, labels: List[str]):
+        self.labels = labels
+        self.schema = get_schema()
+        self.metrics = self.schema.names
+        # weapon -> metric -> [value per snapshot] (None = missing)
+        self.series: Dict[str, Dict[str, List]] = {}
+
+    def add_snapshot(self, position: int, weapon_map: Dict[str, Dict]):
+        """Record one normalized {name: stats} map at the given snapshot position."""
+        count = len(self.labels)
+        for name, stats in weapon_map.items():
+            cells = self.series.get(name)
+            if cells is None:
+                cells = self.series[name] = {key: [None] * count for key in self.metrics}
+            for key in self.metrics:
+                cells[key][position] = stats.get(key)
+
+    @property
+    def weapons(self) -> List[str]:
+        return sorted(self.series)
+
+
+@profiled("history", rows=lambda history: len(history.series))
+def build_history(weapon_maps: List[Dict[str, Dict]], labels: Optional[List[str]] = None) -> PatchHistory:
+    """Build a PatchHistory from weapon maps ordered oldest to newest."""
+    labels = labels or [f"#{i + 1}" for i in range(len(weapon_maps))]
+    if len(labels) != len(weapon_maps):
+        raise ValueError("Need one label per snapshot")
+
+    history = PatchHistory(labels)
+    for position, weapon_map in enumerate(weapon_maps):
+        history.add_snapshot(position, weapon_map)
+    return history
+
+
+def history_rows(history: PatchHistory, weapon: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Yield one dict per (weapon, metric) cell with:
+        values       value per snapshot (None = missing)
+        steps        delta against the previous present value (None where not computable)
+        drift        cumulative change from first to last present value (None if
+                     the stat is present in fewer than two snapshots)
+        first_change / last_change   label of the snapshot where the value first / last moved
+        changes      number of snapshots in which the value moved
+    plus change/status classifying the drift the same way compare_jsons does.
+    """
+    labels = history.labels
+    names = [weapon] if weapon is not None else history.weapons
+
+    for name in names:
+        cells = history.series.get(name)
+        if cells is None:
+            continue
+        for key, higher_better in history.schema.pairs:
+            values = cells[key]
+            steps = []
+            first = prev = None
+            first_change = last_change = None
+            changes = present = 0
+
+            for i, v in enumerate(values):
+                if v is None or prev is None:
+                    steps.append(None)
+                else:
+                    step = v - prev
+                    steps.append(step)
+                    if step != 0:
+                        changes += 1
+                        last_change = labels[i]
+                        if first_change is None:
+                            first_change = labels[i]
+                if v is not None:
+                    present += 1
+                    if first is None:
+                        first = v
+                    prev = v
+
+            if present < 2:
+                drift, change, status = None, "Missing", "secondary"
+            else:
+                drift = prev - first
+                if drift == 0:
+                    change, status = "No Change", "secondary"
+                elif (higher_better and drift > 0) or (not higher_better and drift < 0):
+                    change, status = f"Buff {history.schema.severity(key, abs(drift))}", "success"
+                else:
+                    change, status = f"Nerf {history.schema.severity(key, abs(drift))}", "danger"
+
+            yield {
+                "weapon": name,
+                "metric": key,
+                "values": values,
+                "steps": steps,
+                "drift": drift,
+                "first_change": first_change,
+                "last_change": last_change,
+                "changes": changes,
+                "change": change,
+                "status": status,
+            }
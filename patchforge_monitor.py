@@ -0,0 +1,281 @@
+"""
+PatchForge Monitor
+==================
+
+Watch a snapshot folder and diff every new snapshot against the previous one.
+
+The folder is polled, but an idle poll is one stat() of the directory and
+one per known snapshot: files are only listed again when the directory's
+mtime moves (a file was added, renamed or removed), a known file was
+rewritten in place, or a file is still waiting to settle. A new file is
+processed once its size and mtime hold still for one poll interval, so
+half-written dumps are never parsed. The previous snapshot stays parsed in
+memory, so each new file is loaded exactly once; files whose content is
+identical to the previous snapshot are skipped by hash. A snapshot that
+fails to load or compare is reported to the error handler and skipped; the
+previous snapshot stays the baseline. A sink that fails (webhook, disk) is
+reported as a failed delivery: the snapshot is still the new baseline.
+
+Results go to a sink: any callable taking the event dict described in
+`PatchMonitor.process`.
+"""
+
+import fnmatch
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from patchforge_cache import file_digest
+from patchforge_core import build_weapon_map, compare_maps, load_json, summarize_results
+from patchforge_export import export_results
+
+MONITOR_INTERVAL = 5.0
+MONITOR_PATTERNS = ("*.json", "*.pfpack")
+
+Sink = Callable[[Dict], None]
+ErrorHandler = Callable[[str, Exception], None]
+
+
+class SnapshotWatcher:
+    """Detects new, fully written snapshot files in a directory."""
+
+    def __init__(self, directory: str, patterns=MONITOR_PATTERNS):
+        self.directory = directory
+        self.patterns = patterns
+        self._dir_mtime = None
+        self._seen: Dict[str, Tuple[int, int]] = {}      # path -> (size, mtime) when handed out
+        self._pending: Dict[str, Tuple[int, int]] = {}   # path -> (size, mtime) at the last scan
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        found = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.is_file() or not any(fnmatch.fnmatch(entry.name, p) for p in self.patterns):
+                    continue
+                st = entry.stat()
+                found[entry.path] = (st.st_size, st.st_mtime_ns)
+        return found
+
+    def existing(self) -> List[str]:
+        """Mark every current file as seen; returns them oldest first."""
+        self._dir_mtime = os.stat(self.directory).st_mtime_ns
+        found = self._scan()
+        self._seen.update(found)
+        return sorted(found, key=lambda path: (found[path][1], path))
+
+    def _rewritten(self) -> bool:
+        """Whether a known file changed in place (which leaves the directory mtime alone)."""
+        for path, signature in self._seen.items():
+            try:
+                st = os.stat(path)
+            except OSError:
+                return True
+            if (st.st_size, st.st_mtime_ns) != signature:
+                return True
+        return False
+
+    def poll(self, settle: bool = True) -> List[str]:
+        """
+        New or rewritten files that are ready, oldest first. With settle=True a
+        file must look the same on two consecutive polls before it is returned.
+        """
+        dir_mtime = os.stat(self.directory).st_mtime_ns
+        if dir_mtime == self._dir_mtime and not self._pending and not self._rewritten():
+            return []
+        self._dir_mtime = dir_mtime
+
+        found = self._scan()
+        ready = []
+        for path, signature in found.items():
+            if self._seen.get(path) == signature:
+                continue
+            if not settle or self._pending.get(path) == signature:
+                ready.append(path)
+            self._pending[path] = signature
+        for path in list(self._pending):
+            if path not in found:
+                del self._pending[path]
+        for path in list(self._seen):
+            if path not in found:
+                del self._seen[path]
+        for path in ready:
+            self._seen[path] = self._pending.pop(path)
+        return sorted(ready, key=lambda path: (found[path][1], path))
+
+
+class PatchMonitor:
+    """Diffs each new snapshot against the previous one and hands the result to a sink."""
+
+    def __init__(self, directory: str, sink: Sink, engine: str = "python",
+                 loader: Optional[Callable[[str], Dict]] = None, patterns=MONITOR_PATTERNS,
+                 on_error: Optional[ErrorHandler] = None, on_sink_error: Optional[ErrorHandler] = None):
+        self.watcher = SnapshotWatcher(directory, patterns)
+        self.sink = sink
+        self.on_error = on_error or print_error
+        self.on_sink_error = on_sink_error or print_sink_error
+        self.errors = 0              # snapshots skipped
+        self.sink_errors = 0         # diffs the sink failed to deliver
+        self.engine = engine
+        self.loader = loader or (lambda path: build_weapon_map(load_json(path)))
+        self.previous: Optional[Tuple[str, str, Dict]] = None    # (path, sha256, weapon map)
+        self._stop = threading.Event()
+
+    def start(self, from_start: bool = False):
+        """
+        Take the newest existing snapshot as the baseline, or with from_start
+        diff every existing snapshot in order.
+        """
+        existing = self.watcher.existing()
+        if from_start:
+            for path in existing:
+                self._process_safely(path)
+            return
+        # the newest snapshot that loads becomes the baseline
+        for path in reversed(existing):
+            try:
+                self._remember(path, file_digest(path))
+                return
+            except Exception as e:
+                self._failed(path, e)
+
+    def _remember(self, path: str, digest: str, weapon_map: Optional[Dict] = None):
+        self.previous = (path, digest, weapon_map if weapon_map is not None else self.loader(path))
+
+    def process(self, path: str) -> Optional[Dict]:
+        """
+        Diff one snapshot against the previous one and send the event to the sink:
+            {"time", "old", "new", "results", "summary", "changed", "seconds"}
+        The first snapshot only becomes the baseline. Returns the event, or None.
+        Load and compare errors propagate (the baseline is unchanged); sink errors
+        go to on_sink_error once the snapshot is the new baseline.
+        """
+        digest = file_digest(path)
+        if self.previous is not None and self.previous[1] == digest:
+            return None
+
+        start = time.perf_counter()
+        weapon_map = self.loader(path)
+        if self.previous is None:
+            self._remember(path, digest, weapon_map)
+            return None
+
+        old_path, _, old_map = self.previous
+        results = compare_maps(old_map, weapon_map, engine=self.engine)
+        summary = summarize_results(results)
+        self._remember(path, digest, weapon_map)
+
+        event = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "old": old_path,
+            "new": path,
+            "results": results,
+            "summary": summary,
+            "changed": summary["buffs"] + summary["nerfs"],
+            "seconds": time.perf_counter() - start,
+        }
+        try:
+            self.sink(event)
+        except Exception as e:
+            self.sink_errors += 1
+            self.on_sink_error(path, e)
+        return event
+
+    def _failed(self, path: str, error: Exception):
+        self.errors += 1
+        self.on_error(path, error)
+
+    def _process_safely(self, path: str) -> Optional[Dict]:
+        # one bad snapshot (truncated JSON, missing keys, ...) must not stop the monitor
+        try:
+            return self.process(path)
+        except Exception as e:
+            self._failed(path, e)
+            return None
+
+    def poll(self, settle: bool = True) -> List[Dict]:
+        """
+        Process every snapshot that became ready since the last poll. Snapshots
+        that fail are passed to on_error and skipped (the baseline is kept).
+        """
+        events = []
+        for path in self.watcher.poll(settle):
+            event = self._process_safely(path)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def run(self, interval: float = MONITOR_INTERVAL):
+        """Poll until stop() is called (the wait sleeps, so an idle monitor uses no CPU)."""
+        while not self._stop.wait(interval):
+            self.poll()
+
+    def stop(self):
+        self._stop.set()
+
+
+# ---------------------------------------------------------
+# SINKS
+# ---------------------------------------------------------
+def print_error(path: str, error: Exception):
+    """Default error handler: one line on stderr per skipped snapshot."""
+    print(f"[{datetime.now().isoformat(timespec='seconds')}] ⚠️  Skipped {os.path.basename(path)}: "
+          f"{type(error).__name__}: {error}", file=sys.stderr, flush=True)
+
+
+def print_sink_error(path: str, error: Exception):
+    """Default sink error handler: the diff was made (and path is the baseline) but not delivered."""
+    print(f"[{datetime.now().isoformat(timespec='seconds')}] ⚠️  Delivery failed for {os.path.basename(path)} "
+          f"(now the baseline): {type(error).__name__}: {error}", file=sys.stderr, flush=True)
+
+
+def print_sink(event: Dict):
+    """One console line per diff."""
+    s = event["summary"]
+    print(f"[{event['time']}] 🔔 {os.path.basename(event['old'])} → {os.path.basename(event['new'])}  "
+          f"buffs {s['buffs']}  nerfs {s['nerfs']}  mixed {s['mixed']}  "
+          f"({event['seconds'] * 1000:.0f} ms)", flush=True)
+
+
+class JsonlLogSink:
+    """Append one summary line per diff to a JSON Lines log."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, event: Dict):
+        record = {k: v for k, v in event.items() if k != "results"}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class ReportSink:
+    """Write a full report per diff into a folder (<old>__<new>.<fmt>)."""
+
+    def __init__(self, directory: str, fmt: str = "csv", compress: bool = False):
+        self.directory = directory
+        self.fmt = fmt
+        self.compress = compress
+        os.makedirs(directory, exist_ok=True)
+
+    def __call__(self, event: Dict):
+        stem = lambda path: os.path.splitext(os.path.basename(path))[0]  # noqa: E731
+        name = f"{stem(event['old'])}__{stem(event['new'])}.{self.fmt}" + (".gz" if self.compress else "")
+        export_results(event["results"], os.path.join(self.directory, name), self.fmt, self.compress)
+
+
+def fan_out(*sinks: Sink) -> Sink:
+    """Combine several sinks into one; every sink runs even if one fails (the first error is raised)."""
+    def sink(event: Dict):
+        error = None
+        for s in sinks:
+            try:
+                s(event)
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+    return sink
@@ -0,0 +1,328 @@
+"""
+PatchForge Notifications
+========================
+
+asyncio dispatcher that fans patch summaries out to many webhooks
+(Discord-compatible payloads).
+
+Each message is rendered to bytes once and POSTed to every endpoint
+concurrently over a small keep-alive connection pool (stdlib only:
+asyncio streams, HTTP/1.1). Failed sends are retried with exponential
+backoff; 429 responses and exhausted rate-limit buckets pause only the
+endpoint concerned (at least NOTIFY_MIN_WAIT, and a message that is rate
+limited NOTIFY_RATE_LIMITS times counts as failed). Messages wait in a bounded queue, so a burst of
+patches cannot grow memory without limit.
+"""
+
+import asyncio
+import json
+import random
+import ssl
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from patchforge_rank import top_rows
+
+NOTIFY_QUEUE_SIZE = 256
+NOTIFY_CONCURRENCY = 32       # simultaneous requests across all endpoints
+NOTIFY_RETRIES = 4
+NOTIFY_BACKOFF = 0.5          # seconds; doubled on every retry
+NOTIFY_TIMEOUT = 10.0
+NOTIFY_RATE_LIMITS = 8        # 429 responses per message before it counts as failed
+NOTIFY_MIN_WAIT = 0.01        # seconds; floor for a 429's retry_after
+
+_EMBED_COLORS = {"buff": 0x6FDC8C, "nerf": 0xF28B82, "mixed": 0xFDD388}
+
+
+# ---------------------------------------------------------
+# MESSAGES
+# ---------------------------------------------------------
+def top_changes(results: Iterable[Dict], count: int = 5) -> List[Dict]:
+    """The count buff/nerf rows with the largest absolute delta."""
+    return top_rows(results, count)
+
+
+def render_message(summary: Dict, top: List[Dict], title: str = "Patch detected") -> bytes:
+    """Render a summarize_results dict plus top changes as a webhook JSON body."""
+    lines = [
+        f"{'🟩' if r['status'] == 'success' else '🟥'} **{r['weapon']}** {r['metric']}: "
+        f"{r['old']} → {r['new']} ({r['delta']:+.2f}, {r['change']})"
+        for r in top
+    ]
+    if summary["buffs"] and summary["nerfs"]:
+        tone = "mixed"
+    else:
+        tone = "buff" if summary["buffs"] >= summary["nerfs"] else "nerf"
+    payload = {
+        "username": "PatchForge",
+        "embeds": [{
+            "title": title,
+            "description": "\n".join(lines) or "No stat changes.",
+            "color": _EMBED_COLORS[tone],
+            "fields": [
+                {"name": "Buffs", "value": str(summary["buffs"]), "inline": True},
+                {"name": "Nerfs", "value": str(summary["nerfs"]), "inline": True},
+                {"name": "Mixed weapons", "value": str(summary["mixed"]), "inline": True},
+            ],
+        }],
+    }
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+# ---------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------
+class _Endpoint:
+    __slots__ = ("url", "scheme", "host", "port", "target", "blocked_until")
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported webhook URL: {url}")
+        self.url = url
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.blocked_until = 0.0
+
+
+class HttpPool:
+    """Keep-alive HTTP/1.1 connections, pooled per (scheme, host, port)."""
+
+    def __init__(self, limit: int = NOTIFY_CONCURRENCY, timeout: float = NOTIFY_TIMEOUT):
+        self._idle: Dict[Tuple, List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._slots = asyncio.Semaphore(limit)
+        self._ssl = ssl.create_default_context()
+        self.timeout = timeout
+
+    async def post(self, endpoint: _Endpoint, body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        async with self._slots:
+            return await asyncio.wait_for(self._post(endpoint, body), self.timeout)
+
+    async def _post(self, endpoint, body):
+        key = (endpoint.scheme, endpoint.host, endpoint.port)
+        idle = self._idle.setdefault(key, [])
+        request = (
+            f"POST {endpoint.target} HTTP/1.1\r\n"
+            f"Host: {endpoint.host}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "User-Agent: PatchForge\r\n\r\n"
+        ).encode("latin-1") + body
+
+        # a pooled connection may have been closed by the server; retry once on a fresh one
+        while True:
+            reused = bool(idle)
+            if reused:
+                reader, writer = idle.pop()
+            else:
+                reader, writer = await asyncio.open_connection(
+                    endpoint.host, endpoint.port, ssl=self._ssl if endpoint.scheme == "https" else None
+                )
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, headers, payload = await self._read_response(reader)
+                break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                writer.close()
+                if not reused:
+                    raise
+            except BaseException:
+                # timeouts / cancellation leave the stream mid-response: never reuse it
+                writer.close()
+                raise
+
+        if headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            idle.append((reader, writer))
+        return status, headers, payload
+
+    @staticmethod
+    async def _read_response(reader):
+        status_line = await reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                chunk = await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                body += chunk[:-2]
+            return status, headers, bytes(body)
+        length = int(headers.get("content-length", 0))
+        return status, headers, await reader.readexactly(length) if length else b""
+
+    async def close(self):
+        writers = [writer for connections in self._idle.values() for _, writer in connections]
+        self._idle.clear()
+        for writer in writers:
+            writer.close()
+        await asyncio.gather(*(writer.wait_closed() for writer in writers), return_exceptions=True)
+
+
+# ---------------------------------------------------------
+# DISPATCHER
+# ---------------------------------------------------------
+class NotificationDispatcher:
+    """
+    Queue rendered messages and deliver each one to every endpoint.
+
+    Use inside a running loop:
+        dispatcher = NotificationDispatcher(urls)
+        await dispatcher.start()
+        await dispatcher.submit(render_message(summary, top))
+        await dispatcher.close()      # drains the queue first
+    """
+
+    def __init__(self, endpoints: Iterable[str], queue_size: int = NOTIFY_QUEUE_SIZE,
+                 concurrency: int = NOTIFY_CONCURRENCY, retries: int = NOTIFY_RETRIES,
+                 backoff: float = NOTIFY_BACKOFF, timeout: float = NOTIFY_TIMEOUT, workers: int = 4):
+        self.endpoints = [_Endpoint(url) for url in endpoints]
+        self.queue_size = queue_size
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.workers = workers
+        self.stats = {"messages": 0, "sent": 0, "failed": 0, "retries": 0, "rate_limited": 0, "dropped": 0}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._pool: Optional[HttpPool] = None
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._pool = HttpPool(self.concurrency, self.timeout)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, body: bytes):
+        """Queue a rendered message, waiting while the queue is full."""
+        await self._queue.put(body)
+
+    def submit_nowait(self, body: bytes) -> bool:
+        """Queue a rendered message; returns False (and counts a drop) if the queue is full."""
+        try:
+            self._queue.put_nowait(body)
+            return True
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            return False
+
+    async def close(self):
+        """Deliver everything queued, then stop the workers and the pool."""
+        await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._pool.close()
+
+    async def _worker(self):
+        while True:
+            body = await self._queue.get()
+            try:
+                await asyncio.gather(*(self._deliver(endpoint, body) for endpoint in self.endpoints))
+                self.stats["messages"] += 1
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, endpoint: _Endpoint, body: bytes):
+        loop = asyncio.get_running_loop()
+        attempt = limited = 0
+        while True:
+            wait = endpoint.blocked_until - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                status, headers, payload = await self._pool.post(endpoint, body)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                status, headers, payload = None, {}, b""
+
+            if status is not None and status < 300:
+                self.stats["sent"] += 1
+                self._note_bucket(endpoint, headers, loop)
+                return
+            if status == 429:
+                # rate limited: pause this endpoint only; counted apart from the retries,
+                # but capped, so an endpoint answering 429 forever cannot hold up close()
+                self.stats["rate_limited"] += 1
+                limited += 1
+                if limited >= NOTIFY_RATE_LIMITS:
+                    self.stats["failed"] += 1
+                    return
+                wait = self._retry_after(headers, payload)
+                endpoint.blocked_until = loop.time() + (wait if wait >= NOTIFY_MIN_WAIT else NOTIFY_MIN_WAIT)
+                continue
+            if status is not None and status < 500:
+                self.stats["failed"] += 1
+                return
+            if attempt >= self.retries:
+                self.stats["failed"] += 1
+                return
+            self.stats["retries"] += 1
+            await asyncio.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
+            attempt += 1
+
+    @staticmethod
+    def _retry_after(headers: Dict[str, str], payload: bytes) -> float:
+        try:
+            return float(json.loads(payload)["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            pass
+        try:
+            return float(headers.get("retry-after", 1))
+        except ValueError:
+            return 1.0
+
+    @staticmethod
+    def _note_bucket(endpoint: _Endpoint, headers: Dict[str, str], loop):
+        # Discord-style bucket headers: wait out an exhausted bucket before the next send
+        if headers.get("x-ratelimit-remaining") == "0":
+            try:
+                endpoint.blocked_until = loop.time() + float(headers.get("x-ratelimit-reset-after", 0))
+            except ValueError:
+                pass
+
+
+# ---------------------------------------------------------
+# MONITOR SINK
+# ---------------------------------------------------------
+class WebhookSink:
+    """
+    Monitor sink that hands each diff to a dispatcher running on its own
+    event loop thread, so sending never blocks the monitor.
+    """
+
+    def __init__(self, endpoints: Iterable[str], top: int = 5, **options):
+        self.top = top
+        self._loop = asyncio.new_event_loop()
+        self.dispatcher = NotificationDispatcher(endpoints, **options)
+        self._thread = threading.Thread(target=self._loop.run_forever, name="patchforge-notify", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.dispatcher.start(), self._loop).result()
+
+    def __call__(self, event: Dict):
+        body = render_message(event["summary"], top_changes(event["results"], self.top),
+                              title=f"Patch detected: {event['new']}")
+        if not asyncio.run_coroutine_threadsafe(self._submit(body), self._loop).result():
+            print("⚠️  Notification queue full, message dropped")
+
+    async def _submit(self, body: bytes) -> bool:
+        return self.dispatcher.submit_nowait(body)
+
+    def close(self):
+        """Flush queued messages and stop the loop thread."""
+        asyncio.run_coroutine_threadsafe(self.dispatcher.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
@@ -0,0 +1,191 @@
+"""
+PatchForge Packed Snapshots
+===========================
+
+Compact binary snapshot format that is memory-mapped instead of parsed.
+
+Layout (little-endian):
+    magic        b"PFPACK" + uint16 version
+    header       uint32 weapon count, uint32 metric count
+    metrics      per metric: uint16 length + UTF-8 name
+    names        uint32 byte length + NUL-separated UTF-8 names (sorted)
+    padding      to an 8-byte boundary
+    values       one float64 column per metric (NaN = missing)
+    kinds        one uint8 column per metric (0 = missing, 1 = float, 2 = int)
+
+The kinds columns let rows read back as the same int/float values the
+JSON snapshot held.
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from typing import Dict, List
+
+from patchforge_core import build_weapon_map, get_schema
+
+PACK_MAGIC = b"PFPACK"
+PACK_VERSION = 1
+PACK_EXTENSION = ".pfpack"
+
+KIND_MISSING, KIND_FLOAT, KIND_INT = 0, 1, 2
+
+
+def is_packed(path: str) -> bool:
+    """Return True if the file starts with the packed snapshot magic."""
+    with open(path, "rb") as f:
+        return f.read(len(PACK_MAGIC)) == PACK_MAGIC
+
+
+# ---------------------------------------------------------
+# WRITER
+# ---------------------------------------------------------
+def pack_snapshot(data: dict, path: str) -> int:
+    """Write a snapshot dict as a packed file. Returns the weapon count."""
+    keys = get_schema().names
+
+    stats_map = build_weapon_map(data)
+    names = sorted(stats_map)
+    if any("\0" in name for name in names):
+        raise ValueError("Weapon names may not contain NUL characters")
+
+    out = bytearray(PACK_MAGIC)
+    out += struct.pack("<HII", PACK_VERSION, len(names), len(keys))
+    for key in keys:
+        encoded = key.encode("utf-8")
+        out += struct.pack("<H", len(encoded)) + encoded
+
+    blob = "\0".join(names).encode("utf-8")
+    out += struct.pack("<I", len(blob)) + blob
+    out += b"\0" * (-len(out) % 8)
+
+    kinds = []
+    for key in keys:
+        column = array("d")
+        kind = bytearray()
+        for name in names:
+            v = stats_map[name].get(key)
+            if v is None:
+                column.append(float("nan"))
+                kind.append(KIND_MISSING)
+            else:
+                column.append(v)
+                kind.append(KIND_INT if isinstance(v, int) else KIND_FLOAT)
+        if sys.byteorder == "big":
+            column.byteswap()
+        out += column.tobytes()
+        kinds.append(kind)
+    for kind in kinds:
+        out += kind
+
+    with open(path, "wb") as f:
+        f.write(out)
+    return len(names)
+
+
+# ---------------------------------------------------------
+# READER
+# ---------------------------------------------------------
+class PackedSnapshot:
+    """
+    Memory-mapped packed snapshot.
+
+    Behaves like a loaded snapshot dict for `compare_jsons` (`.get("weapons")`
+    builds weapon dicts on demand) and hands its columns to the columnar
+    engine without copying via `to_matrix()`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        mm = self._mm
+        if mm[:len(PACK_MAGIC)] != PACK_MAGIC:
+            raise ValueError(f"Not a packed snapshot: {path}")
+        pos = len(PACK_MAGIC)
+        version, self.count, metric_count = struct.unpack_from("<HII", mm, pos)
+        if version != PACK_VERSION:
+            raise ValueError(f"Unsupported pack version {version}: {path}")
+        pos += struct.calcsize("<HII")
+
+        self.metrics: List[str] = []
+        for _ in range(metric_count):
+            (length,) = struct.unpack_from("<H", mm, pos)
+            pos += 2
+            self.metrics.append(mm[pos:pos + length].decode("utf-8"))
+            pos += length
+
+        (blob_len,) = struct.unpack_from("<I", mm, pos)
+        pos += 4
+        blob = mm[pos:pos + blob_len].decode("utf-8")
+        self.names: List[str] = blob.split("\0") if self.count else []
+        pos += blob_len
+        pos += -pos % 8
+
+        self._values_offset = pos
+        self._kinds_offset = pos + 8 * self.count * metric_count
+        self._column = {key: m for m, key in enumerate(self.metrics)}
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self._mm.close()
+
+    def stats(self, i: int) -> Dict:
+        """Rebuild the stats dict of the i-th weapon."""
+        out = {}
+        for m, key in enumerate(self.metrics):
+            cell = m * self.count + i
+            kind = self._mm[self._kinds_offset + cell]
+            if kind == KIND_MISSING:
+                continue
+            (v,) = struct.unpack_from("<d", self._mm, self._values_offset + 8 * cell)
+            out[key] = int(v) if kind == KIND_INT else v
+        return out
+
+    def weapon_map(self) -> Dict[str, Dict]:
+        """{weapon name: stats} straight from the columns (used by build_weapon_map)."""
+        return {name: self.stats(i) for i, name in enumerate(self.names)}
+
+    def get(self, key, default=None):
+        """Dict-style access used by compare_jsons; only `weapons` is stored."""
+        if key != "weapons":
+            return default
+        return [{"name": name, "stats": self.stats(i)} for i, name in enumerate(self.names)]
+
+    def to_matrix(self):
+        """Map the value columns into a SnapshotMatrix (requires NumPy)."""
+        import numpy as np
+        from patchforge_columnar import SnapshotMatrix
+
+        columns = np.frombuffer(
+            self._mm, dtype="<f8", count=self.count * len(self.metrics), offset=self._values_offset
+        ).reshape(len(self.metrics), self.count)
+
+        keys = get_schema().names
+        if keys == self.metrics:
+            values = columns.T
+        else:
+            values = np.full((self.count, len(keys)), np.nan)
+            for j, key in enumerate(keys):
+                if key in self._column:
+                    values[:, j] = columns[self._column[key]]
+        return SnapshotMatrix(self.names, _PackedStats(self), values)
+
+
+class _PackedStats:
+    """Sequence view that builds per-weapon stats dicts only when indexed."""
+
+    __slots__ = ("snapshot",)
+
+    def __init__(self, snapshot: PackedSnapshot):
+        self.snapshot = snapshot
+
+    def __len__(self):
+        return self.snapshot.count
+
+    def __getitem__(self, i):
+        return self.snapshot.stats(i)
@@ -0,0 +1,232 @@
+"""
+PatchForge Profiler
+===================
+
+Per-stage timing for the comparison pipeline.
+
+A Profiler records, for every named stage: calls, wall time, CPU time of
+the thread running it, peak traced memory (tracemalloc) and a row count.
+The pipeline functions (load, build maps, compare, summarize, export,
+history) are wrapped with `profiled`, so they report themselves whenever a
+profiler is active and cost one global lookup otherwise:
+
+    with Profiler() as profiler:
+        results = compare_jsons(load_json(old), load_json(new))
+        summarize_results(results)
+    print(profiler.report())
+
+Callers add their own stages with `profiler.stage(name)`, or
+`profiler.record(...)` for time measured elsewhere. Stages are expected to
+nest on one thread at a time. Memory tracing slows allocation-heavy stages,
+so compare wall times between runs with the same settings.
+"""
+
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+PROFILE_MAX_EVENTS = 10000    # trace events kept for the JSON dump (long monitor runs)
+
+_active: Optional["Profiler"] = None
+
+
+class StageStats:
+    """Totals for one stage name."""
+
+    __slots__ = ("name", "depth", "calls", "wall", "cpu", "peak", "rows")
+
+    def __init__(self, name: str, depth: int):
+        self.name = name
+        self.depth = depth
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak = 0          # bytes, highest traced memory seen while the stage ran
+        self.rows = None
+
+    def as_dict(self) -> Dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+
+class _Span:
+    """One running stage; set .rows to report how many rows it handled."""
+
+    __slots__ = ("rows", "peak")
+
+    def __init__(self):
+        self.rows = None
+        self.peak = 0
+
+
+class Profiler:
+    """Collects StageStats while started (use as a context manager, or start()/stop())."""
+
+    def __init__(self, enabled: bool = True, memory: bool = True, cprofile: bool = False):
+        self.enabled = enabled
+        self.memory = memory
+        self.stages: Dict[str, StageStats] = {}
+        self.events: List[Dict] = []
+        self.wall = 0.0
+        self._cprofile = None
+        if enabled and cprofile:
+            import cProfile
+            self._cprofile = cProfile.Profile()
+        self._stack: List[_Span] = []
+        self._started = None
+        self._origin = time.perf_counter()
+        self._owns_tracemalloc = False
+
+    # -----------------------------------------------------
+    # Lifetime
+    # -----------------------------------------------------
+    def start(self):
+        """Make this the active profiler (pipeline functions report to it)."""
+        global _active
+        if not self.enabled or self._started is not None:
+            return self
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        self._started = time.perf_counter()
+        _active = self
+        return self
+
+    def stop(self):
+        global _active
+        if self._started is None:
+            return
+        self.wall += time.perf_counter() - self._started
+        self._started = None
+        if _active is self:
+            _active = None
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds spent started, including the current run."""
+        running = time.perf_counter() - self._started if self._started is not None else 0.0
+        return self.wall + running
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # -----------------------------------------------------
+    # Recording
+    # -----------------------------------------------------
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as stage `name`; yields a span whose .rows can be set."""
+        span = _Span()
+        if self._started is None:
+            yield span
+            return
+
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            # the parent's peak so far, before the counter is reset for this stage
+            if self._stack:
+                self._stack[-1].peak = max(self._stack[-1].peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        if self._cprofile is not None and not self._stack:
+            self._cprofile.enable()
+        depth = len(self._stack)
+        if name not in self.stages:
+            # registered on entry, so the report lists stages in the order they start
+            self.stages[name] = StageStats(name, depth)
+        self._stack.append(span)
+        start, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield span
+        finally:
+            wall, cpu = time.perf_counter() - start, time.thread_time() - cpu
+            self._stack.pop()
+            if tracing:
+                span.peak = max(span.peak, tracemalloc.get_traced_memory()[1])
+                if self._stack:
+                    self._stack[-1].peak = max(self._stack[-1].peak, span.peak)
+            if self._cprofile is not None and not self._stack:
+                self._cprofile.disable()
+            self.record(name, wall, cpu, span.rows, span.peak, depth, start)
+
+    def record(self, name: str, wall: float, cpu: float = 0.0, rows: Optional[int] = None,
+               peak: int = 0, depth: int = 0, start: Optional[float] = None):
+        """Add a stage measurement taken elsewhere (e.g. on another thread)."""
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(name, depth)
+        stats.calls += 1
+        stats.wall += wall
+        stats.cpu += cpu
+        stats.peak = max(stats.peak, peak)
+        if rows is not None:
+            stats.rows = (stats.rows or 0) + rows
+        if len(self.events) < PROFILE_MAX_EVENTS:
+            begin = (start if start is not None else time.perf_counter() - wall) - self._origin
+            self.events.append({
+                "name": name, "ph": "X", "ts": round(begin * 1e6), "dur": round(wall * 1e6),
+                "pid": 0, "tid": threading.get_ident(), "args": {"rows": rows, "cpu_ms": cpu * 1000},
+            })
+
+    # -----------------------------------------------------
+    # Output
+    # -----------------------------------------------------
+    def as_dict(self) -> Dict:
+        return {"wall": self.elapsed, "stages": [s.as_dict() for s in self.stages.values()]}
+
+    def report(self) -> str:
+        """Text breakdown, one line per stage in the order they first ran (nested stages indented)."""
+        lines = [f"{'Stage':<28} {'Calls':>6} {'Wall ms':>10} {'CPU ms':>10} {'Peak MB':>9} {'Rows':>11}"]
+        for s in self.stages.values():
+            name = "  " * s.depth + s.name
+            peak = f"{s.peak / 1e6:9.1f}" if s.peak else f"{'–':>9}"
+            rows = f"{s.rows:11,}" if s.rows is not None else f"{'–':>11}"
+            lines.append(f"{name:<28} {s.calls:>6} {s.wall * 1000:10.1f} {s.cpu * 1000:10.1f} {peak} {rows}")
+        covered = sum(s.wall for s in self.stages.values() if s.depth == 0)
+        lines.append(f"{'Total':<28} {'':>6} {self.elapsed * 1000:10.1f}   "
+                     f"({covered * 1000:.1f} ms in stages)")
+        return "\n".join(lines)
+
+    def dump_json(self, path: str):
+        """Stage totals plus a Chrome trace (open in chrome://tracing or Perfetto)."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**self.as_dict(), "traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+    def dump_stats(self, path: str):
+        """cProfile statistics of everything run inside stages (read with `python -m pstats`)."""
+        if self._cprofile is None:
+            raise ValueError("Profiler was created without cprofile=True")
+        self._cprofile.dump_stats(path)
+
+
+def active() -> Optional[Profiler]:
+    """The profiler currently collecting, if any."""
+    return _active
+
+
+def profiled(name: str, rows: Optional[Callable] = None):
+    """
+    Decorator reporting each call as stage `name` to the active profiler;
+    rows(result) gives the stage's row count.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None:
+                return fn(*args, **kwargs)
+            with profiler.stage(name) as span:
+                result = fn(*args, **kwargs)
+                if rows is not None:
+                    span.rows = rows(result)
+            return result
+        return wrapper
+    return decorate
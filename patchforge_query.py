@@ -0,0 +1,381 @@
+"""
+PatchForge Result Queries
+=========================
+
+Indexed filtering of comparison results.
+
+A ResultIndex is built once per comparison and answers questions such as
+"Rare weapons with a headDamage nerf larger than 5" without scanning the
+rows:
+
+    index = ResultIndex(results, rarity_map(old_data, new_data))
+    hits = index.query(rarity="Rare", metric="headDamage", kind="nerf", where=[("abs", ">", 5)])
+    len(hits), hits.rows(limit=20)
+
+Rows are partitioned by (metric, change kind, rarity) and every partition
+keeps its row ids sorted by delta. A query picks the matching partitions
+and cuts each one with two binary searches, so counting the hits costs
+O(partitions × log rows) and a page of the largest changes
+O(page × log partitions), however large the diff. Weapons have their own
+index (name → row ids); free-text weapon search scans the distinct names,
+never the rows.
+
+The same queries can be written as text (CLI `query`, GUI filter box):
+
+    rarity=Rare metric=headDamage kind=nerf |delta|>5
+"""
+
+import heapq
+import math
+import re
+import shlex
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import chain, islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from patchforge_export import iter_rows
+from patchforge_rank import UNKNOWN_RARITY
+
+CHANGE_KINDS = ("buff", "nerf", "nochange", "missing")
+QUERY_FIELDS = ("weapon", "metric", "kind", "rarity")
+QUERY_ORDERS = ("abs", "delta", "-delta", "table")
+QUERY_LIMIT = 50
+
+_KIND_ALIASES = {
+    "buff": "buff", "buffs": "buff", "success": "buff",
+    "nerf": "nerf", "nerfs": "nerf", "danger": "nerf",
+    "nochange": "nochange", "unchanged": "nochange", "none": "nochange",
+    "missing": "missing",
+}
+# CompactResults change code -> kind id (codes past the table, e.g. GUI overall rows, are skipped)
+_SKIP = 255
+_CODE_KINDS = (3, 2, 0, 0, 0, 1, 1, 1) + (_SKIP,) * 248
+_CONDITION = re.compile(r"^(\|delta\||abs|delta)(>=|<=|=|>|<)(.+)$", re.IGNORECASE)
+_TERM = re.compile(r"^([a-z]+)[=:](.+)$", re.IGNORECASE)
+
+# an interval of deltas: (low, low included, high, high included)
+Interval = Tuple[float, bool, float, bool]
+_ALL = (-math.inf, True, math.inf, True)
+
+
+def _kind(row: Dict) -> int:
+    status = row["status"]
+    if status == "success":
+        return 0
+    if status == "danger":
+        return 1
+    return 3 if row["delta"] is None else 2
+
+
+# ---------------------------------------------------------
+# CONDITIONS
+# ---------------------------------------------------------
+def condition_intervals(field: str, op: str, value: float) -> List[Interval]:
+    """Delta intervals matching `field op value`; field is "delta" or "abs" (|delta|)."""
+    if field == "delta":
+        return [{
+            ">": (value, False, math.inf, True),
+            ">=": (value, True, math.inf, True),
+            "<": (-math.inf, True, value, False),
+            "<=": (-math.inf, True, value, True),
+            "=": (value, True, value, True),
+        }[op]]
+    if field != "abs":
+        raise ValueError(f"Unknown condition field: {field}")
+    if op in (">", ">="):
+        if value < 0 or (value == 0 and op == ">="):
+            return [_ALL]
+        closed = op == ">="
+        return [(-math.inf, True, -value, closed), (value, closed, math.inf, True)]
+    if op in ("<", "<="):
+        if value < 0 or (value == 0 and op == "<"):
+            return []
+        closed = op == "<="
+        return [(-value, closed, value, closed)]
+    return [(-value, True, -value, True), (value, True, value, True)] if value >= 0 else []
+
+
+def _intersect(a: List[Interval], b: List[Interval]) -> List[Interval]:
+    out = []
+    for lo1, lc1, hi1, hc1 in a:
+        for lo2, lc2, hi2, hc2 in b:
+            lo, lc = (lo1, lc1) if lo1 > lo2 else (lo2, lc2) if lo2 > lo1 else (lo1, lc1 and lc2)
+            hi, hc = (hi1, hc1) if hi1 < hi2 else (hi2, hc2) if hi2 < hi1 else (hi1, hc1 and hc2)
+            if lo < hi or (lo == hi and lc and hc):
+                out.append((lo, lc, hi, hc))
+    return out
+
+
+def _accepts(intervals: List[Interval], d: float) -> bool:
+    for lo, lc, hi, hc in intervals:
+        if (lo < d or (lc and lo == d)) and (d < hi or (hc and d == hi)):
+            return True
+    return False
+
+
+def parse_query(text: str) -> Dict:
+    """
+    Keyword arguments for ResultIndex.query from a text query. Terms are
+    separated by spaces (quote values that contain spaces):
+        weapon=NAME  metric=NAME  kind=buff|nerf|nochange|missing  rarity=NAME
+        delta>N  delta<=N  |delta|>N  abs>=N  ...  (operators > >= < <= =)
+    `key=a,b` matches any of the values; other words search weapon names.
+    """
+    try:
+        tokens = shlex.split(text)
+    except ValueError as e:
+        raise ValueError(f"Invalid query: {e}") from None
+    query: Dict = {}
+    words = []
+    for token in tokens:
+        match = _CONDITION.match(token)
+        if match:
+            field, op, value = match.groups()
+            try:
+                number = float(value)
+            except ValueError:
+                raise ValueError(f"Not a number in {token!r}") from None
+            field = "delta" if field.lower() == "delta" else "abs"
+            query.setdefault("where", []).append((field, op, number))
+            continue
+        match = _TERM.match(token)
+        if match:
+            key, values = match.group(1).lower(), [v for v in match.group(2).split(",") if v]
+            key = "kind" if key == "status" else key
+            if key not in QUERY_FIELDS:
+                raise ValueError(f"Unknown query field {key!r} (use {', '.join(QUERY_FIELDS)})")
+            if key == "kind":
+                unknown = [v for v in values if v.lower() not in _KIND_ALIASES]
+                if unknown:
+                    raise ValueError(f"Unknown change kind {unknown[0]!r} (use {', '.join(CHANGE_KINDS)})")
+            query.setdefault(key, []).extend(values)
+            continue
+        words.append(token)
+    if words:
+        query["text"] = " ".join(words)
+    return query
+
+
+def is_structured(text: str) -> bool:
+    """True when text uses query syntax rather than being a plain search."""
+    return any(c in text for c in "=<>:")
+
+
+# ---------------------------------------------------------
+# INDEX
+# ---------------------------------------------------------
+class QueryResult:
+    """Row ids matching a query, held as runs of partitions sorted by delta."""
+
+    def __init__(self, index: "ResultIndex", runs: List[Tuple[array, array, int, int]]):
+        self.index = index
+        self.runs = runs     # (deltas, ids, start, stop) per matching partition slice
+
+    def __len__(self):
+        return sum(stop - start for _, _, start, stop in self.runs)
+
+    def _ordered(self, order: str) -> Iterable[int]:
+        if order == "table":
+            return iter(sorted(chain.from_iterable(memoryview(ids)[start:stop] for _, ids, start, stop in self.runs)))
+        if order == "delta":
+            runs = [zip(memoryview(d)[a:b], memoryview(ids)[a:b]) for d, ids, a, b in self.runs]
+            return (i for _, i in heapq.merge(*runs))
+        if order == "-delta":
+            runs = [zip(reversed(memoryview(d)[a:b]), reversed(memoryview(ids)[a:b])) for d, ids, a, b in self.runs]
+            return (i for _, i in heapq.merge(*runs, key=lambda p: -p[0]))
+        if order == "abs":
+            # each run splits at zero into two runs of falling |delta|
+            runs = []
+            for d, ids, a, b in self.runs:
+                zero = bisect_left(d, 0, a, b)
+                runs.append(zip(memoryview(d)[a:zero], memoryview(ids)[a:zero]))
+                runs.append(zip(reversed(memoryview(d)[zero:b]), reversed(memoryview(ids)[zero:b])))
+            return (i for _, i in heapq.merge(*runs, key=lambda p: -abs(p[0])))
+        raise ValueError(f"Unknown order: {order} (use {', '.join(QUERY_ORDERS)})")
+
+    def ids(self, order: str = "table", limit: Optional[int] = None, offset: int = 0) -> array:
+        """Matching row ids (positions in the indexed results) in the given order."""
+        ordered = self._ordered(order)
+        if offset or limit is not None:
+            ordered = islice(ordered, offset, None if limit is None else offset + limit)
+        return array("I", ordered)
+
+    def rows(self, limit: Optional[int] = QUERY_LIMIT, order: str = "abs", offset: int = 0) -> List:
+        """The matching rows themselves; by default the QUERY_LIMIT largest changes."""
+        results = self.index.results
+        return [results[i] for i in self.ids(order, limit, offset)]
+
+
+class ResultIndex:
+    """Secondary indexes over one comparison's rows (see module docstring)."""
+
+    def __init__(self, results: Sequence[Dict], rarities: Optional[Dict[str, str]] = None):
+        if not hasattr(results, "__getitem__"):
+            results = list(iter_rows(results))
+        self.results = results
+        rarities = rarities or {}
+
+        self.weapons: List[str] = []
+        self.metrics: List[str] = []
+        self.rarities: List[str] = []
+        weapon_ids: Dict[str, int] = {}
+        metric_ids: Dict[str, int] = {}
+        rarity_ids: Dict[str, int] = {}
+        self._weapon_rarity = array("H")
+
+        def intern(name, ids, names):
+            i = ids.get(name)
+            if i is None:
+                i = ids[name] = len(names)
+                names.append(name)
+            return i
+
+        def weapon_id(name):
+            w = weapon_ids.get(name)
+            if w is None:
+                w = intern(name, weapon_ids, self.weapons)
+                self._weapon_rarity.append(intern(rarities.get(name) or UNKNOWN_RARITY, rarity_ids, self.rarities))
+            return w
+
+        if hasattr(results, "code") and hasattr(results, "names"):
+            # CompactResults (or the GUI RowStore): translate the columns, no per-row dicts
+            weapon_of = [weapon_id(name) for name in results.names]
+            metric_of = [intern(m, metric_ids, self.metrics) for m in results.metrics]
+            row_weapon = array("I", map(weapon_of.__getitem__, results.weapon))
+            row_metric = array("H", map(metric_of.__getitem__, results.metric))
+            row_kind = array("B", map(_CODE_KINDS.__getitem__, results.code))
+            delta = results.delta
+        else:
+            row_weapon, row_metric, row_kind, delta = array("I"), array("H"), array("B"), array("d")
+            for r in iter_rows(results):
+                row_weapon.append(weapon_id(r["weapon"]))
+                row_metric.append(intern(r["metric"], metric_ids, self.metrics))
+                row_kind.append(_kind(r))
+                delta.append(0.0 if r["delta"] is None else r["delta"])
+        self._delta = delta
+
+        # partition key per row: (metric, kind, rarity) packed into one int, -1 if not a result row
+        self._rarity_count = rarity_count = len(self.rarities) or 1
+        self._span = span = len(CHANGE_KINDS) * rarity_count
+        weapon_rarity = self._weapon_rarity
+        self._row_key = array("i", (
+            -1 if k == _SKIP else m * span + k * rarity_count + weapon_rarity[w]
+            for w, m, k in zip(row_weapon, row_metric, row_kind)
+        ))
+        row_key = self._row_key
+
+        # partitions: bucket the row ids by key, then sort each bucket by delta
+        buckets: Dict[int, List[int]] = {}
+        for i, key in enumerate(row_key):
+            if key >= 0:
+                ids = buckets.get(key)
+                if ids is None:
+                    ids = buckets[key] = []
+                ids.append(i)
+        self._parts: Dict[Tuple[int, int, int], Tuple[array, array]] = {}
+        for key, ids in buckets.items():
+            ids.sort(key=delta.__getitem__)
+            m, rest = divmod(key, span)
+            self._parts[(m, *divmod(rest, rarity_count))] = (array("d", [delta[i] for i in ids]), array("I", ids))
+        indexed = [i for i, key in enumerate(row_key) if key >= 0]
+
+        # weapons: row ids grouped by weapon, found by binary search on the weapon column
+        by_weapon = sorted(indexed, key=row_weapon.__getitem__)
+        self._weapon_order = array("I", by_weapon)
+        self._weapon_keys = array("I", map(row_weapon.__getitem__, by_weapon))
+
+        self._weapon_ids = {name.lower(): w for name, w in weapon_ids.items()}
+        self._metric_ids = {name.lower(): m for name, m in metric_ids.items()}
+        self._rarity_ids = {name.lower(): r for name, r in rarity_ids.items()}
+        # all weapon names in one string, so a name search is a few str.find calls
+        lower = [name.lower() for name in self.weapons]
+        self._names_blob = "\n".join(lower)
+        self._name_starts = array("I")
+        pos = 0
+        for name in lower:
+            self._name_starts.append(pos)
+            pos += len(name) + 1
+
+    def __len__(self):
+        return len(self._weapon_order)
+
+    def search_weapons(self, text: str) -> set:
+        """Ids of the weapons whose name contains text (case-insensitive)."""
+        needle, blob, starts = text.lower(), self._names_blob, self._name_starts
+        found = set()
+        if not needle or "\n" in needle:
+            return found
+        pos = blob.find(needle)
+        while pos != -1:
+            w = bisect_right(starts, pos) - 1
+            found.add(w)
+            pos = blob.find(needle, starts[w + 1]) if w + 1 < len(starts) else -1
+        return found
+
+    @staticmethod
+    def _ids(values, lookup: Dict[str, int]) -> Optional[set]:
+        if values is None:
+            return None
+        if isinstance(values, str):
+            values = [values]
+        return {lookup[v.lower()] for v in values if v.lower() in lookup}
+
+    def query(self, weapon: Union[str, Iterable[str], None] = None, metric: Union[str, Iterable[str], None] = None,
+              kind: Union[str, Iterable[str], None] = None, rarity: Union[str, Iterable[str], None] = None,
+              text: Optional[str] = None, where: Iterable[Tuple[str, str, float]] = ()) -> QueryResult:
+        """
+        Rows matching every given filter. weapon / metric / kind / rarity take
+        one value or several (any matches, case-insensitive); text is a
+        case-insensitive weapon name substring; where holds (field, op,
+        value) conditions with field "delta" or "abs" and op one of
+        > >= < <= = (e.g. ("abs", ">", 5) for |Δ| > 5).
+        """
+        metrics = self._ids(metric, self._metric_ids)
+        rarities = self._ids(rarity, self._rarity_ids)
+        kinds = None
+        if kind is not None:
+            kinds = {CHANGE_KINDS.index(_KIND_ALIASES[k.lower()])
+                     for k in ([kind] if isinstance(kind, str) else kind) if k.lower() in _KIND_ALIASES}
+        intervals = [_ALL]
+        where = list(where)
+        for field, op, value in where:
+            intervals = _intersect(intervals, condition_intervals(field, op, value))
+        if where:
+            # missing stats have no delta to compare
+            kinds = (kinds if kinds is not None else set(range(len(CHANGE_KINDS)))) - {CHANGE_KINDS.index("missing")}
+
+        weapons = self._ids(weapon, self._weapon_ids)
+        if text:
+            found = self.search_weapons(text)
+            weapons = found if weapons is None else weapons & found
+        if weapons is not None:
+            return self._query_weapons(weapons, metrics, kinds, rarities, intervals)
+
+        runs = []
+        for (m, kind_id, r), (deltas, ids) in self._parts.items():
+            if ((metrics is not None and m not in metrics) or (kinds is not None and kind_id not in kinds)
+                    or (rarities is not None and r not in rarities)):
+                continue
+            for lo, lc, hi, hc in intervals:
+                start = bisect_left(deltas, lo) if lc else bisect_right(deltas, lo)
+                stop = bisect_right(deltas, hi) if hc else bisect_left(deltas, hi)
+                if start < stop:
+                    runs.append((deltas, ids, start, stop))
+        return QueryResult(self, runs)
+
+    def _query_weapons(self, weapons, metrics, kinds, rarities, intervals) -> QueryResult:
+        """Few weapons: check their rows one by one instead of cutting partitions."""
+        delta, row_key, span, rarity_count = self._delta, self._row_key, self._span, self._rarity_count
+        keys, order = self._weapon_keys, self._weapon_order
+        hits = []
+        for w in weapons:
+            if rarities is not None and self._weapon_rarity[w] not in rarities:
+                continue
+            for i in order[bisect_left(keys, w):bisect_right(keys, w)]:
+                m, rest = divmod(row_key[i], span)
+                if ((metrics is None or m in metrics) and (kinds is None or rest // rarity_count in kinds)
+                        and _accepts(intervals, delta[i])):
+                    hits.append(i)
+        ids = array("I", sorted(hits, key=delta.__getitem__))
+        return QueryResult(self, [(array("d", map(delta.__getitem__, ids)), ids, 0, len(ids))] if ids else [])
@@ -0,0 +1,123 @@
+"""
+PatchForge Rankings
+===================
+
+Top-K buffs and nerfs, overall or grouped by metric or rarity.
+
+Rows are ranked straight off the comparison stream with bounded heaps:
+only K rows per group and direction are ever kept, so K=10 over a
+million-cell diff is one pass with no sort (or copy) of the full list.
+Pair with `iter_compare` to avoid materializing the comparison at all.
+"""
+
+import heapq
+from typing import Callable, Dict, Iterable, List, Optional
+
+from patchforge_export import iter_rows
+
+RANK_GROUPS = ("overall", "metric", "rarity")
+RANK_MEASURES = ("delta", "percent")
+TOP_COUNT = 10
+UNKNOWN_RARITY = "Unknown"
+
+_SIDES = {"success": "buffs", "danger": "nerfs"}
+
+
+def change_score(row: Dict, measure: str = "delta") -> Optional[float]:
+    """
+    How big a change is: |Δ|, or with measure="percent" |Δ| as a percentage
+    of the old value. None when it cannot be scored (missing stat, old == 0).
+    """
+    delta = row["delta"]
+    if delta is None:
+        return None
+    if measure == "percent":
+        return abs(delta) / abs(row["old"]) * 100 if row["old"] else None
+    return abs(delta)
+
+
+class TopK:
+    """The k highest-scoring items pushed so far (none for k <= 0); ties keep the earlier item."""
+
+    __slots__ = ("k", "_heap", "_seq")
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap = []      # min-heap of (score, -seq, item)
+        self._seq = 0
+
+    def push(self, score: float, item):
+        if self.k <= 0:
+            return
+        entry = (score, -self._seq, item)
+        self._seq += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List:
+        """(score, item) pairs, highest first."""
+        return [(score, item) for score, _, item in sorted(self._heap, reverse=True)]
+
+
+def rarity_map(*snapshots: Dict) -> Dict[str, str]:
+    """{weapon name: rarity} from loaded snapshots; later snapshots win."""
+    rarities = {}
+    for data in snapshots:
+        for w in data.get("weapons", []):
+            rarities[w["name"]] = w.get("rarity") or UNKNOWN_RARITY
+    return rarities
+
+
+def rank_changes(results: Iterable[Dict], k: int = TOP_COUNT, group: str = "overall",
+                 measure: str = "delta", rarities: Optional[Dict[str, str]] = None,
+                 metric: Optional[str] = None) -> Dict[str, Dict[str, List[Dict]]]:
+    """
+    Top-k buffs and nerfs per group:
+        {group name: {"buffs": [row, ...], "nerfs": [row, ...]}}
+    Rows are copies of the result rows plus a "score" key, largest change
+    first. group="overall" gives a single "all" group; "rarity" needs the
+    rarities map (see rarity_map). metric limits the ranking to one metric.
+    """
+    if group not in RANK_GROUPS:
+        raise ValueError(f"Unknown ranking group: {group}")
+    if measure not in RANK_MEASURES:
+        raise ValueError(f"Unknown ranking measure: {measure}")
+    if group == "rarity":
+        rarities = rarities or {}
+        group_of: Callable[[Dict], str] = lambda r: rarities.get(r["weapon"], UNKNOWN_RARITY)  # noqa: E731
+    elif group == "metric":
+        group_of = lambda r: r["metric"]  # noqa: E731
+    else:
+        group_of = lambda r: "all"  # noqa: E731
+
+    heaps: Dict[str, Dict[str, TopK]] = {}
+    for r in iter_rows(results):
+        side = _SIDES.get(r["status"])
+        if side is None or (metric is not None and r["metric"] != metric):
+            continue
+        score = change_score(r, measure)
+        if score is None:
+            continue
+        name = group_of(r)
+        sides = heaps.get(name)
+        if sides is None:
+            sides = heaps[name] = {"buffs": TopK(k), "nerfs": TopK(k)}
+        sides[side].push(score, r)
+
+    return {
+        name: {side: [dict(r, score=score) for score, r in top.items()] for side, top in sides.items()}
+        for name, sides in sorted(heaps.items())
+    }
+
+
+def top_rows(results: Iterable[Dict], k: int = TOP_COUNT, measure: str = "delta") -> List[Dict]:
+    """The k largest buffs or nerfs together, largest first (rows as given, no score key)."""
+    top = TopK(k)
+    for r in iter_rows(results):
+        if r["status"] in _SIDES:
+            score = change_score(r, measure)
+            if score is not None:
+                top.push(score, r)
+    return [r for _, r in top.items()]
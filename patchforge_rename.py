@@ -0,0 +1,216 @@
+"""
+PatchForge Rename Resolver
+==========================
+
+Pairs weapons a patch renamed ("Ferro II" → "Ferro Mk II"), which exact
+name matching reports as one weapon gone and another added.
+
+Only weapons without an exact match take part. The unmatched new names go
+into a trigram index; each unmatched old name looks up the few new names
+sharing the most trigrams with it, and only those candidates are scored on
+name similarity plus stat similarity. Nothing compares every old weapon
+against every new one. Pairs are then taken best score first, one to one.
+
+Resolved renames are kept in an editable JSON file (renames.json):
+
+    {"Ferro II": "Ferro Mk II", "Old Gun": null}
+
+An entry is applied whenever both names are unmatched, without scoring
+again; null marks a weapon that must never be paired by the resolver.
+Compared rows of a renamed weapon are labelled "Ferro II → Ferro Mk II".
+"""
+
+import json
+import os
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from patchforge_core import as_number, get_schema
+
+RENAME_FILE = "renames.json"
+RENAME_CANDIDATES = 5        # new names scored per unmatched old name
+RENAME_COMMON_GRAMS = 64     # trigrams in more names than this (and 2% of them) are not looked up
+RENAME_LOOKUP_GRAMS = 8      # rarest trigrams of a name that are looked up
+RENAME_THRESHOLD = 0.6       # minimum combined score to accept a rename
+RENAME_MIN_NAME = 0.3        # minimum name similarity, whatever the stats say
+NAME_WEIGHT = 0.5            # share of the name score in the combined score
+
+
+def rename_label(old: str, new: str) -> str:
+    """The weapon name rows of a renamed weapon carry."""
+    return f"{old} → {new}"
+
+
+# ---------------------------------------------------------
+# SIMILARITY
+# ---------------------------------------------------------
+def trigrams(name: str) -> Counter:
+    """Character trigrams of a normalized name (padded, so word edges count)."""
+    text = f"  {' '.join(name.lower().split())} "
+    return Counter(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def name_similarity(a: Counter, b: Counter) -> float:
+    """Dice coefficient of two trigram multisets (0..1)."""
+    total = sum(a.values()) + sum(b.values())
+    return 2 * sum((a & b).values()) / total if total else 0.0
+
+
+def stat_similarity(old: Dict, new: Dict, metrics: Iterable[str]) -> float:
+    """
+    Mean closeness of the metrics both weapons have as real numbers: 1 for
+    equal values, falling to 0 at a 100% relative difference. Other values
+    ("N/A", booleans) count as missing, as in compare_weapon. 0 when no metric is shared.
+    """
+    total = count = 0
+    for key in metrics:
+        o, n = old.get(key), new.get(key)
+        if as_number(o) is None or as_number(n) is None:
+            continue
+        count += 1
+        scale = max(abs(o), abs(n))
+        total += 1.0 if scale == 0 else max(0.0, 1.0 - abs(n - o) / scale)
+    return total / count if count else 0.0
+
+
+class TrigramIndex:
+    """Inverted index of names by trigram, for candidate lookup."""
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = list(names)
+        self.grams: List[Counter] = [trigrams(name) for name in self.names]
+        self._postings: Dict[str, List[int]] = {}
+        for i, grams in enumerate(self.grams):
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(i)
+        # trigrams shared by a large share of the names (" th", common words)
+        # say little about a match and cost the most to walk
+        self._common = max(RENAME_COMMON_GRAMS, len(self.names) // 50)
+
+    def candidates(self, name: str, limit: int = RENAME_CANDIDATES) -> List[Tuple[int, Counter]]:
+        """(index, trigrams) of the names sharing the most (distinctive) trigrams with name."""
+        postings = sorted((self._postings[gram] for gram in trigrams(name) if gram in self._postings), key=len)
+        rare = [p for p in postings[:RENAME_LOOKUP_GRAMS] if len(p) <= self._common] or postings[:1]
+        hits = Counter()
+        for posting in rare:
+            hits.update(posting)
+        return [(i, self.grams[i]) for i, _ in hits.most_common(limit)]
+
+
+# ---------------------------------------------------------
+# RESOLUTION
+# ---------------------------------------------------------
+def find_renames(old_map: Dict[str, Dict], new_map: Dict[str, Dict],
+                 old_names: Optional[Iterable[str]] = None,
+                 new_names: Optional[Iterable[str]] = None) -> Dict[str, Tuple[str, float]]:
+    """
+    {old name: (new name, score)} for the unmatched weapons (by default every
+    name missing from the other map) that look like renames.
+    """
+    if old_names is None:
+        old_names = [name for name in old_map if name not in new_map]
+    if new_names is None:
+        new_names = [name for name in new_map if name not in old_map]
+    index = TrigramIndex(new_names)
+    if not index.names:
+        return {}
+
+    metrics = get_schema().names
+    scored = []
+    for old in old_names:
+        grams = trigrams(old)
+        for i, candidate in index.candidates(old):
+            name_score = name_similarity(grams, candidate)
+            if name_score < RENAME_MIN_NAME:
+                continue
+            new = index.names[i]
+            stats_score = stat_similarity(old_map[old], new_map[new], metrics)
+            score = NAME_WEIGHT * name_score + (1 - NAME_WEIGHT) * stats_score
+            if score >= RENAME_THRESHOLD:
+                scored.append((score, old, new))
+
+    # best pairs first, each weapon used once
+    renames, taken = {}, set()
+    for score, old, new in sorted(scored, key=lambda s: (-s[0], s[1], s[2])):
+        if old not in renames and new not in taken:
+            renames[old] = (new, score)
+            taken.add(new)
+    return renames
+
+
+def apply_renames(old_map: Dict[str, Dict], new_map: Dict[str, Dict],
+                  renames: Dict[str, str]) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+    """Copies of both maps with each renamed weapon under its rename_label on both sides."""
+    if not renames:
+        return old_map, new_map
+    old_map, new_map = dict(old_map), dict(new_map)
+    for old, new in renames.items():
+        label = rename_label(old, new)
+        old_map[label] = old_map.pop(old)
+        new_map[label] = new_map.pop(new)
+    return old_map, new_map
+
+
+def rename_keys(mapping: Dict[str, object], renames: Dict[str, str]) -> Dict[str, object]:
+    """A {weapon name: value} map (e.g. rarities) with renamed weapons under their label."""
+    if not renames:
+        return mapping
+    mapping = dict(mapping)
+    for old, new in renames.items():
+        value = mapping.get(new, mapping.get(old))
+        if value is not None:
+            mapping[rename_label(old, new)] = value
+    return mapping
+
+
+class RenameMap:
+    """Cached, hand-editable rename decisions (see module docstring)."""
+
+    def __init__(self, path: str = RENAME_FILE):
+        self.path = path
+        self.pairs: Dict[str, Optional[str]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                pairs = json.load(f)
+            if not isinstance(pairs, dict) or not all(v is None or isinstance(v, str) for v in pairs.values()):
+                raise ValueError(f"{path}: expected {{old name: new name or null}}")
+            self.pairs = pairs
+        self.found: Dict[str, Tuple[str, float]] = {}   # resolved by the last resolve(), with scores
+
+    def save(self):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(self.pairs.items())), f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+    def set(self, old: str, new: Optional[str]):
+        """Record old → new (None: never pair old)."""
+        self.pairs[old] = new
+
+    def forget(self, old: str):
+        self.pairs.pop(old, None)
+
+    def resolve(self, old_map: Dict[str, Dict], new_map: Dict[str, Dict], auto: bool = True) -> Dict[str, str]:
+        """
+        {old name: new name} for this pair of weapon maps: cached entries whose
+        names are both unmatched, then (with auto) newly found renames, which
+        are added to the map. Call save() to keep them.
+        """
+        old_names = [name for name in old_map if name not in new_map]
+        new_names = {name for name in new_map if name not in old_map}
+
+        renames = {}
+        for old in old_names:
+            new = self.pairs.get(old)
+            if new in new_names:
+                renames[old] = new
+                new_names.discard(new)
+
+        self.found = {}
+        if auto:
+            left = [old for old in old_names if old not in self.pairs]
+            self.found = find_renames(old_map, new_map, left, sorted(new_names))
+            for old, (new, _) in self.found.items():
+                renames[old] = new
+                self.pairs[old] = new
+        return renames
@@ -0,0 +1,202 @@
+"""
+PatchForge Compact Results
+==========================
+
+Array-backed comparison results.
+
+`compare_jsons` returns one seven-key dict per weapon×metric cell, which
+repeats the weapon name, metric name and change string in every row.
+CompactResults keeps the same rows in parallel arrays instead (interned
+weapon / metric indices, float values and deltas, one byte per row for the
+change code), about 30 bytes per row, and hands out `ResultRow` views that
+read like the row dicts.
+"""
+
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterator, List
+
+from patchforge_core import compare_weapon, get_schema
+from patchforge_schema import BUFF_LABELS, NERF_LABELS
+
+# change codes; the status follows from the code
+CHANGES = ("Missing", "No Change") + BUFF_LABELS + NERF_LABELS
+STATUSES = ("secondary", "secondary") + ("success",) * len(BUFF_LABELS) + ("danger",) * len(NERF_LABELS)
+CHANGE_CODES = {change: code for code, change in enumerate(CHANGES)}
+MISSING, NOCHANGE = 0, 1
+
+# value kinds, so rows read back the same int / float values the snapshot held
+KIND_EMPTY, KIND_FLOAT, KIND_INT = 0, 1, 2
+
+ROW_KEYS = ("weapon", "metric", "old", "new", "delta", "change", "status")
+
+
+def _kind(v) -> int:
+    if isinstance(v, bool) or not isinstance(v, (int, float)):
+        return KIND_EMPTY
+    return KIND_INT if isinstance(v, int) else KIND_FLOAT
+
+
+class CompactResults:
+    """Comparison rows stored column-wise; iterates ResultRow views."""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.metrics: List[str] = []
+        self._metric_ids: Dict[str, int] = {}
+        self.weapon = array("I")
+        self.metric = array("B" if len(get_schema()) < 256 else "H")
+        self.old = array("d")
+        self.new = array("d")
+        self.kinds = array("B")      # old kind * 3 + new kind
+        self.delta = array("d")      # 0.0 where the stat is missing
+        self.code = array("B")
+
+    def __len__(self):
+        return len(self.code)
+
+    def __iter__(self):
+        for i in range(len(self.code)):
+            yield ResultRow(self, i)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ResultRow(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return ResultRow(self, index)
+
+    # -----------------------------------------------------
+    # Building
+    # -----------------------------------------------------
+    def extend(self, rows):
+        """Append row dicts (weapons must arrive grouped by name)."""
+        for r in rows:
+            self._append(r["weapon"], r["metric"], r["old"], r["new"], r["delta"], CHANGE_CODES[r["change"]])
+
+    def _append(self, name, metric, o, n, delta, code):
+        if not self.names or self.names[-1] != name:
+            self.names.append(name)
+        metric_id = self._metric_ids.get(metric)
+        if metric_id is None:
+            metric_id = self._metric_ids[metric] = len(self.metrics)
+            self.metrics.append(metric)
+        self.weapon.append(len(self.names) - 1)
+        self.metric.append(metric_id)
+        self.kinds.append(_kind(o) * 3 + _kind(n))
+        self.old.append(o if isinstance(o, (int, float)) else 0.0)
+        self.new.append(n if isinstance(n, (int, float)) else 0.0)
+        self.delta.append(delta if isinstance(delta, (int, float)) else 0.0)
+        self.code.append(code)
+
+    # -----------------------------------------------------
+    # Reading
+    # -----------------------------------------------------
+    def value(self, column, i, kind):
+        if kind == KIND_EMPTY:
+            return None
+        v = column[i]
+        return int(v) if kind == KIND_INT else v
+
+    def field(self, i: int, key: str):
+        """One field of row i, typed as compare_jsons would return it."""
+        if key == "weapon":
+            return self.names[self.weapon[i]]
+        if key == "metric":
+            return self.metrics[self.metric[i]]
+        if key == "change":
+            return CHANGES[self.code[i]]
+        if key == "status":
+            return STATUSES[self.code[i]]
+        old_kind, new_kind = divmod(self.kinds[i], 3)
+        if key == "old":
+            return self.value(self.old, i, old_kind)
+        if key == "new":
+            return self.value(self.new, i, new_kind)
+        if key == "delta":
+            code = self.code[i]
+            if code == MISSING:
+                return None
+            if code == NOCHANGE:
+                return 0
+            # recomputed from the typed values, so int stats keep int deltas
+            return self.value(self.new, i, new_kind) - self.value(self.old, i, old_kind)
+        raise KeyError(key)
+
+    def iter_dicts(self) -> Iterator[Dict]:
+        """Plain row dicts built straight from the columns (fast path for exporters)."""
+        names, metrics = self.names, self.metrics
+        columns = zip(self.weapon, self.metric, self.old, self.new, self.kinds, self.code)
+        for w, m, o, n, kinds, code in columns:
+            old_kind, new_kind = divmod(kinds, 3)
+            o = None if old_kind == KIND_EMPTY else int(o) if old_kind == KIND_INT else o
+            n = None if new_kind == KIND_EMPTY else int(n) if new_kind == KIND_INT else n
+            yield {
+                "weapon": names[w],
+                "metric": metrics[m],
+                "old": o,
+                "new": n,
+                "delta": None if code == MISSING else 0 if code == NOCHANGE else n - o,
+                "change": CHANGES[code],
+                "status": STATUSES[code],
+            }
+
+    def summarize(self) -> Dict:
+        """Same output as summarize_results, straight from the columns."""
+        counts = [self.code.count(code) for code in range(len(CHANGES))]
+        summary = {
+            "buffs": sum(counts[2:5]),
+            "nerfs": sum(counts[5:8]),
+            "nochange": counts[MISSING] + counts[NOCHANGE],
+            "mixed": 0,
+            "totals": {},
+        }
+
+        # sum in row order so float totals match the dict rows exactly
+        totals: Dict[int, float] = {}
+        buffed, nerfed = set(), set()
+        for i, code in enumerate(self.code):
+            if code == MISSING:
+                continue
+            metric_id = self.metric[i]
+            totals[metric_id] = totals.get(metric_id, 0) + self.field(i, "delta")
+            if 2 <= code < 5:
+                buffed.add(self.weapon[i])
+            elif code >= 5:
+                nerfed.add(self.weapon[i])
+
+        summary["totals"] = {self.metrics[m]: total for m, total in totals.items()}
+        summary["mixed"] = len(buffed & nerfed)
+        return summary
+
+
+class ResultRow(Mapping):
+    """Read-only, dict-like view of one CompactResults row."""
+
+    __slots__ = ("_results", "_index")
+
+    def __init__(self, results: CompactResults, index: int):
+        self._results = results
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._results.field(self._index, key)
+
+    def __iter__(self):
+        return iter(ROW_KEYS)
+
+    def __len__(self):
+        return len(ROW_KEYS)
+
+    def __repr__(self):
+        return f"ResultRow({dict(self)!r})"
+
+
+def compare_compact(old_map: Dict[str, Dict], new_map: Dict[str, Dict]) -> CompactResults:
+    """compare_maps into a CompactResults; each weapon's row dicts are dropped right away."""
+    results = CompactResults()
+    for name in sorted(set(old_map.keys()) | set(new_map.keys())):
+        results.extend(compare_weapon(name, old_map.get(name, {}), new_map.get(name, {})))
+    return results
@@ -0,0 +1,180 @@
+"""
+PatchForge Metric Schema
+========================
+
+Which stats are compared, and how.
+
+A schema is a list of metrics, each with a name, a key path into the
+weapon's `stats` (dots reach into nested objects), a direction and two
+severity bands. It is loaded from a JSON file:
+
+    {"metrics": [
+        {"name": "bodyDamage", "higher_is_better": true, "bands": [1, 5]},
+        {"name": "recoilVertical", "path": "recoil.vertical",
+         "higher_is_better": false, "bands": [0.1, 0.5]}
+    ]}
+
+(`path` defaults to the name; `bands` to [1, 5].)
+
+Everything is compiled once: key paths become accessor functions that
+flatten each weapon's stats to {metric name: value} when the weapon map is
+built, and the buff / nerf rules become a table of (name, direction,
+bands) tuples read alongside precomputed change labels. Classifying a cell
+is then two comparisons, whatever the number of metrics.
+"""
+
+import json
+import math
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+SCHEMA_FILE = "metrics.json"
+DEFAULT_BANDS = (1, 5)
+
+SEVERITY_MARKS = ("·", "•", "●")
+BUFF_LABELS = tuple(f"Buff {mark}" for mark in SEVERITY_MARKS)
+NERF_LABELS = tuple(f"Nerf {mark}" for mark in SEVERITY_MARKS)
+
+
+def compile_path(path: str) -> Callable[[Dict], object]:
+    """Accessor for a dotted key path; returns None when any step is missing."""
+    parts = tuple(path.split("."))
+    if not all(parts):
+        raise ValueError(f"Invalid metric path: {path!r}")
+    if len(parts) == 1:
+        key = parts[0]
+        return lambda stats: stats.get(key)
+    if len(parts) == 2:
+        outer, inner = parts
+
+        def get(stats):
+            node = stats.get(outer)
+            return node.get(inner) if isinstance(node, dict) else None
+        return get
+
+    def get(stats):
+        node = stats
+        for part in parts:
+            if not isinstance(node, dict):
+                return None
+            node = node.get(part)
+        return node
+    return get
+
+
+class Metric:
+    """One compared stat."""
+
+    __slots__ = ("name", "path", "higher_better", "bands", "get")
+
+    def __init__(self, name: str, path: Optional[str] = None, higher_better: bool = True,
+                 bands: Tuple[float, float] = DEFAULT_BANDS):
+        small, large = bands
+        if not 0 <= small <= large:
+            raise ValueError(f"Metric {name}: bands must satisfy 0 <= small <= large, got {bands}")
+        self.name = name
+        self.path = path or name
+        self.higher_better = bool(higher_better)
+        self.bands = (small, large)
+        self.get = compile_path(self.path)
+
+    def config(self) -> Dict:
+        entry = {"name": self.name, "higher_is_better": self.higher_better, "bands": list(self.bands)}
+        if self.path != self.name:
+            entry["path"] = self.path
+        return entry
+
+
+class MetricSchema:
+    """A compiled list of metrics (see module docstring)."""
+
+    def __init__(self, metrics: Iterable[Metric]):
+        self.metrics: List[Metric] = list(metrics)
+        self.names: List[str] = [m.name for m in self.metrics]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("Metric names must be unique")
+
+        # flat: stats can be used as they are, no per-weapon extraction needed
+        self.flat = all(m.path == m.name for m in self.metrics)
+        # top-level stats keys the metrics read (what the streaming loader keeps)
+        self.roots: List[str] = list(dict.fromkeys(m.path.split(".")[0] for m in self.metrics))
+        self.pairs: List[Tuple[str, bool]] = [(m.name, m.higher_better) for m in self.metrics]
+        self.thresholds: Dict[str, Tuple[float, float]] = {m.name: m.bands for m in self.metrics}
+        # (name, sign, small, large) per metric: sign * delta > 0 is a buff
+        self.table = [(m.name, 1 if m.higher_better else -1, m.bands[0], m.bands[1]) for m in self.metrics]
+        self._getters = [(m.name, m.get) for m in self.metrics]
+
+    def __len__(self):
+        return len(self.metrics)
+
+    def __reduce__(self):
+        # accessors are closures; rebuild from the config (e.g. for process pools)
+        return schema_from_config, (self.config(),)
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[str, bool]], thresholds: Dict[str, Tuple[float, float]]):
+        """Schema from METRICS-style (name, higher_is_better) pairs and a THRESHOLDS dict."""
+        return cls(Metric(name, None, hb, thresholds.get(name, DEFAULT_BANDS)) for name, hb in pairs)
+
+    @property
+    def fingerprint(self) -> str:
+        """Text identifying what a weapon map built with this schema contains."""
+        return ",".join(m.name if m.path == m.name else f"{m.name}={m.path}" for m in self.metrics)
+
+    def config(self) -> Dict:
+        return {"metrics": [m.config() for m in self.metrics]}
+
+    def extract(self, stats: Dict) -> Dict:
+        """Flatten one weapon's stats to {metric name: value} (missing stats are left out)."""
+        if self.flat:
+            return stats
+        out = {}
+        for name, get in self._getters:
+            v = get(stats)
+            if v is not None:
+                out[name] = v
+        return out
+
+    def severity(self, name: str, abs_delta: float) -> str:
+        """Severity mark for a change of abs_delta in metric name ("" for no change)."""
+        if abs_delta <= 0:
+            return ""
+        small, large = self.thresholds.get(name, DEFAULT_BANDS)
+        return SEVERITY_MARKS[2 if abs_delta >= large else 1 if abs_delta >= small else 0]
+
+
+def _is_real(v) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v)
+
+
+def schema_from_config(config: Dict) -> MetricSchema:
+    """Build a schema from a parsed config ({"metrics": [...]})."""
+    entries = config.get("metrics") if isinstance(config, dict) else None
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("Metric schema needs a non-empty \"metrics\" list")
+    metrics = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not isinstance(entry.get("name"), str) or not entry["name"]:
+            raise ValueError(f"Every metric needs a name: {entry!r}")
+        name = entry["name"]
+        if not isinstance(entry.get("higher_is_better", True), bool):
+            raise ValueError(f"Metric {name}: higher_is_better must be true or false")
+        path = entry.get("path")
+        if path is not None and not isinstance(path, str):
+            raise ValueError(f"Metric {name}: path must be a dotted string, got {path!r}")
+        bands = entry.get("bands", DEFAULT_BANDS)
+        if not (isinstance(bands, (list, tuple)) and len(bands) == 2 and all(_is_real(b) for b in bands)):
+            raise ValueError(f"Metric {name}: bands must be two numbers [small, large], got {bands!r}")
+        metrics.append(Metric(name, path, entry.get("higher_is_better", True), tuple(bands)))
+    return MetricSchema(metrics)
+
+
+def load_schema(path: str) -> MetricSchema:
+    """Load a schema from a JSON file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return schema_from_config(json.load(f))
+
+
+def find_schema(path: str = SCHEMA_FILE) -> Optional[MetricSchema]:
+    """The schema in path if that file exists, else None (use the built-in metrics)."""
+    return load_schema(path) if os.path.exists(path) else None
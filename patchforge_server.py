@@ -0,0 +1,179 @@
+"""
+PatchForge Query Service
+========================
+
+Long-lived local HTTP service over a preloaded snapshot index.
+
+Every snapshot is loaded once at startup into a weapon map and a shared
+PatchHistory. Comparisons are computed on first request and kept in an
+LRU, and so are the encoded JSON responses, so a repeated query costs a
+dictionary lookup.
+
+Endpoints (snapshots are named by file stem, e.g. `patch_1_2`):
+    GET /snapshots
+    GET /compare?old=A&new=B[&changed=1][&limit=N]
+    GET /summary[?old=A&new=B]          (defaults to the last two snapshots)
+    GET /weapon/<name>/history
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from patchforge_core import ComparisonResult, build_weapon_map, compare_maps, load_json
+from patchforge_history import build_history, history_rows
+
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_CACHE_SIZE = 256
+
+
+class QueryError(Exception):
+    """A bad request; carries the HTTP status to answer with."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class _LRU:
+    """Thread-safe LRU mapping with a fixed number of entries."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute: Callable):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        # computed outside the lock; two threads racing on one key both compute, one wins
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while self._data and len(self._data) > self.size:
+                self._data.popitem(last=False)
+        return value
+
+
+class SnapshotIndex:
+    """Snapshots loaded once, plus cached comparisons and responses."""
+
+    def __init__(self, paths: List[str], engine: str = "python", cache_size: int = SERVER_CACHE_SIZE,
+                 loader: Optional[Callable[[str], Dict]] = None):
+        loader = loader or (lambda path: build_weapon_map(load_json(path)))
+        self.engine = engine
+        self.labels = [os.path.splitext(os.path.basename(p))[0] for p in paths]
+        if len(set(self.labels)) != len(self.labels):
+            raise ValueError("Snapshot file names must be unique")
+        self.maps: Dict[str, Dict] = {label: loader(path) for label, path in zip(self.labels, paths)}
+        self.history = build_history([self.maps[label] for label in self.labels], self.labels)
+        self._results = _LRU(max(1, cache_size // 4))
+        self.responses = _LRU(cache_size)
+
+    def _label(self, params: Dict, key: str, default: Optional[str]) -> str:
+        label = params.get(key, [default])[0]
+        if label is None:
+            raise QueryError(400, f"Missing parameter: {key}")
+        if label not in self.maps:
+            raise QueryError(404, f"Unknown snapshot: {label}")
+        return label
+
+    def comparison(self, old: str, new: str) -> ComparisonResult:
+        """The (cached) comparison of two snapshots."""
+        return self._results.get_or_compute(
+            (old, new),
+            lambda: ComparisonResult(compare_maps(self.maps[old], self.maps[new], engine=self.engine)),
+        )
+
+    # -----------------------------------------------------
+    # Queries (return JSON-ready objects)
+    # -----------------------------------------------------
+    def query(self, path: str, params: Dict[str, List[str]]):
+        parts = [unquote(p) for p in path.strip("/").split("/")]
+        latest = self.labels[-2:] if len(self.labels) >= 2 else [None, None]
+
+        if parts == ["snapshots"]:
+            return {"snapshots": self.labels}
+
+        if parts == ["compare"]:
+            old = self._label(params, "old", None)
+            new = self._label(params, "new", None)
+            result = self.comparison(old, new)
+            rows = result.rows
+            if params.get("changed", ["0"])[0] not in ("0", "false", ""):
+                rows = (r for r in rows if r["status"] in ("success", "danger"))
+            limit = int(params.get("limit", ["0"])[0] or 0)
+            out = []
+            for r in rows:
+                if limit and len(out) >= limit:
+                    break
+                out.append(dict(r))
+            return {"old": old, "new": new, "summary": result.summary, "rows": out}
+
+        if parts == ["summary"]:
+            old = self._label(params, "old", latest[0])
+            new = self._label(params, "new", latest[1])
+            return {"old": old, "new": new, "summary": self.comparison(old, new).summary}
+
+        if len(parts) == 3 and parts[0] == "weapon" and parts[2] == "history":
+            name = parts[1]
+            if name not in self.history.series:
+                raise QueryError(404, f"Unknown weapon: {name}")
+            return {"weapon": name, "snapshots": self.labels, "metrics": list(history_rows(self.history, name))}
+
+        raise QueryError(404, f"Unknown endpoint: /{'/'.join(parts)}")
+
+    def respond(self, target: str) -> bytes:
+        """Encoded JSON response for a request target, served from the response cache."""
+        url = urlsplit(target)
+        params = parse_qs(url.query)
+        key = (url.path.rstrip("/"), tuple(sorted((k, tuple(v)) for k, v in params.items())))
+        return self.responses.get_or_compute(
+            key, lambda: json.dumps(self.query(url.path, params), ensure_ascii=False).encode("utf-8")
+        )
+
+
+# ---------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------
+def make_server(index: SnapshotIndex, host: str = SERVER_HOST, port: int = SERVER_PORT, quiet: bool = True):
+    """A threaded HTTP server answering queries from index (port 0 picks a free port)."""
+    # imported here: http.server pulls in email, html and mimetypes, which the
+    # CLI should not pay for on every other command
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class PatchForgeHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"      # keep-alive
+        disable_nagle_algorithm = True     # headers and body go out in separate writes
+
+        def do_GET(self):
+            try:
+                status, body = 200, index.respond(self.path)
+            except QueryError as e:
+                status, body = e.status, json.dumps({"error": str(e)}).encode("utf-8")
+            except ValueError as e:
+                status, body = 400, json.dumps({"error": str(e)}).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            if not quiet:
+                super().log_message(format, *args)
+
+    server = ThreadingHTTPServer((host, port), PatchForgeHandler)
+    server.daemon_threads = True
+    return server